@@ -0,0 +1 @@
+"""Camera-free benchmarks for hand_gesture_recognizer. Run from the project root."""
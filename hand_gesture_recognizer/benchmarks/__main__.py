@@ -0,0 +1,209 @@
+"""
+Benchmark suite for the recognizer hot paths, runnable without a camera.
+
+    python -m benchmarks [--iterations 2000] [--output results.json]
+                         [--video clip.mp4 | --recording session.hgr]
+                         [--compare baseline.json]
+
+Times detect_gesture, detect_swipe, handle_gesture_states, mask rendering
+and the full per-frame pipeline on seeded synthetic hands, on the frames
+of a recorded video (run through real MediaPipe) with --video, or on the
+hands of a landmark recording with --recording. Results are
+printed, and written with --output, as JSON so runs on different commits
+can be compared with --compare.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+import hand_gesture_recognizer
+from hand_gesture_recognizer import GestureRecognizer, landmarks_to_array
+
+from .synthetic import (
+    GESTURE_FINGERS,
+    CannedHands,
+    CannedResults,
+    synthetic_frame,
+    synthetic_hand,
+)
+from .timing import measure, summarize
+
+
+def synthetic_inputs(iterations, seed):
+    """Hands drifting sideways and cycling through gestures, with matching frames."""
+    rng = np.random.default_rng(seed)
+    gestures = list(GESTURE_FINGERS)
+    hands = []
+    for index in range(iterations):
+        offset = (0.2 * np.sin(index / 15.0), 0.0)
+        gesture = gestures[(index // 20) % len(gestures)]
+        hands.append(synthetic_hand(gesture, offset=offset, jitter=0.005, rng=rng))
+    frames = [synthetic_frame(seed=seed + index) for index in range(8)]
+    return hands, frames
+
+
+def video_inputs(path, iterations):
+    """Frames of a recorded video and the hands MediaPipe finds in them."""
+    import mediapipe as mp
+
+    frames = []
+    cap = cv2.VideoCapture(path)
+    while len(frames) < iterations:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise SystemExit("No frames could be read from %s" % path)
+
+    recognizer = GestureRecognizer(headless=True)
+    hands = []
+    with mp.solutions.hands.Hands() as mp_hands:
+        for frame in frames:
+            _, results = recognizer._detect(mp_hands, frame)
+            for hand_landmarks in results.multi_hand_landmarks or []:
+                hands.append(landmarks_to_array(hand_landmarks))
+    if not hands:
+        raise SystemExit("MediaPipe found no hands in %s" % path)
+    return hands, frames
+
+
+def recording_inputs(path, seed):
+    """Hands stored in a landmark recording, with synthetic frames."""
+    from hand_gesture_recognizer import LandmarkReplay
+
+    records = LandmarkReplay(path).records
+    hands = [
+        hand
+        for landmarks, count in zip(records["landmarks"], records["count"])
+        for hand in landmarks[:count]
+    ]
+    if not hands:
+        raise SystemExit("No hands recorded in %s" % path)
+    return hands, [synthetic_frame(seed=seed + index) for index in range(8)]
+
+
+def run_suite(hands, frames, iterations, mediapipe_hands=None):
+    results = {}
+    recognizer = GestureRecognizer()
+    hands = [hands[index % len(hands)] for index in range(iterations)]
+
+    results["detect_gesture"] = summarize(measure(recognizer.detect_gesture, hands))
+    # Wrist samples at 30 FPS so the velocity fit sees realistic timestamps
+    timed_hands = [(hand, index / 30.0) for index, hand in enumerate(hands)]
+    results["detect_swipe"] = summarize(
+        measure(lambda item: recognizer.detect_swipe(item[0], 0, item[1]), timed_hands)
+    )
+
+    gesture_sets = [
+        {recognizer.detect_gesture(hand)} - {None} for hand in hands
+    ]
+    for name in GESTURE_FINGERS:
+        recognizer.register_gesture(name, lambda state: None)
+    results["handle_gesture_states"] = summarize(
+        measure(recognizer.handle_gesture_states, gesture_sets)
+    )
+
+    image = frames[0]
+    canned = [CannedResults([hand]) for hand in hands[:256]]
+    results["render_mask"] = summarize(
+        measure(lambda result: recognizer._render(image, result), canned, warmup=10)
+    )
+
+    # One whole iteration of run() minus imshow/waitKey
+    pipeline = GestureRecognizer()
+    inference = mediapipe_hands or CannedHands([hands[0]])
+
+    def frame_step(frame):
+        display, result = pipeline._infer(inference, frame)
+        pipeline.handle_gesture_states(pipeline._recognize(result))
+        pipeline._render(display, result)
+
+    pipeline_frames = [frames[index % len(frames)] for index in range(min(iterations, 500))]
+    results["pipeline"] = summarize(measure(frame_step, pipeline_frames, warmup=10))
+    return results
+
+
+def metadata(args):
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "package_path": hand_gesture_recognizer.__path__[0],
+        "inputs": args.video or args.recording or "synthetic",
+        "iterations": args.iterations,
+        "seed": args.seed,
+        "mediapipe": bool(args.video or args.mediapipe),
+    }
+
+
+def compare(baseline, current):
+    print("%-24s %12s %12s %8s" % ("benchmark (p50)", "baseline us", "current us", "change"))
+    for name, stats in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old is None:
+            continue
+        change = (stats["p50_us"] - old["p50_us"]) / old["p50_us"] * 100.0
+        print("%-24s %12.3f %12.3f %+7.1f%%" % (name, old["p50_us"], stats["p50_us"], change))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--video", help="recorded video to take frames and hands from")
+    parser.add_argument("--recording", help="landmark recording to take hands from")
+    parser.add_argument(
+        "--mediapipe", action="store_true", help="run real MediaPipe in the pipeline case"
+    )
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare with")
+    args = parser.parse_args()
+
+    if args.video:
+        hands, frames = video_inputs(args.video, args.iterations)
+    elif args.recording:
+        hands, frames = recording_inputs(args.recording, args.seed)
+    else:
+        hands, frames = synthetic_inputs(args.iterations, args.seed)
+
+    mediapipe_hands = None
+    if args.video or args.mediapipe:
+        import mediapipe as mp
+
+        mediapipe_hands = mp.solutions.hands.Hands()
+
+    report = {
+        "meta": metadata(args),
+        "results": run_suite(hands, frames, args.iterations, mediapipe_hands),
+    }
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(json.load(baseline), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Per-frame memory allocations of the frame loop.
+
+    python -m benchmarks.allocations [--frames 200] [--width 640 --height 480]
+
+Runs frames through conversion, canned inference, classification and mask
+rendering under tracemalloc (NumPy and OpenCV output arrays are traced), once
+with the allocating loop as it was before buffers.py and once with the
+recognizer's buffer pool. For each frame it records the peak of memory
+allocated on top of what was live before the frame, so a loop that allocates
+a few full-frame arrays shows several frame sizes and a loop that reuses its
+buffers shows close to zero.
+"""
+import argparse
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from hand_gesture_recognizer import GestureRecognizer
+
+from .synthetic import CannedHands, synthetic_frame, synthetic_hand
+
+
+def legacy_frame(recognizer, hands, frame):
+    """One frame of the loop as it was before buffers.py, kept as the reference."""
+    import mediapipe as mp
+
+    mp_drawing = mp.solutions.drawing_utils
+    mp_hands = mp.solutions.hands
+
+    image = cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB)
+    image.flags.writeable = False
+    results = hands.process(image)
+    image.flags.writeable = True
+    image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    recognizer.handle_gesture_states(recognizer._recognize(results))
+
+    hand_mask = np.zeros_like(image)
+    for hand_landmarks in results.multi_hand_landmarks or []:
+        mp_drawing.draw_landmarks(
+            hand_mask,
+            hand_landmarks,
+            mp_hands.HAND_CONNECTIONS,
+            mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=2, circle_radius=2),
+            mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=2, circle_radius=2),
+        )
+    gray_hand_mask = cv2.cvtColor(hand_mask, cv2.COLOR_BGR2GRAY)
+    _, binary_hand_mask = cv2.threshold(gray_hand_mask, 10, 255, cv2.THRESH_BINARY)
+    return np.hstack((image, cv2.cvtColor(binary_hand_mask, cv2.COLOR_GRAY2BGR)))
+
+
+def pooled_frame(recognizer, hands, frame):
+    image, results = recognizer._infer(hands, frame)
+    recognizer.handle_gesture_states(recognizer._recognize(results))
+    return recognizer._render(image, results)
+
+
+def measure(step, recognizer, hands, frame, frames, warmup=10):
+    """
+    :return: (mean, max) bytes allocated above the pre-frame level per frame,
+        and the net growth in bytes over all frames
+    """
+    for _ in range(warmup):
+        step(recognizer, hands, frame)
+
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    transient = np.empty(frames)
+    for index in range(frames):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        step(recognizer, hands, frame)
+        _, peak = tracemalloc.get_traced_memory()
+        transient[index] = peak - before
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return transient.mean(), transient.max(), end - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.width, args.height)
+    frame_bytes = frame.nbytes
+    print("frame: %dx%d, %d bytes" % (args.width, args.height, frame_bytes))
+    for name, step in (("allocating", legacy_frame), ("buffer pool", pooled_frame)):
+        hands = CannedHands([synthetic_hand("open_palm")])
+        mean, worst, growth = measure(
+            step, GestureRecognizer(), hands, frame, args.frames
+        )
+        print("%-11s: %10.0f bytes/frame (%.2f frames), max %d, net growth %d" % (
+            name, mean, mean / frame_bytes, worst, growth))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Hand backend presets compared on the same frames.
+
+    python -m benchmarks.backends [--frames 200] [--video clip.mp4]
+                                  [--presets low-latency balanced accurate]
+
+Runs every preset's backend over the same RGB frames in order (so tracking
+behaves as on a live camera) and reports per-frame latency, the average number
+of hands found and, against the last preset listed, how far each preset's
+landmarks are from it on frames where both found the same number of hands.
+Without --video synthetic frames are used; they contain no hands, so only the
+palm detector runs and the presets differ little. Use a clip with hands for
+a meaningful comparison.
+"""
+import argparse
+
+import cv2
+import numpy as np
+
+from hand_gesture_recognizer.backends import PRESETS, create_backend
+
+from .synthetic import synthetic_frame
+from .timing import measure, summarize
+
+
+def read_frames(path, count, width, height):
+    if path is None:
+        return [
+            cv2.cvtColor(synthetic_frame(width, height, seed=index), cv2.COLOR_BGR2RGB)
+            for index in range(count)
+        ]
+    frames = []
+    cap = cv2.VideoCapture(path)
+    while len(frames) < count:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB))
+    cap.release()
+    if not frames:
+        raise SystemExit("No frames could be read from %s" % path)
+    return frames
+
+
+def run_preset(name, frames):
+    """
+    :return: (latency summary, list of per-frame landmark arrays)
+    """
+    detected = []
+    with create_backend(name) as backend:
+        # Untimed pass: model loading and first-run allocations
+        for frame in frames[:5]:
+            backend.detect(frame)
+        backend.reset()
+        samples = measure(lambda frame: detected.append(backend.detect(frame)[0]), frames, 0)
+    return summarize(samples), detected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--video")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--presets", nargs="+", default=list(PRESETS), choices=list(PRESETS))
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames, args.width, args.height)
+    runs = {name: run_preset(name, frames) for name in args.presets}
+    reference = runs[args.presets[-1]][1]
+
+    print("%d frames from %s" % (len(frames), args.video or "synthetic frames (no hands)"))
+    print("%-12s %8s %8s %8s %8s %7s %12s" % (
+        "preset", "p50 ms", "p95 ms", "p99 ms", "fps", "hands", "error vs %s" % args.presets[-1]))
+    for name in args.presets:
+        summary, detected = runs[name]
+        hands = np.mean([len(found) for found in detected])
+        errors = [
+            np.linalg.norm(found[..., :2] - expected[..., :2], axis=-1).mean()
+            for found, expected in zip(detected, reference)
+            if len(found) and len(found) == len(expected)
+        ]
+        error = "%.4f" % np.mean(errors) if errors else "n/a"
+        print("%-12s %8.2f %8.2f %8.2f %8.1f %7.2f %12s" % (
+            name,
+            summary["p50_us"] / 1000.0,
+            summary["p95_us"] / 1000.0,
+            summary["p99_us"] / 1000.0,
+            summary["throughput_per_s"],
+            hands,
+            error,
+        ))
+
+
+if __name__ == "__main__":
+    main()
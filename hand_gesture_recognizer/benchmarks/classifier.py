@@ -0,0 +1,102 @@
+"""
+Micro-benchmark of the landmark classifier.
+
+    python -m benchmarks.classifier [--hands 10000]
+
+Compares the original per-attribute protobuf classifier with the array
+classifier, per hand and batched over an (N, 21, 3) stack. A live frame's
+hands come from MediaPipe as protobufs, so the per-hand comparison that
+matters for run() is the legacy classifier against landmarks_to_array plus
+classify_landmarks; the batched figure only applies to hands that are
+already arrays, such as recordings.
+"""
+import argparse
+import functools
+import timeit
+
+import numpy as np
+
+from hand_gesture_recognizer.landmarks import classify_landmarks, landmarks_to_array
+
+from .synthetic import GESTURE_FINGERS, synthetic_hand, to_landmark_list
+
+
+def legacy_detect_gesture(hand_landmarks, mp_hands):
+    """
+    The classifier as it was before landmarks.py, kept as the reference.
+    It used the module-level mp.solutions.hands, so the module is passed in
+    rather than imported inside the timed call.
+    """
+    fingers_extended = []
+    thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
+    thumb_ip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_IP]
+    fingers_extended.append(thumb_tip.x < thumb_ip.x)
+    for finger_tip, finger_pip in [
+        (mp_hands.HandLandmark.INDEX_FINGER_TIP, mp_hands.HandLandmark.INDEX_FINGER_PIP),
+        (mp_hands.HandLandmark.MIDDLE_FINGER_TIP, mp_hands.HandLandmark.MIDDLE_FINGER_PIP),
+        (mp_hands.HandLandmark.RING_FINGER_TIP, mp_hands.HandLandmark.RING_FINGER_PIP),
+        (mp_hands.HandLandmark.PINKY_TIP, mp_hands.HandLandmark.PINKY_PIP),
+    ]:
+        tip = hand_landmarks.landmark[finger_tip]
+        pip = hand_landmarks.landmark[finger_pip]
+        fingers_extended.append(tip.y < pip.y)
+    extended_count = sum(fingers_extended)
+    if extended_count == 0:
+        return "fist"
+    elif extended_count == 5:
+        return "open_palm"
+    elif extended_count == 4:
+        return "four_fingers"
+    elif extended_count == 3:
+        return "three_fingers"
+    elif extended_count == 2:
+        return "two_fingers"
+    return None
+
+
+def per_hand_us(function, items):
+    runs = 3
+    seconds = timeit.timeit(lambda: [function(item) for item in items], number=runs)
+    return seconds / runs / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hands", type=int, default=10000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    gestures = list(GESTURE_FINGERS)
+    arrays = [
+        synthetic_hand(gestures[i % len(gestures)], jitter=0.01, rng=rng)
+        for i in range(args.hands)
+    ]
+    protos = [to_landmark_list(hand) for hand in arrays]
+    stack = np.stack(arrays)
+
+    import mediapipe as mp
+
+    legacy_classifier = functools.partial(legacy_detect_gesture, mp_hands=mp.solutions.hands)
+    expected = [legacy_classifier(proto) for proto in protos]
+    assert list(classify_landmarks(stack)) == expected
+
+    legacy = per_hand_us(legacy_classifier, protos)
+    convert = per_hand_us(landmarks_to_array, protos)
+    array = per_hand_us(classify_landmarks, arrays)
+    runs = 10
+    batched = timeit.timeit(lambda: classify_landmarks(stack), number=runs)
+    batched = batched / runs / len(arrays) * 1e6
+
+    print("legacy protobuf classifier : %7.3f us/hand" % legacy)
+    print("landmarks_to_array         : %7.3f us/hand" % convert)
+    print("classify_landmarks (1 hand): %7.3f us/hand" % array)
+    print("convert + classify (1 hand): %7.3f us/hand (%.2fx legacy)" % (
+        convert + array, legacy / (convert + array)))
+    print("classify_landmarks (batch) : %7.3f us/hand (%.2fx legacy, arrays only)" % (
+        batched, legacy / batched))
+    print("convert + classify (batch) : %7.3f us/hand (%.2fx legacy)" % (
+        convert + batched, legacy / (convert + batched)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Event churn with and without debouncing.
+
+    python -m benchmarks.debounce [--frames 3000] [--noise 0.05]
+
+Replays a seeded gesture sequence at 30 FPS in which each frame is
+misclassified with probability --noise, and counts the appear/disappear
+events (i.e. callbacks, or key presses in iot2.py) that reach the
+registered functions, plus the delay debouncing adds to real changes.
+"""
+import argparse
+
+import numpy as np
+
+from hand_gesture_recognizer import GestureDebouncer, GestureRecognizer, HandResults
+
+from .synthetic import GESTURE_FINGERS, synthetic_hand
+
+
+def scripted_frames(frames, noise, seed):
+    """Gesture held for one second at a time, with single-frame glitches."""
+    rng = np.random.default_rng(seed)
+    gestures = list(GESTURE_FINGERS)
+    truth, shown = [], []
+    for index in range(frames):
+        gesture = gestures[(index // 30) % len(gestures)]
+        truth.append(gesture)
+        if rng.random() < noise:
+            gesture = gestures[rng.integers(len(gestures))]
+        shown.append(synthetic_hand(gesture))
+    return truth, shown
+
+
+def run(recognizer, hands):
+    events = []
+    for index, hand in enumerate(hands):
+        timestamp = index / 30.0
+        gestures = recognizer._recognize(HandResults([hand], None), timestamp)
+        for event in recognizer.handle_gesture_states(gestures):
+            events.append((index, event))
+    return events
+
+
+def first_appear(events, gesture, after):
+    for index, (name, state) in events:
+        if index >= after and name == gesture and state == "appear":
+            return index
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--noise", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    truth, hands = scripted_frames(args.frames, args.noise, args.seed)
+    changes = [index for index in range(1, len(truth)) if truth[index] != truth[index - 1]]
+
+    for name, debouncer in (
+        ("raw", None),
+        ("debounced", GestureDebouncer(confirm_frames=2, release_frames=2)),
+    ):
+        events = run(GestureRecognizer(headless=True, debouncer=debouncer), hands)
+        delays = [
+            first_appear(events, truth[index], index) - index
+            for index in changes
+            if first_appear(events, truth[index], index) is not None
+        ]
+        print("%-10s %6d events, %.2f frames mean delay on real changes" % (
+            name, len(events), np.mean(delays)))
+    print("ideal      %6d events" % (2 * len(changes) + 1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Per-frame CPU cost of display mode against headless mode.
+
+    python -m benchmarks.headless_cpu [--frames 500] [--mediapipe]
+
+Without --mediapipe the Hands graph is replaced by canned results with one
+hand, which isolates the visualization work that headless mode skips.
+imshow/waitKey are not timed, so the display figures are a lower bound.
+"""
+import argparse
+import time
+
+from hand_gesture_recognizer import GestureRecognizer
+
+from .synthetic import CannedHands, synthetic_frame, synthetic_hand
+
+
+def time_mode(headless, hands, frame, frames):
+    recognizer = GestureRecognizer(headless=headless)
+    start = time.process_time()
+    for _ in range(frames):
+        image, results = recognizer._infer(hands, frame)
+        recognizer.handle_gesture_states(recognizer._recognize(results))
+        if not headless:
+            recognizer._render(image, results)
+    return (time.process_time() - start) / frames * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=500)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--mediapipe", action="store_true")
+    args = parser.parse_args()
+
+    frame = synthetic_frame(args.width, args.height)
+    if args.mediapipe:
+        import mediapipe as mp
+
+        hands = mp.solutions.hands.Hands()
+    else:
+        hands = CannedHands([synthetic_hand("open_palm")])
+
+    display = time_mode(False, hands, frame, args.frames)
+    headless = time_mode(True, hands, frame, args.frames)
+    print("display : %.3f ms CPU/frame" % display)
+    print("headless: %.3f ms CPU/frame" % headless)
+    print("saved   : %.3f ms CPU/frame (%.0f%%)" % (
+        display - headless, 100.0 * (display - headless) / display))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Motion gesture recognition accuracy and per-frame cost.
+
+    python -m benchmarks.motion [--variants 4] [--performances 200]
+
+Registers circles, swipes in four directions and pinch-and-drag as templates
+(--variants per gesture, at different speeds and sizes), then streams
+synthetic hands performing them at random speeds, sizes, positions and
+frame rates, separated by idle movement. Reports how many performances were
+recognised correctly, missed or confused, false detections while idle, and
+the cost of MotionRecognizer.update per frame.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from hand_gesture_recognizer.motion import MotionRecognizer, hand_geometry
+
+from .synthetic import synthetic_hand
+from .timing import summarize
+
+# Where the synthetic hand's palm centre is, so hands can be placed by it
+PALM_CENTRE = hand_geometry(synthetic_hand())[0]
+
+
+def circle(direction):
+    def path(phase):
+        angle = direction * 2.0 * np.pi * phase
+        return np.stack([np.sin(angle), 1.0 - np.cos(angle)], axis=-1) * 0.5
+    return path
+
+
+def line(dx, dy):
+    def path(phase):
+        return np.stack([phase * dx, phase * dy], axis=-1)
+    return path
+
+
+# name: (palm path over phase 0..1 in units of the gesture size, pinched)
+GESTURES = {
+    "circle_cw": (circle(1.0), False),
+    "circle_ccw": (circle(-1.0), False),
+    "swipe_left": (line(-1.0, 0.0), False),
+    "swipe_right": (line(1.0, 0.0), False),
+    "swipe_up": (line(0.0, -1.0), False),
+    "swipe_down": (line(0.0, 1.0), False),
+    "pinch_drag_right": (line(1.0, 0.0), True),
+    "pinch_drag_down": (line(0.0, 1.0), True),
+}
+DURATION = {"circle_cw": 1.0, "circle_ccw": 1.0}  # seconds; 0.4 otherwise
+
+
+def hand_at(position, pinched, rng, jitter):
+    hand = synthetic_hand()
+    if pinched:
+        hand[4, :2] = hand[8, :2] + (0.01, 0.01)
+    hand[:, :2] += position - PALM_CENTRE
+    hand[:, :2] += rng.normal(0.0, jitter, size=(21, 2))
+    return hand
+
+
+def performance(name, size, duration, fps, origin, rng, jitter=0.002):
+    """Landmarks and timestamps of one performance, starting at origin."""
+    path, pinched = GESTURES[name]
+    count = max(2, int(round(duration * fps)) + 1)
+    phases = np.linspace(0.0, 1.0, count)
+    # Ease in and out like a real hand
+    phases = 0.5 - 0.5 * np.cos(np.pi * phases)
+    positions = origin + path(phases) * size
+    hands = np.stack([hand_at(position, pinched, rng, jitter) for position in positions])
+    return hands, np.arange(count) / float(fps)
+
+
+def idle(duration, fps, origin, rng, jitter=0.002):
+    """A hand drifting slowly and randomly."""
+    count = max(2, int(round(duration * fps)))
+    drift = np.cumsum(rng.normal(0.0, 0.002, size=(count, 2)), axis=0)
+    hands = np.stack([hand_at(origin + offset, False, rng, jitter) for offset in drift])
+    return hands, np.arange(count) / float(fps)
+
+
+def build_templates(variants):
+    recognizer = MotionRecognizer()
+    rng = np.random.default_rng(1)
+    for name in GESTURES:
+        for index in range(variants):
+            speed = (0.8, 1.0, 1.25, 0.9)[index % 4]
+            size = (0.3, 0.35, 0.25, 0.4)[index % 4]
+            duration = DURATION.get(name, 0.4) / speed
+            hands, times = performance(name, size, duration, 30, np.array([0.5, 0.4]), rng)
+            recognizer.add(name, hands, times)
+    return recognizer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--variants", type=int, default=4)
+    parser.add_argument("--performances", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    recognizer = build_templates(args.variants)
+    rng = np.random.default_rng(args.seed)
+    names = list(GESTURES)
+    outcomes = {"correct": 0, "missed": 0, "confused": 0}
+    false_alarms = 0
+    samples = []
+    clock = 0.0
+
+    def stream(hands, times):
+        detected = []
+        for hand, timestamp in zip(hands, times + clock):
+            start = time.perf_counter_ns()
+            motion = recognizer.update(hand, timestamp)
+            samples.append(time.perf_counter_ns() - start)
+            if motion is not None:
+                detected.append(motion)
+        return detected
+
+    for index in range(args.performances):
+        fps = rng.choice([15, 30, 60])
+        origin = rng.uniform(0.3, 0.6, size=2)
+        hands, times = idle(rng.uniform(0.5, 1.0), fps, origin, rng)
+        false_alarms += len(stream(hands, times))
+        clock += times[-1] + 1.0 / fps
+
+        name = names[index % len(names)]
+        speed = rng.uniform(0.75, 1.35)
+        duration = DURATION.get(name, 0.4) / speed
+        hands, times = performance(name, rng.uniform(0.25, 0.4), duration, fps, origin, rng)
+        # Keep recognising for a moment after the motion ends
+        rest, rest_times = idle(0.2, fps, origin + GESTURES[name][0](1.0) * 0.3, rng)
+        detected = stream(np.concatenate([hands, rest]), np.concatenate(
+            [times, times[-1] + 1.0 / fps + rest_times]))
+        clock += times[-1] + rest_times[-1] + 2.0 / fps
+        if name in detected:
+            outcomes["correct"] += 1
+        elif detected:
+            outcomes["confused"] += 1
+        else:
+            outcomes["missed"] += 1
+
+    summary = summarize(np.array(samples))
+    evaluated = recognizer.evaluated + recognizer.pruned
+    print("%d templates over %d gestures, %d performances at 15/30/60 FPS" % (
+        len(recognizer), len(names), args.performances))
+    print("correct %(correct)d, missed %(missed)d, confused %(confused)d" % outcomes)
+    print("false detections while idle: %d" % false_alarms)
+    print("update per frame: p50 %.1f us, p99 %.1f us" % (summary["p50_us"], summary["p99_us"]))
+    print("templates skipped by the lower bound: %.0f%%" % (
+        100.0 * recognizer.pruned / max(evaluated, 1)))
+
+
+if __name__ == "__main__":
+    main()
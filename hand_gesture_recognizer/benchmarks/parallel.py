@@ -0,0 +1,88 @@
+"""
+Frame rate of one fast camera with MediaPipe in several worker processes.
+
+    python -m benchmarks.parallel [--fps 120] [--seconds 5] [--workers 1,2,4]
+
+Feeds a synthetic live camera delivering --fps frames per second to run()
+on a single thread and to ParallelPipeline with each worker count, in
+tracking mode (frames dealt to workers in turn) and static mode (palm
+detection on every frame), and reports frames processed per second,
+frames dropped at the camera or for want of a free ring slot, and the
+latency from capture to classification. Throughput only scales with
+workers up to the number of free CPU cores.
+"""
+import argparse
+import functools
+import os
+import time
+
+import numpy as np
+
+from hand_gesture_recognizer.main import GestureRecognizer
+from hand_gesture_recognizer.parallel import ParallelPipeline
+
+from .synthetic import SyntheticCamera
+from .timing import summarize
+
+
+class LatencyProbe:
+    """Takes the place of a GesturePublisher to time every finished frame."""
+
+    def __init__(self):
+        self.latencies = []
+
+    def publish(self, timestamp, events, gestures, results=None):
+        self.latencies.append(time.perf_counter() - timestamp)
+
+
+def report(name, fps, frames, dropped, probe):
+    latency = summarize(np.array(probe.latencies) * 1e9)
+    print(
+        "%-22s %6.1f frames/s, %5d processed, %5d dropped, "
+        "capture to result p50 %6.1f ms, p99 %6.1f ms"
+        % (name, fps, frames, dropped, latency["p50_us"] / 1e3, latency["p99_us"] / 1e3)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fps", type=float, default=120.0, help="Camera frame rate")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--backend", default="low-latency", help="Preset name")
+    args = parser.parse_args()
+
+    camera = functools.partial(SyntheticCamera, args.fps, args.seconds)
+    print("%d CPU cores, camera at %.0f FPS, backend %s" % (
+        os.cpu_count(), args.fps, args.backend))
+
+    # Frames lost at the camera or for want of a free ring slot count as dropped
+    total = int(args.fps * args.seconds)
+    probe = LatencyProbe()
+    recognizer = GestureRecognizer(
+        headless=True, backend=args.backend, camera=camera, instrument=True, publisher=probe
+    )
+    recognizer.warmup()
+    recognizer.run()
+    stats = recognizer.stats()
+    report("run(), single thread", stats["fps"], stats["frames"], total - stats["frames"], probe)
+
+    for tracking in (True, False):
+        for workers in [int(value) for value in args.workers.split(",")]:
+            probe = LatencyProbe()
+            recognizer = GestureRecognizer(
+                headless=True, backend=args.backend, camera=camera, publisher=probe
+            )
+            pipeline = ParallelPipeline(recognizer, workers=workers, tracking=tracking)
+            pipeline.run()
+            report(
+                "%d worker(s), %s" % (workers, "tracking" if tracking else "static"),
+                pipeline.fps,
+                pipeline.frames_processed,
+                total - pipeline.frames_processed,
+                probe,
+            )
+
+
+if __name__ == "__main__":
+    main()
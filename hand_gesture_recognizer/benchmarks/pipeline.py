@@ -0,0 +1,97 @@
+"""
+Frame rate of run() with and without pipelined=True.
+
+    python -m benchmarks.pipeline [--fps 60] [--seconds 5] [--backend stub]
+
+Feeds a synthetic live camera to run() sequentially and with
+pipelined=True, and reports frames processed per second, frames dropped
+and the latency from capture to the end of the frame. Inference is
+StubBackend taking --inference-ms per frame (or a MediaPipe preset, e.g.
+--backend low-latency), and every frame ends with a --display-ms wait
+standing in for imshow and waitKey, which a headless run does not have.
+Pipelining overlaps the two, so the sequential loop runs at about
+1 / (inference + display) and the pipelined one at about
+1 / max(inference, display), up to the camera rate.
+"""
+import argparse
+import functools
+import time
+
+import numpy as np
+
+from hand_gesture_recognizer.backends import StubBackend
+from hand_gesture_recognizer.main import GestureRecognizer
+
+from .synthetic import SyntheticCamera, synthetic_hand
+from .timing import summarize
+
+
+class DisplayStandIn:
+    """
+    Takes the place of a GesturePublisher, which _finish_frame calls for
+    every frame: waits like the preview window would and times the frame.
+    """
+
+    def __init__(self, display_ms):
+        self.display_s = display_ms / 1000.0
+        self.finished = []
+        self.latencies = []
+
+    def publish(self, timestamp, events, gestures, results=None):
+        time.sleep(self.display_s)
+        now = time.perf_counter()
+        self.finished.append(now)
+        self.latencies.append(now - timestamp)
+
+
+def measure_run(args, pipelined):
+    backend = args.backend
+    if backend == "stub":
+        backend = functools.partial(
+            StubBackend, synthetic_hand(), ["Left"], latency=args.inference_ms / 1000.0
+        )
+    display = DisplayStandIn(args.display_ms)
+    recognizer = GestureRecognizer(
+        headless=True,
+        pipelined=pipelined,
+        backend=backend,
+        camera=functools.partial(SyntheticCamera, args.fps, args.seconds),
+        publisher=display,
+    )
+    recognizer.warmup()
+    recognizer.run()
+
+    frames = len(display.finished)
+    fps = (frames - 1) / (display.finished[-1] - display.finished[0]) if frames > 1 else 0.0
+    latency = summarize(np.array(display.latencies) * 1e9)
+    print(
+        "%-10s %6.1f frames/s, %5d processed, %5d dropped, "
+        "capture to frame end p50 %6.1f ms, p99 %6.1f ms"
+        % (
+            "pipelined" if pipelined else "sequential",
+            fps,
+            frames,
+            int(args.fps * args.seconds) - frames,
+            latency["p50_us"] / 1e3,
+            latency["p99_us"] / 1e3,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fps", type=float, default=60.0, help="Camera frame rate")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--backend", default="stub", help="'stub' or a preset name")
+    parser.add_argument("--inference-ms", type=float, default=15.0)
+    parser.add_argument("--display-ms", type=float, default=8.0)
+    args = parser.parse_args()
+
+    print("camera at %.0f FPS, backend %s, display %.1f ms" % (
+        args.fps, args.backend, args.display_ms))
+    for pipelined in (False, True):
+        measure_run(args, pipelined)
+
+
+if __name__ == "__main__":
+    main()
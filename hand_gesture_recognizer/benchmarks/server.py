@@ -0,0 +1,143 @@
+"""
+Gesture server throughput against the number of clients.
+
+    python -m benchmarks.server [--clients 1,2,4,8] [--fps 30] [--workers N]
+
+Starts a GestureServer and, for every client count, that many client
+processes streaming JPEG frames with a synthetic hand at --fps for
+--seconds, like cameras would. Reports the aggregate processed
+frame rate, the share of frames dropped by the server, round-trip latency
+and how many clients were rejected. --backend stub replaces MediaPipe with
+StubBackend to measure the server's own overhead.
+"""
+import argparse
+import functools
+import multiprocessing
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from hand_gesture_recognizer.backends import StubBackend
+from hand_gesture_recognizer.main import GestureRecognizer
+from hand_gesture_recognizer.server import DROPPED, OK, GestureClient, GestureServer
+
+from .synthetic import synthetic_frame, synthetic_hand
+from .timing import summarize
+
+
+def hand_frame(width=640, height=480):
+    """A synthetic frame with a hand-coloured blob where the synthetic hand is."""
+    frame = synthetic_frame(width, height)
+    hand = synthetic_hand()
+    points = (hand[:, :2] * (width, height)).astype(np.int32)
+    cv2.fillConvexPoly(frame, cv2.convexHull(points), (120, 160, 210))
+    return frame
+
+
+def recognizer(backend, latency):
+    if backend == "stub":
+        backend = functools.partial(StubBackend, synthetic_hand(), ["Right"], latency=latency)
+    return GestureRecognizer(headless=True, backend=backend)
+
+
+def client(address, seconds, fps, start, results):
+    """Stream frames at `fps` for `seconds` after `start` is set; runs in its own process."""
+    frame = hand_frame()
+    try:
+        connection = GestureClient(*address)
+    except ConnectionRefusedError:
+        results.put(None)
+        return
+    # Frame ids count up from 0; a send time is stored before its reply can come
+    frames = int(seconds * fps)
+    sent_at = [0.0] * frames
+    latencies = []
+    counts = {OK: 0, DROPPED: 0}
+
+    def read_replies():
+        try:
+            while sum(counts.values()) < frames:
+                status, frame_id, _, _ = connection.receive()
+                latencies.append(time.perf_counter() - sent_at[frame_id])
+                counts[status] = counts.get(status, 0) + 1
+        except (OSError, ValueError):
+            pass
+
+    reader = threading.Thread(target=read_replies, daemon=True)
+    reader.start()
+    start.wait()
+    began = time.perf_counter()
+    for index in range(frames):
+        delay = began + index / fps - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        sent_at[index] = time.perf_counter()
+        connection.send(frame)
+    reader.join(timeout=5.0)
+    connection.close()
+    results.put((counts.get(OK, 0), counts.get(DROPPED, 0), latencies))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", default="1,2,4,8")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--fps", type=float, default=30.0, help="Frame rate of every client")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-clients", type=int, default=8)
+    parser.add_argument("--backend", default="low-latency", help="Preset name or 'stub'")
+    parser.add_argument("--stub-latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    factory = functools.partial(recognizer, args.backend, args.stub_latency)
+    with GestureServer(
+        port=0, workers=args.workers, max_clients=args.max_clients, recognizer_factory=factory
+    ) as server:
+        print("%d workers, backend %s" % (server.workers, args.backend))
+        for count in [int(value) for value in args.clients.split(",")]:
+            start = context.Event()
+            results = context.Queue()
+            processes = [
+                context.Process(
+                    target=client,
+                    args=(server.address, args.seconds, args.fps, start, results),
+                )
+                for _ in range(count)
+            ]
+            for process in processes:
+                process.start()
+            # Let every client connect (and the server build its graph) first
+            while len(server.clients) + server.rejected < count and any(
+                process.is_alive() for process in processes
+            ):
+                time.sleep(0.05)
+            rejected = server.rejected
+            start.set()
+            outcomes = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+            server.rejected = 0
+
+            served = [outcome for outcome in outcomes if outcome is not None]
+            processed = sum(outcome[0] for outcome in served)
+            dropped = sum(outcome[1] for outcome in served)
+            latency = summarize(np.concatenate([outcome[2] for outcome in served]) * 1e9)
+            print(
+                "%2d clients: %6.1f frames/s processed, %4.1f%% dropped, "
+                "round trip p50 %6.1f ms, p99 %6.1f ms, %d rejected"
+                % (
+                    count,
+                    processed / args.seconds,
+                    100.0 * dropped / max(processed + dropped, 1),
+                    latency["p50_us"] / 1e3,
+                    latency["p99_us"] / 1e3,
+                    rejected,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Startup cost: import time and time to the first gesture event.
+
+    python -m benchmarks.startup [--runs 5] [--frames 30] [--video clip.mp4]
+
+Every measurement runs in a fresh interpreter. Import times are the median
+over --runs interpreters. Time-to-first-event is measured from before the
+package import until handle_gesture_states first reports an event, once with
+a cold start and once with warmup() called before the first frame; the
+latency of the first frame and the median of the following ones are shown
+next to it. Real MediaPipe runs on every frame. With --video the frames and
+hands come from the clip (it must show a hand); otherwise synthetic frames
+are used and a canned open palm replaces MediaPipe's (empty) results, so the
+first frame produces the event.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORTS = (
+    "import hand_gesture_recognizer",
+    "from hand_gesture_recognizer import classify_landmarks",
+    "from hand_gesture_recognizer import LandmarkReplay",
+    "from hand_gesture_recognizer import GestureRecognizer",
+    "import mediapipe",
+)
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+%s
+print(time.perf_counter() - start)
+"""
+
+
+class _InjectedHands:
+    """Runs the real graph but reports a fixed hand, for clips without hands."""
+
+    def __init__(self, hands, results):
+        self.hands = hands
+        self.results = results
+
+    def process(self, image):
+        self.hands.process(image)
+        return self.results
+
+    def close(self):
+        self.hands.close()
+
+
+def first_event(warm, frames, video, width, height):
+    """Child process: start to first event, with the package not yet imported."""
+    start = time.perf_counter()
+    from hand_gesture_recognizer import GestureRecognizer
+
+    imported = time.perf_counter() - start
+    recognizer = GestureRecognizer(headless=True)
+    warmup = recognizer.warmup(width, height) if warm else 0.0
+    hands = recognizer._take_hands()
+
+    if video:
+        import cv2
+
+        cap = cv2.VideoCapture(video)
+        read = cap.read
+    else:
+        from .synthetic import CannedResults, synthetic_frame, synthetic_hand
+
+        hands = _InjectedHands(hands, CannedResults([synthetic_hand("open_palm")]))
+        frame = synthetic_frame(width, height)
+
+        def read():
+            return True, frame
+
+    event_at = None
+    latencies = []
+    for _ in range(frames):
+        frame_start = time.perf_counter()
+        success, frame = read()
+        if not success:
+            break
+        _, results = recognizer._infer(hands, frame)
+        events = recognizer.handle_gesture_states(recognizer._recognize(results))
+        now = time.perf_counter()
+        latencies.append(now - frame_start)
+        if events and event_at is None:
+            event_at = now - start
+    hands.close()
+
+    print(json.dumps({
+        "import": imported,
+        "warmup": warmup,
+        "first_event": event_at,
+        "first_frame": latencies[0] if latencies else None,
+        "steady_frame": statistics.median(latencies[1:]) if len(latencies) > 1 else None,
+    }))
+
+
+def run_child(arguments):
+    output = subprocess.run(
+        [sys.executable] + arguments, capture_output=True, text=True, check=True
+    ).stdout
+    return output.strip().splitlines()[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--video")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--child", choices=("cold", "warm"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        first_event(args.child == "warm", args.frames, args.video, args.width, args.height)
+        return
+
+    print("import (median of %d fresh interpreters)" % args.runs)
+    for statement in IMPORTS:
+        seconds = [
+            float(run_child(["-c", IMPORT_SNIPPET % statement]))
+            for _ in range(args.runs)
+        ]
+        print("  %-55s %7.1f ms" % (statement, statistics.median(seconds) * 1000.0))
+
+    print("time to first event (%s)" % (args.video or "synthetic frames, canned hand"))
+    for mode in ("cold", "warm"):
+        child = ["-m", "benchmarks.startup", "--child", mode, "--frames", str(args.frames),
+                 "--width", str(args.width), "--height", str(args.height)]
+        if args.video:
+            child += ["--video", args.video]
+        result = json.loads(run_child(child))
+
+        def ms(key):
+            value = result[key]
+            return "   n/a" if value is None else "%6.1f" % (value * 1000.0)
+
+        print("  %s: import %s ms, warmup %s ms, first event %s ms, "
+              "first frame %s ms, later frames %s ms" % (
+                  mode, ms("import"), ms("warmup"), ms("first_event"),
+                  ms("first_frame"), ms("steady_frame")))
+
+
+if __name__ == "__main__":
+    main()
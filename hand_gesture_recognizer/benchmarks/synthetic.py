@@ -0,0 +1,159 @@
+"""
+Synthetic hands and frames so benchmarks run without a camera or a person.
+"""
+import time
+
+import numpy as np
+
+# Normalised (x, y, z) landmarks of a mirrored left hand with every finger extended
+OPEN_PALM = np.array(
+    [
+        (0.50, 0.80, 0.0),  # wrist
+        (0.42, 0.75, 0.0),  # thumb
+        (0.36, 0.68, 0.0),
+        (0.31, 0.62, 0.0),
+        (0.27, 0.57, 0.0),
+        (0.44, 0.55, 0.0),  # index
+        (0.43, 0.45, 0.0),
+        (0.425, 0.39, 0.0),
+        (0.42, 0.33, 0.0),
+        (0.50, 0.54, 0.0),  # middle
+        (0.50, 0.43, 0.0),
+        (0.50, 0.36, 0.0),
+        (0.50, 0.30, 0.0),
+        (0.56, 0.55, 0.0),  # ring
+        (0.57, 0.45, 0.0),
+        (0.575, 0.39, 0.0),
+        (0.58, 0.34, 0.0),
+        (0.61, 0.58, 0.0),  # pinky
+        (0.63, 0.50, 0.0),
+        (0.64, 0.46, 0.0),
+        (0.65, 0.42, 0.0),
+    ],
+    dtype=np.float32,
+)
+
+# Which fingers (thumb, index, middle, ring, pinky) are extended per gesture
+GESTURE_FINGERS = {
+    "fist": (0, 0, 0, 0, 0),
+    "two_fingers": (0, 1, 1, 0, 0),
+    "three_fingers": (0, 1, 1, 1, 0),
+    "four_fingers": (0, 1, 1, 1, 1),
+    "open_palm": (1, 1, 1, 1, 1),
+}
+
+_TIPS = (4, 8, 12, 16, 20)
+_JOINTS = (3, 6, 10, 14, 18)
+
+
+def synthetic_hand(gesture="open_palm", offset=(0.0, 0.0), jitter=0.0, rng=None):
+    """
+    Build a (21, 3) float32 landmark array showing the given gesture.
+    :param gesture: One of GESTURE_FINGERS
+    :param offset: (dx, dy) shift of the whole hand in normalised coordinates
+    :param jitter: Standard deviation of Gaussian noise added to every landmark
+    :param rng: numpy Generator used for the jitter
+    """
+    hand = OPEN_PALM.copy()
+    for extended, tip, joint in zip(GESTURE_FINGERS[gesture], _TIPS, _JOINTS):
+        if extended:
+            continue
+        if tip == 4:
+            hand[tip, 0] = hand[joint, 0] + 0.03
+        else:
+            hand[tip, 1] = hand[joint, 1] + 0.03
+    hand[:, 0] += offset[0]
+    hand[:, 1] += offset[1]
+    if jitter:
+        rng = rng if rng is not None else np.random.default_rng(0)
+        hand[:, :2] += rng.normal(0.0, jitter, size=(21, 2)).astype(np.float32)
+    return hand
+
+
+def to_landmark_list(hand):
+    """Wrap a (21, 3) array in the NormalizedLandmarkList MediaPipe returns."""
+    from mediapipe.framework.formats import landmark_pb2
+
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in hand.tolist():
+        landmark_list.landmark.add(x=x, y=y, z=z)
+    return landmark_list
+
+
+class CannedResults:
+    """Stand-in for the object returned by mp_hands.Hands.process."""
+
+    def __init__(self, hands):
+        self.multi_hand_landmarks = [to_landmark_list(hand) for hand in hands] or None
+        self.multi_handedness = None
+
+
+class CannedHands:
+    """Stand-in for mp_hands.Hands that returns the same results for every frame."""
+
+    def __init__(self, hands):
+        self.results = CannedResults(hands)
+
+    def process(self, image):
+        return self.results
+
+
+def synthetic_frame(width=640, height=480, seed=0):
+    """Random BGR frame of the given size."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+
+
+class SyntheticCamera:
+    """
+    Stands in for CameraSource: a live camera delivering synthetic frames at
+    a fixed rate for a fixed time. Like a real camera it does not wait for
+    the reader; frames not read before the next one is due are dropped.
+    Picklable, so it can be passed to the capture process of
+    ParallelPipeline (as a functools.partial over its arguments).
+    """
+
+    live = True
+
+    def __init__(self, fps=120.0, seconds=5.0, width=640, height=480):
+        self.fps = fps
+        self.frames = int(fps * seconds)
+        self.width = width
+        self.height = height
+        self.grabbed = 0
+        self.dropped = 0
+        self._images = None
+        self._start = None
+        self._returned = -1
+
+    def start(self):
+        # A few distinct frames, so nothing downstream can cache on identity
+        self._images = [synthetic_frame(self.width, self.height, seed) for seed in range(4)]
+        self._start = time.perf_counter()
+        return self
+
+    def read(self, timeout=None):
+        """:return: (BGR frame, capture timestamp) of the newest frame, or None"""
+        if self.finished:
+            return None
+        index = int((time.perf_counter() - self._start) * self.fps)
+        if index <= self._returned:
+            # Wait for the next frame to be "captured"
+            index = self._returned + 1
+            delay = self._start + index / self.fps - time.perf_counter()
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                return None
+            time.sleep(max(delay, 0.0))
+        index = min(index, self.frames - 1)
+        self.dropped += index - self._returned - 1
+        self.grabbed += 1
+        self._returned = index
+        return self._images[index % len(self._images)], self._start + index / self.fps
+
+    @property
+    def finished(self):
+        return self._returned >= self.frames - 1
+
+    def close(self):
+        self._returned = self.frames - 1
@@ -0,0 +1,77 @@
+"""
+Template classifier accuracy and latency against a growing template index.
+
+    python -m benchmarks.templates [--templates 500] [--hands 2000]
+
+Registers the synthetic gestures from jittered examples, then classifies
+hands that were moved, scaled and rotated (up to --max-angle degrees), and
+random landmark clouds that should be rejected. Reports accuracy, rejection
+rate and per-hand latency, one hand at a time and batched.
+"""
+import argparse
+
+import numpy as np
+
+from hand_gesture_recognizer.templates import GestureTemplates
+
+from .synthetic import GESTURE_FINGERS, synthetic_hand
+from .timing import measure, summarize
+
+
+def transformed(hand, rng, max_angle):
+    """Rotate about the wrist, scale and move a hand."""
+    angle = np.radians(rng.uniform(-max_angle, max_angle))
+    scale = rng.uniform(0.5, 1.5)
+    rotation = np.array(
+        [[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]], dtype=np.float32
+    )
+    hand = hand.copy()
+    wrist = hand[0, :2].copy()
+    hand[:, :2] = (hand[:, :2] - wrist) @ rotation.T * scale + wrist
+    hand[:, :2] += rng.uniform(-0.2, 0.2, size=2).astype(np.float32)
+    hand[:, 2] *= scale
+    return hand
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--templates", type=int, default=500)
+    parser.add_argument("--hands", type=int, default=2000)
+    parser.add_argument("--max-angle", type=float, default=45.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    gestures = list(GESTURE_FINGERS)
+    templates = GestureTemplates()
+    per_gesture = max(1, args.templates // len(gestures))
+    for gesture in gestures:
+        templates.add(
+            gesture,
+            np.stack([synthetic_hand(gesture, jitter=0.005, rng=rng) for _ in range(per_gesture)]),
+        )
+
+    labels = [gestures[index % len(gestures)] for index in range(args.hands)]
+    hands = np.stack([
+        transformed(synthetic_hand(label, jitter=0.005, rng=rng), rng, args.max_angle)
+        for label in labels
+    ])
+    clouds = rng.uniform(0.2, 0.8, size=(args.hands, 21, 3)).astype(np.float32)
+    clouds[..., 2] = 0.0
+
+    found = templates.classify(hands)
+    accuracy = np.mean(found == np.array(labels, dtype=object))
+    rejected = np.mean(np.equal(templates.classify(clouds), None))
+
+    single = summarize(measure(templates.classify, list(hands), 100))
+    batch = summarize(measure(templates.classify, [hands] * 20, 2))
+
+    print("%d templates (%d with mirror images), %d gestures" % (
+        per_gesture * len(gestures), len(templates), len(gestures)))
+    print("accuracy on moved/scaled/rotated hands: %.1f%%" % (accuracy * 100))
+    print("random landmark clouds rejected       : %.1f%%" % (rejected * 100))
+    print("classify (1 hand) : p50 %6.1f us, p99 %6.1f us" % (single["p50_us"], single["p99_us"]))
+    print("classify (batch)  : %6.2f us/hand" % (batch["p50_us"] / len(hands)))
+
+
+if __name__ == "__main__":
+    main()
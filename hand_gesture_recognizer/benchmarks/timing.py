@@ -0,0 +1,46 @@
+"""
+Latency sampling and summary statistics shared by the benchmarks.
+"""
+import time
+
+import numpy as np
+
+
+def measure(function, inputs, warmup=100):
+    """
+    Time one call of `function` per input.
+    :param function: Callable taking a single input
+    :param inputs: Sequence of inputs, cycled in order
+    :param warmup: Untimed calls made first
+    :return: Array of per-call durations in nanoseconds
+    """
+    count = len(inputs)
+    for index in range(warmup):
+        function(inputs[index % count])
+
+    samples = np.empty(count, dtype=np.int64)
+    clock = time.perf_counter_ns
+    for index in range(count):
+        item = inputs[index]
+        start = clock()
+        function(item)
+        samples[index] = clock() - start
+    return samples
+
+
+def summarize(samples):
+    """
+    Reduce per-call durations to the figures compared across commits.
+    :param samples: Durations in nanoseconds
+    :return: Dict of throughput (calls/s) and mean/p50/p95/p99 latency in microseconds
+    """
+    micros = samples / 1000.0
+    p50, p95, p99 = np.percentile(micros, [50, 95, 99])
+    return {
+        "iterations": int(len(samples)),
+        "throughput_per_s": float(1e6 / micros.mean()),
+        "mean_us": float(micros.mean()),
+        "p50_us": float(p50),
+        "p95_us": float(p95),
+        "p99_us": float(p99),
+    }
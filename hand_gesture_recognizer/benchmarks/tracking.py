@@ -0,0 +1,98 @@
+"""
+Hand identity tracking: ID stability and per-frame cost.
+
+    python -m benchmarks.tracking [--frames 3000] [--max-hands 4]
+
+Moves hands of the same handedness along crossing paths with landmark
+jitter, detections missing on some frames and in random order (MediaPipe
+does not keep hands in order), and counts how often a hand's ID changes
+with HandTracker and with the detection-order keys used without one. Then
+times _recognize plus handle_gesture_states with and without a tracker for
+0 to --max-hands hands, to show the tracker's cost stays bounded.
+"""
+import argparse
+
+import numpy as np
+
+from hand_gesture_recognizer import GestureRecognizer, HandResults, HandTracker
+
+from .synthetic import synthetic_hand
+from .timing import measure, summarize
+
+
+def crossing_paths(frames, hands, rng, miss=0.05, jitter=0.002):
+    """:return: List of per-frame lists of (true hand, landmarks), shuffled"""
+    result = []
+    phases = rng.uniform(0.0, 2 * np.pi, size=hands)
+    for index in range(frames):
+        t = index / 30.0
+        detections = []
+        for hand in range(hands):
+            # Hands sweep across each other, one row apart
+            dx = 0.35 * np.sin(0.8 * t + phases[hand])
+            dy = 0.08 * (hand - (hands - 1) / 2.0)
+            if rng.random() >= miss:
+                detections.append(
+                    (hand, synthetic_hand("open_palm", (dx, dy), jitter=jitter, rng=rng))
+                )
+        rng.shuffle(detections)
+        result.append(detections)
+    return result
+
+
+def id_switches(frames, assign):
+    """Count frames on which a hand shows up under a different ID than before."""
+    last = {}
+    switches = 0
+    for index, detections in enumerate(frames):
+        ids = assign([landmarks for _, landmarks in detections], index / 30.0)
+        for (hand, _), hand_id in zip(detections, ids):
+            if hand in last and last[hand] != hand_id:
+                switches += 1
+            last[hand] = hand_id
+    return switches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--max-hands", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print("ID changes over %d frames (all hands labelled Left):" % args.frames)
+    for hands in range(2, args.max_hands + 1):
+        frames = crossing_paths(args.frames, hands, rng)
+        tracker = HandTracker(max_hands=args.max_hands)
+        tracked = id_switches(
+            frames,
+            lambda detected, timestamp: tracker.update(
+                detected, ["Left"] * len(detected), timestamp
+            ),
+        )
+        ordered = id_switches(frames, lambda detected, timestamp: range(len(detected)))
+        print("  %d hands: tracker %4d, detection order %4d" % (hands, tracked, ordered))
+
+    print("_recognize + handle_gesture_states per frame:")
+    for hands in range(args.max_hands + 1):
+        results = HandResults(
+            [synthetic_hand("fist", (0.2 * index - 0.3, 0.0)) for index in range(hands)],
+            ["Left"] * hands,
+        )
+        timings = []
+        for tracker in (None, HandTracker(max_hands=args.max_hands)):
+            recognizer = GestureRecognizer(headless=True, tracker=tracker)
+            timestamps = np.arange(args.frames) / 30.0
+            timings.append(summarize(measure(
+                lambda timestamp: recognizer.handle_gesture_states(
+                    recognizer._recognize(results, timestamp)
+                ),
+                timestamps,
+            )))
+        print("  %d hands: without tracker p50 %6.1f us, with tracker p50 %6.1f us" % (
+            hands, timings[0]["p50_us"], timings[1]["p50_us"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Gesture uplink packet size, publish cost and delivery latency.
+
+    python -m benchmarks.uplink [--fps 30] [--seconds 3]
+
+Streams two synthetic hands moving like real ones, plus a gesture change
+every half second, and reports bytes per frame as JSON and in the binary
+encoding (events only, int16 and delta landmarks) for several frames per
+packet, what publish() costs the frame loop, and the latency from a
+gesture event to its arrival at a LocalBroker over UDP and MQTT.
+"""
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+from hand_gesture_recognizer.landmarks import HandResults
+from hand_gesture_recognizer.uplink import (
+    GesturePublisher,
+    LocalBroker,
+    MqttTransport,
+    UdpTransport,
+    UplinkEvent,
+    UplinkHand,
+    decode_packet,
+    encode_packet,
+)
+
+from .synthetic import synthetic_hand
+from .timing import measure, summarize
+
+GESTURES = ["open_palm", "fist", "two_fingers"]
+
+
+def stream(frames, fps, rng):
+    """:return: List of (timestamp, events, active gestures, HandResults)"""
+    hands = np.stack([synthetic_hand("open_palm"), synthetic_hand("fist", offset=(0.3, 0.0))])
+    velocity = np.zeros((2, 2))
+    active = set()
+    result = []
+    for index in range(frames):
+        # Hands drift with smoothly changing velocity, plus detection jitter
+        velocity = 0.9 * velocity + rng.normal(0.0, 0.002, size=(2, 2))
+        hands[:, :, :2] += velocity[:, None, :]
+        frame = hands + rng.normal(0.0, 0.001, size=hands.shape).astype(np.float32)
+
+        events = []
+        if index % max(1, fps // 2) == 0:
+            gesture = GESTURES[(index // max(1, fps // 2)) % len(GESTURES)]
+            events = [(name, "disappear") for name in active]
+            events.append((gesture, "appear"))
+            active = {gesture}
+        result.append((index / float(fps), events, set(active),
+                       HandResults(list(frame), ["Left", "Right"])))
+    return result
+
+
+def json_size(timestamp, events, results):
+    return len(json.dumps({
+        "timestamp": timestamp,
+        "events": events,
+        "hands": [hand.tolist() for hand in results.multi_hand_landmarks],
+    }).encode("utf-8"))
+
+
+def packet_sizes(frames, per_packet, landmarks):
+    """Total bytes of a stream encoded with per_packet frames in each packet."""
+    total = 0
+    for start in range(0, len(frames), per_packet):
+        records = []
+        for timestamp, events, active, results in frames[start : start + per_packet]:
+            records += [UplinkEvent(timestamp, gesture, state) for gesture, state in events]
+            if landmarks:
+                records += [
+                    UplinkHand(timestamp, slot, label, hand)
+                    for slot, (hand, label) in enumerate(
+                        zip(results.multi_hand_landmarks, results.multi_handedness)
+                    )
+                ]
+        total += len(encode_packet(0, start, records, active, landmarks == "delta"))
+    return total
+
+
+def delivery(name, transport, broker, frames, max_delay=0.0):
+    """Publish frames in real time and time events until the broker has them."""
+    publisher = GesturePublisher(
+        transport, landmarks="delta", max_delay=max_delay, clock_offset=0.0
+    )
+    latencies = []
+    received = []
+    sizes = [0]
+
+    def consume():
+        while True:
+            message = broker.get(timeout=0.5)
+            if message is None:
+                return
+            arrived = time.perf_counter()
+            packet = decode_packet(message[1])
+            sizes[0] += len(message[1])
+            received.append(packet)
+            latencies.extend(arrived - event.timestamp for event in packet.events)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    start = time.perf_counter()
+    sent = 0
+    for offset, events, active, results in frames:
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        publisher.publish(time.perf_counter(), events, active, results)
+        sent += len(events)
+    publisher.close()
+    consumer.join()
+
+    summary = summarize(np.array(latencies) * 1e9)
+    events = sum(len(packet.events) for packet in received)
+    print("%-4s, max_delay %.2f s: %d/%d events in %d packets, %.0f bytes/frame, "
+          "event latency p50 %.2f ms, p99 %.2f ms" % (
+              name, max_delay, events, sent, len(received), sizes[0] / float(len(frames)),
+              summary["p50_us"] / 1e3, summary["p99_us"] / 1e3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = stream(int(args.fps * args.seconds), args.fps, rng)
+    count = float(len(frames))
+
+    print("bytes per frame, 2 hands at %d FPS:" % args.fps)
+    print("  JSON, one message per frame : %6.1f" % (
+        sum(json_size(timestamp, events, results)
+            for timestamp, events, _, results in frames) / count))
+    for per_packet in (1, 3, 8):
+        print("  %d frame(s) per packet: events %5.1f, int16 %6.1f, delta %6.1f" % (
+            per_packet,
+            packet_sizes(frames, per_packet, None) / count,
+            packet_sizes(frames, per_packet, "int16") / count,
+            packet_sizes(frames, per_packet, "delta") / count,
+        ))
+
+    class Discard:
+        def send(self, payload):
+            pass
+
+        def close(self):
+            pass
+
+    publisher = GesturePublisher(Discard(), landmarks="delta", max_pending=len(frames) * 2)
+    cost = summarize(measure(lambda frame: publisher.publish(*frame), frames, 0))
+    publisher.close()
+    print("publish() in the frame loop: p50 %.2f us, p99 %.2f us" % (
+        cost["p50_us"], cost["p99_us"]))
+
+    with LocalBroker() as broker:
+        delivery("UDP", UdpTransport(*broker.udp_address), broker, frames)
+        delivery("UDP", UdpTransport(*broker.udp_address), broker, frames, 0.1)
+        delivery("MQTT", MqttTransport(*broker.mqtt_address), broker, frames)
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,55 @@
-from .main import GestureRecognizer
+import importlib
+
+# Public names and the submodules defining them. Submodules are imported on
+# first use, so e.g. the classifier or the replay code can be used without
+# loading OpenCV and MediaPipe.
+_EXPORTS = {
+    "GestureRecognizer": "main",
+    "FrameResult": "landmarks",
+    "HandResults": "landmarks",
+    "classify_landmarks": "landmarks",
+    "fingers_extended": "landmarks",
+    "landmarks_to_array": "landmarks",
+    "GestureRule": "rules",
+    "GestureRules": "rules",
+    "MotionRecognizer": "motion",
+    "CameraSource": "capture",
+    "GestureTemplates": "templates",
+    "normalize_landmarks": "templates",
+    "HandMaskRenderer": "mask",
+    "HandBackend": "backends",
+    "MediaPipeBackend": "backends",
+    "StubBackend": "backends",
+    "process_videos": "video",
+    "LandmarkRecorder": "recording",
+    "LandmarkReplay": "recording",
+    "GestureDispatcher": "dispatch",
+    "GestureDebouncer": "debounce",
+    "LandmarkSmoother": "debounce",
+    "MultiCameraRecognizer": "multicam",
+    "GesturePublisher": "uplink",
+    "UdpTransport": "uplink",
+    "MqttTransport": "uplink",
+    "LocalBroker": "uplink",
+    "decode_packet": "uplink",
+    "GestureServer": "server",
+    "GestureClient": "server",
+    "ParallelPipeline": "parallel",
+    "HandTracker": "tracking",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    # Cache it so later lookups skip this function
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,214 @@
+import time
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, HandResults, handedness_labels, landmarks_to_array
+
+# Named MediaPipeBackend settings. "balanced" is what the recognizer has always
+# used; "low-latency" runs the lite landmark model on one hand; "accurate"
+# re-runs palm detection whenever tracking confidence drops below 0.8, which
+# recovers sooner from lost or swapped hands at the cost of more detections.
+PRESETS = {
+    "low-latency": {
+        "model_complexity": 0,
+        "max_num_hands": 1,
+        "min_detection_confidence": 0.5,
+        "min_tracking_confidence": 0.5,
+    },
+    "balanced": {
+        "model_complexity": 1,
+        "max_num_hands": 2,
+        "min_detection_confidence": 0.5,
+        "min_tracking_confidence": 0.5,
+    },
+    "accurate": {
+        "model_complexity": 1,
+        "max_num_hands": 2,
+        "min_detection_confidence": 0.5,
+        "min_tracking_confidence": 0.8,
+    },
+}
+
+
+class HandBackend:
+    """
+    Interface of a hand landmark detector.
+    Subclasses implement detect(); process() wraps its output in HandResults
+    so a backend can be used wherever an mp_hands.Hands instance is accepted.
+    """
+
+    def detect(self, image):
+        """
+        :param image: RGB frame as a (height, width, 3) uint8 array
+        :return: Tuple of an (N, 21, 3) float32 array of normalised landmarks
+            and a list of N handedness labels ('Left', 'Right' or None)
+        """
+        raise NotImplementedError
+
+    def process(self, image):
+        """
+        :param image: RGB frame as a (height, width, 3) uint8 array
+        :return: HandResults with one (21, 3) array per hand and the
+            handedness labels; both None if no hand was found
+        """
+        hands, labels = self.detect(image)
+        if not len(hands):
+            return HandResults(None, None)
+        return HandResults(list(hands), labels)
+
+    def reset(self):
+        """Forget tracking state, e.g. between unrelated videos."""
+
+    def close(self):
+        """Release the resources held by the backend."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MediaPipeBackend(HandBackend):
+    """MediaPipe Hands (legacy solutions API) with its settings exposed."""
+
+    def __init__(
+        self,
+        model_complexity=1,
+        max_num_hands=2,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+        static_image_mode=False,
+        opencv_threads=None,
+    ):
+        """
+        :param model_complexity: 0 for the lite landmark model, 1 for the full one
+        :param max_num_hands: Most hands tracked; each extra hand costs one
+            more landmark model run per frame
+        :param min_detection_confidence: Palm detection score needed to start
+            tracking a hand
+        :param min_tracking_confidence: Landmark score below which the palm
+            detector is run again on the next frame
+        :param static_image_mode: Run palm detection on every frame
+        :param opencv_threads: Threads OpenCV may use for colour conversion and
+            resizing (cv2.setNumThreads, process wide); None leaves it alone.
+            MediaPipe's own inference threads cannot be set through its
+            Python API.
+        """
+        import mediapipe as mp
+
+        if opencv_threads is not None:
+            import cv2
+
+            cv2.setNumThreads(opencv_threads)
+        self.settings = {
+            "model_complexity": model_complexity,
+            "max_num_hands": max_num_hands,
+            "min_detection_confidence": min_detection_confidence,
+            "min_tracking_confidence": min_tracking_confidence,
+            "static_image_mode": static_image_mode,
+        }
+        self.hands = mp.solutions.hands.Hands(**self.settings)
+
+    def detect(self, image):
+        results = self.hands.process(image)
+        if not results.multi_hand_landmarks:
+            return np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32), []
+        hands = np.stack(
+            [landmarks_to_array(hand) for hand in results.multi_hand_landmarks]
+        )
+        return hands, handedness_labels(results)
+
+    def reset(self):
+        self.hands.reset()
+
+    def close(self):
+        self.hands.close()
+
+
+class StubBackend(HandBackend):
+    """
+    Deterministic backend for tests and benchmarks: returns scripted hands
+    instead of looking at the image, optionally taking a fixed time per call.
+    """
+
+    def __init__(self, frames=None, handedness=None, latency=0.0, loop=True):
+        """
+        :param frames: Sequence of per-frame landmark arrays of shape
+            (N, 21, 3), or a single (21, 3) / (N, 21, 3) array for every
+            frame; None for no hands
+        :param handedness: Labels for every frame's hands, or a sequence of
+            per-frame label lists matching `frames`
+        :param latency: Seconds each detect() call busy-waits, to stand in
+            for inference cost
+        :param loop: Start over after the last frame instead of reporting no
+            hands
+        """
+        if frames is None:
+            frames = [np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)]
+        elif isinstance(frames, np.ndarray) and frames.ndim in (2, 3):
+            frames = [frames.reshape(-1, NUM_LANDMARKS, 3)]
+        self.frames = [np.asarray(hands, dtype=np.float32) for hands in frames]
+        if not handedness or isinstance(handedness[0], (str, type(None))):
+            handedness = [handedness] * len(self.frames)
+        self.handedness = list(handedness)
+        self.latency = latency
+        self.loop = loop
+        self.calls = 0
+
+    @classmethod
+    def from_recording(cls, path, **kwargs):
+        """Replay the hands of a landmark recording, one recorded frame per call."""
+        from .recording import LandmarkReplay
+
+        frames, handedness = [], []
+        for _, results in LandmarkReplay(path):
+            hands = results.multi_hand_landmarks or []
+            frames.append(np.array(hands, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3))
+            handedness.append(list(results.multi_handedness or []))
+        kwargs.setdefault("loop", False)
+        return cls(frames, handedness, **kwargs)
+
+    def detect(self, image):
+        index = self.calls
+        self.calls += 1
+        if self.latency:
+            deadline = time.perf_counter() + self.latency
+            while time.perf_counter() < deadline:
+                pass
+        if self.loop:
+            index %= len(self.frames)
+        elif index >= len(self.frames):
+            return np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32), []
+        hands = self.frames[index]
+        # One label per hand, unknown where none was given
+        labels = list(self.handedness[index] or [])[: len(hands)]
+        return hands, labels + [None] * (len(hands) - len(labels))
+
+    def reset(self):
+        self.calls = 0
+
+
+def create_backend(backend=None, static_image_mode=False):
+    """
+    :param backend: Preset name (see PRESETS), a callable returning a
+        HandBackend (such as a backend class), or None for "balanced"
+    :param static_image_mode: Build a preset with palm detection on every
+        frame instead of tracking; callables are used as they are
+    :return: A new backend; the caller closes it
+    """
+    if backend is None:
+        backend = "balanced"
+    if isinstance(backend, str):
+        if backend not in PRESETS:
+            raise ValueError(
+                "Unknown backend preset %r, expected one of %s"
+                % (backend, ", ".join(PRESETS))
+            )
+        return MediaPipeBackend(**dict(PRESETS[backend], static_image_mode=static_image_mode))
+    if callable(backend):
+        return backend()
+    raise TypeError(
+        "backend must be a preset name or a callable returning a HandBackend, not %r"
+        % (backend,)
+    )
@@ -0,0 +1,100 @@
+import threading
+
+import cv2
+import numpy as np
+
+
+class FrameBuffers:
+    """
+    Working arrays for one frame at one resolution, allocated once.
+    `canvas` holds the side-by-side view: `display` is a view of its left half
+    and `mask_view` of its right half, so the mirrored frame and the hand mask
+    are written in place and the combined view never has to be stacked.
+    """
+
+    def __init__(self, height, width):
+        self.shape = (height, width)
+        self.rgb = np.empty((height, width, 3), dtype=np.uint8)
+        self.canvas = np.zeros((height, 2 * width, 3), dtype=np.uint8)
+        self.display = self.canvas[:, :width]
+        self.mask_view = self.canvas[:, width:]
+        # Binary hand mask, expanded to BGR only for the display
+        self.mask = np.zeros((height, width), dtype=np.uint8)
+
+    def convert(self, frame, flip=True, display=True):
+        """
+        Mirror a BGR frame and convert it to RGB for MediaPipe.
+        :param display: Also keep the mirrored BGR frame in `display`, which
+            saves converting the RGB image back afterwards
+        :return: The RGB image (self.rgb)
+        """
+        if display:
+            if flip:
+                cv2.flip(frame, 1, dst=self.display)
+            else:
+                np.copyto(self.display, frame)
+            return cv2.cvtColor(self.display, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        if flip:
+            cv2.flip(frame, 1, dst=self.rgb)
+            return cv2.cvtColor(self.rgb, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.rgb)
+
+    def mirror(self, frame):
+        """Mirror a BGR frame into `display` without any colour conversion."""
+        return cv2.flip(frame, 1, dst=self.display)
+
+    def combine(self, image=None):
+        """
+        Copy the drawn mask into the right half of the canvas.
+        :param image: BGR frame for the left half if it is not already `display`
+        :return: The combined view (self.canvas)
+        """
+        if image is not None and image is not self.display:
+            np.copyto(self.display, image)
+        cv2.cvtColor(self.mask, cv2.COLOR_GRAY2BGR, dst=self.mask_view)
+        return self.canvas
+
+    def clear_mask(self):
+        self.mask.fill(0)
+        return self.mask
+
+
+class BufferPool:
+    """
+    Ring of FrameBuffers reused frame after frame.
+    With `depth` sets, a frame's buffers are only overwritten `depth` frames
+    later, which lets pipelined stages keep several frames in flight. All sets
+    are reallocated when the frame resolution changes.
+    """
+
+    def __init__(self, depth=1):
+        """
+        :param depth: Frames whose buffers may be in use at the same time
+        """
+        self.depth = depth
+        self._sets = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, frame):
+        """
+        :param frame: Frame the buffers are for; only its size is used
+        :return: The next FrameBuffers in the ring
+        """
+        shape = frame.shape[:2]
+        with self._lock:
+            if not self._sets or self._sets[0].shape != shape:
+                self._sets = [FrameBuffers(*shape) for _ in range(self.depth)]
+                self._next = 0
+            buffers = self._sets[self._next]
+            self._next = (self._next + 1) % self.depth
+        return buffers
+
+    def owner(self, image):
+        """
+        :return: The FrameBuffers whose `display` is `image`, or None
+        """
+        for buffers in self._sets:
+            if buffers.display is image:
+                return buffers
+        return None
@@ -0,0 +1,247 @@
+import collections
+import logging
+import os
+import threading
+import time
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+
+class CameraSource:
+    """
+    A camera, stream or video file read by a background grabber thread.
+    The grabber decodes frames as fast as the device delivers them, so the
+    driver's queue never fills with stale images, and read() always returns
+    the newest frame together with its capture timestamp; frames nobody read
+    in time are dropped. Video files have no frames to lose to a slow reader,
+    so their grabber waits for every frame to be read before decoding the
+    next, and each frame is delivered. Frames are decoded into a small ring of reused
+    arrays. When a live source fails, it is reopened with exponential backoff
+    instead of being polled in a busy loop.
+    """
+
+    def __init__(
+        self,
+        source=0,
+        width=None,
+        height=None,
+        fps=None,
+        fourcc=None,
+        buffer_size=1,
+        hold=1,
+        reconnect_delay=0.25,
+        max_reconnect_delay=8.0,
+    ):
+        """
+        :param source: Camera index, stream URL or video file path
+        :param width: Requested frame width (None keeps the driver default)
+        :param height: Requested frame height
+        :param fps: Requested frame rate
+        :param fourcc: Requested pixel format, e.g. 'MJPG', which lets most USB
+            cameras deliver higher resolutions and frame rates
+        :param buffer_size: Frames the driver may queue (not every backend
+            honours it; the grabber keeps the queue drained either way)
+        :param hold: Number of most recent frames returned by read() that must
+            stay untouched; a frame is overwritten `hold` reads later
+        :param reconnect_delay: First wait before reopening a failed source
+        :param max_reconnect_delay: Longest wait between reopening attempts
+        """
+        self.source = source
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fourcc = fourcc
+        self.buffer_size = buffer_size
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        # Files end instead of being reconnected
+        self.live = not (isinstance(source, str) and os.path.isfile(source))
+
+        self.grabbed = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self._slots = [None] * (hold + 2)
+        self._held = collections.deque(maxlen=hold)
+        self._latest = None  # (slot, sequence, timestamp)
+        self._returned = 0  # sequence of the last frame handed out
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._finished = False
+        self._capture = None
+        self._thread = None
+
+    def _open(self):
+        capture = cv2.VideoCapture(self.source)
+        if not capture.isOpened():
+            capture.release()
+            return None
+        # The pixel format has to be chosen before the resolution on many drivers
+        if self.fourcc:
+            capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        if self.width:
+            capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        if self.height:
+            capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if self.fps:
+            capture.set(cv2.CAP_PROP_FPS, self.fps)
+        if self.buffer_size is not None:
+            capture.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+        return capture
+
+    @property
+    def settings(self):
+        """Resolution and frame rate the device actually delivers."""
+        capture = self._capture
+        if capture is None:
+            return None
+        return {
+            "width": int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": capture.get(cv2.CAP_PROP_FPS),
+        }
+
+    def start(self):
+        """
+        Open the source and start grabbing.
+        :return: self
+        :raises IOError: If a video file cannot be opened
+        """
+        self._capture = self._open()
+        if self._capture is None and not self.live:
+            raise IOError("Cannot open video file: %s" % self.source)
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._grab, name="camera-grabber", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def _capture_time(self, capture, returned_at):
+        # V4L2 reports the driver's buffer timestamp, taken on the same
+        # monotonic clock as perf_counter; other backends and files report a
+        # stream position, which is recognisable by not being recent
+        stamp = capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if 0.0 <= returned_at - stamp < 1.0:
+            return stamp
+        return returned_at
+
+    def _free_slot(self):
+        with self._condition:
+            latest = self._latest[0] if self._latest else None
+            for slot in range(len(self._slots)):
+                if slot != latest and slot not in self._held:
+                    return slot
+
+    def _reconnect(self, delay):
+        """Reopen the source after `delay` seconds; returns the next delay."""
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+        logger.warning(
+            "Camera %r is not delivering frames, reopening in %.2f s", self.source, delay
+        )
+        if self._stop_event.wait(delay):
+            return delay
+        self._capture = self._open()
+        self.reconnects += 1
+        return min(delay * 2.0, self.max_reconnect_delay)
+
+    def _grab(self):
+        delay = self.reconnect_delay
+        failures = 0
+        try:
+            while not self._stop_event.is_set():
+                capture = self._capture
+                if capture is None:
+                    delay = self._reconnect(delay)
+                    continue
+
+                if not self.live:
+                    # Files are paced by the reader, so no frame is skipped
+                    with self._condition:
+                        self._condition.wait_for(
+                            lambda: self._stop_event.is_set()
+                            or self._latest is None
+                            or self._latest[1] <= self._returned
+                        )
+                    if self._stop_event.is_set():
+                        break
+
+                slot = self._free_slot()
+                success, frame = capture.read(self._slots[slot])
+                returned_at = time.perf_counter()
+                if not success:
+                    if not self.live:
+                        break
+                    failures += 1
+                    # A few empty reads happen on some drivers; more mean the
+                    # device is gone
+                    if failures >= 3:
+                        delay = self._reconnect(delay)
+                        failures = 0
+                    else:
+                        self._stop_event.wait(0.01)
+                    continue
+                failures = 0
+                delay = self.reconnect_delay
+
+                timestamp = self._capture_time(capture, returned_at)
+                with self._condition:
+                    self._slots[slot] = frame
+                    if self._latest is not None and self._latest[1] > self._returned:
+                        self.dropped += 1
+                    self.grabbed += 1
+                    self._latest = (slot, self.grabbed, timestamp)
+                    self._condition.notify_all()
+        finally:
+            with self._condition:
+                self._finished = True
+                self._condition.notify_all()
+
+    def read(self, timeout=None):
+        """
+        Wait for a frame newer than the last one returned.
+        :param timeout: Seconds to wait, or None to wait indefinitely
+        :return: (BGR frame, capture timestamp in perf_counter seconds), or
+            None on timeout or once the source has ended or been closed. The
+            frame is reused `hold` reads later; copy it to keep it longer.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._finished
+                or (self._latest is not None and self._latest[1] > self._returned),
+                timeout,
+            ):
+                return None
+            if self._latest is None or self._latest[1] <= self._returned:
+                return None
+            slot, sequence, timestamp = self._latest
+            self._returned = sequence
+            self._held.append(slot)
+            # A file's grabber waits for this
+            self._condition.notify_all()
+            return self._slots[slot], timestamp
+
+    @property
+    def finished(self):
+        """True once the grabber has stopped (end of file or close())."""
+        return self._finished
+
+    def close(self):
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,9 +1,19 @@
 import cv2
 
-def handle_fist(image):
+from .rules import DEFAULT_RULES, GestureRule
+
+# Gestures recognised by the demo: the finger-count defaults, plus shapes
+# they cannot tell apart, layered on top of them
+GESTURE_RULES = DEFAULT_RULES + (
+    GestureRule("pointing", "01000"),
+    GestureRule("thumb_pinky", "10001"),
+)
+
+
+def show_gesture(image, text):
     cv2.putText(
         image,
-        "Fist",
+        text,
         (50, 100),
         cv2.FONT_HERSHEY_SIMPLEX,
         2,
@@ -13,54 +23,41 @@ def handle_fist(image):
     )
 
 
+def handle_fist(image):
+    show_gesture(image, "Fist")
+
+
 def handle_open_palm(image):
-    cv2.putText(
-        image,
-        "Open Palm",
-        (50, 100),
-        cv2.FONT_HERSHEY_SIMPLEX,
-        2,
-        (0, 255, 0),
-        5,
-        cv2.LINE_AA,
-    )
+    show_gesture(image, "Open Palm")
 
 
 def handle_two_fingers(image):
-    cv2.putText(
-        image,
-        "Two Fingers",
-        (50, 100),
-        cv2.FONT_HERSHEY_SIMPLEX,
-        2,
-        (0, 255, 0),
-        5,
-        cv2.LINE_AA,
-    )
+    show_gesture(image, "Two Fingers")
 
 
 def handle_three_fingers(image):
-    cv2.putText(
-        image,
-        "Three Fingers",
-        (50, 100),
-        cv2.FONT_HERSHEY_SIMPLEX,
-        2,
-        (0, 255, 0),
-        5,
-        cv2.LINE_AA,
-    )
+    show_gesture(image, "Three Fingers")
 
 
 def handle_four_fingers(image):
-    cv2.putText(
-        image,
-        "Four Fingers",
-        (50, 100),
-        cv2.FONT_HERSHEY_SIMPLEX,
-        2,
-        (0, 255, 0),
-        5,
-        cv2.LINE_AA,
-    )
+    show_gesture(image, "Four Fingers")
+
+
+def handle_pointing(image):
+    show_gesture(image, "Pointing")
+
+
+def handle_thumb_pinky(image):
+    show_gesture(image, "Thumb and Pinky")
+
 
+# Function called with the frame for each gesture in GESTURE_RULES
+GESTURE_HANDLERS = {
+    "fist": handle_fist,
+    "open_palm": handle_open_palm,
+    "two_fingers": handle_two_fingers,
+    "three_fingers": handle_three_fingers,
+    "four_fingers": handle_four_fingers,
+    "pointing": handle_pointing,
+    "thumb_pinky": handle_thumb_pinky,
+}
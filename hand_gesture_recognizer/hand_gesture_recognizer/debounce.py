@@ -0,0 +1,140 @@
+import math
+
+import numpy as np
+
+
+class GestureDebouncer:
+    """
+    Hysteresis between per-frame classification and gesture dispatch.
+    A gesture is confirmed once it has been seen on `confirm_frames`
+    consecutive frames and for at least `confirm_ms`; it is released once it
+    has been missing for `release_frames` consecutive frames and at least
+    `release_ms`. With the defaults a gesture needs one extra frame to appear
+    or disappear, and a single misclassified frame produces no events at all.
+    """
+
+    def __init__(self, confirm_frames=2, release_frames=2, confirm_ms=0.0, release_ms=0.0):
+        """
+        :param confirm_frames: Consecutive frames a gesture must be seen to appear
+        :param release_frames: Consecutive frames a gesture must be missing to disappear
+        :param confirm_ms: Minimum time a gesture must be seen to appear
+        :param release_ms: Minimum time a gesture must be missing to disappear
+        """
+        self.confirm_frames = confirm_frames
+        self.release_frames = release_frames
+        self.confirm_s = confirm_ms / 1000.0
+        self.release_s = release_ms / 1000.0
+        self.active = set()
+        # gesture -> [consecutive frames, timestamp of the first of them]
+        self._seen = {}
+        self._missing = {}
+
+    def update(self, gestures, timestamp):
+        """
+        :param gestures: Set of gestures classified on this frame
+        :param timestamp: Capture time of the frame in seconds
+        :return: Set of confirmed gestures
+        """
+        for gesture in gestures:
+            self._missing.pop(gesture, None)
+            if gesture in self.active:
+                continue
+            streak = self._seen.get(gesture)
+            if streak is None:
+                streak = self._seen[gesture] = [0, timestamp]
+            streak[0] += 1
+            if streak[0] >= self.confirm_frames and timestamp - streak[1] >= self.confirm_s:
+                self.active.add(gesture)
+                del self._seen[gesture]
+
+        for gesture in list(self._seen):
+            if gesture not in gestures:
+                del self._seen[gesture]
+
+        for gesture in self.active - gestures:
+            streak = self._missing.get(gesture)
+            if streak is None:
+                streak = self._missing[gesture] = [0, timestamp]
+            streak[0] += 1
+            if streak[0] >= self.release_frames and timestamp - streak[1] >= self.release_s:
+                self.active.discard(gesture)
+                del self._missing[gesture]
+
+        return set(self.active)
+
+    def reset(self):
+        self.active = set()
+        self._seen = {}
+        self._missing = {}
+
+    def clone(self):
+        """:return: A debouncer with the same settings and no state"""
+        return GestureDebouncer(
+            self.confirm_frames,
+            self.release_frames,
+            self.confirm_s * 1000.0,
+            self.release_s * 1000.0,
+        )
+
+
+class LandmarkSmoother:
+    """
+    One-Euro filter over whole (21, 3) landmark arrays, one state per hand.
+    Slow movements are smoothed strongly to remove jitter near finger
+    thresholds, while fast movements pass almost unfiltered, so swipes are not
+    delayed. See Casiez et al., "1 Euro Filter", CHI 2012.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=5.0, derivative_cutoff=1.0, stale_after=0.5):
+        """
+        :param min_cutoff: Cutoff frequency in Hz at rest; lower is smoother
+        :param beta: How quickly the cutoff rises with speed; higher lags less
+        :param derivative_cutoff: Cutoff frequency in Hz of the speed estimate
+        :param stale_after: Seconds after which a hand's filter state is reset
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.derivative_cutoff = derivative_cutoff
+        self.stale_after = stale_after
+        # hand id -> (timestamp, filtered landmarks, filtered speed)
+        self._states = {}
+
+    @staticmethod
+    def _alpha(cutoff, elapsed):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / elapsed)
+
+    def smooth(self, hand, timestamp, hand_id=0):
+        """
+        :param hand: (21, 3) landmark array
+        :param timestamp: Capture time in seconds
+        :param hand_id: Key that stays the same for a hand across frames
+        :return: Filtered (21, 3) float32 array
+        """
+        hand = np.asarray(hand, dtype=np.float32)
+        state = self._states.get(hand_id)
+        if state is None or not 0.0 < timestamp - state[0] <= self.stale_after:
+            self._states[hand_id] = (timestamp, hand, np.zeros_like(hand))
+            return hand
+
+        previous_time, previous, previous_speed = state
+        elapsed = timestamp - previous_time
+        speed = (hand - previous) / elapsed
+        speed = previous_speed + self._alpha(self.derivative_cutoff, elapsed) * (
+            speed - previous_speed
+        )
+        cutoff = self.min_cutoff + self.beta * np.abs(speed)
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        alpha = 1.0 / (1.0 + tau / elapsed)
+        filtered = (previous + alpha * (hand - previous)).astype(np.float32)
+        self._states[hand_id] = (timestamp, filtered, speed)
+        return filtered
+
+    def prune(self, timestamp):
+        """Forget hands that have not been seen for `stale_after` seconds."""
+        for hand_id in [
+            hand_id
+            for hand_id, state in self._states.items()
+            if timestamp - state[0] > self.stale_after
+        ]:
+            del self._states[hand_id]
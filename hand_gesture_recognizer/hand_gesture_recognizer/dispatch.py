@@ -0,0 +1,197 @@
+import asyncio
+import collections
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("drop", "coalesce", "block")
+
+
+class _Lane:
+    """Pending events of one gesture; at most one of them runs at a time."""
+
+    __slots__ = ("events", "running")
+
+    def __init__(self):
+        self.events = collections.deque()
+        self.running = False
+
+
+class GestureDispatcher:
+    """
+    Runs registered gesture functions off the frame loop.
+    Events are queued per gesture and each gesture's queue is drained by one
+    task at a time, so a gesture's appear/disappear calls keep their order
+    while different gestures run concurrently on a thread pool. Coroutine
+    functions are awaited on an asyncio event loop (a private one on a
+    background thread unless `loop` is given).
+
+    When `max_pending` events are waiting, `overflow` decides what happens:
+    'drop' discards the new event, 'coalesce' replaces the gesture's waiting
+    events with the new one (keeping only its latest state) and, if other
+    gestures' events still fill the backlog, discards the oldest of those,
+    and 'block' makes the frame loop wait for room.
+    """
+
+    def __init__(self, max_workers=2, max_pending=64, overflow="drop", loop=None):
+        """
+        :param max_workers: Threads running handlers; use 1 if handlers share
+            state without locking
+        :param max_pending: Queued events across all gestures before `overflow`
+            applies
+        :param overflow: 'drop', 'coalesce' or 'block'
+        :param loop: asyncio event loop, running in another thread, for
+            coroutine handlers
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                "overflow must be one of %s, not %r" % (", ".join(OVERFLOW_POLICIES), overflow)
+            )
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.dropped = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="gesture-dispatch"
+        )
+        self._lanes = {}
+        self._pending = 0
+        self._submitted = 0  # orders waiting events across lanes
+        self._condition = threading.Condition()
+        self._closed = False
+        self._loop = loop
+        self._loop_thread = None
+
+    def submit(self, gesture, function, state):
+        """
+        Queue function(state) for a gesture.
+        :return: False if the event was dropped
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("GestureDispatcher is closed")
+            lane = self._lanes.get(gesture)
+            if lane is None:
+                lane = self._lanes[gesture] = _Lane()
+
+            while self._pending >= self.max_pending:
+                if self.overflow == "drop":
+                    self.dropped += 1
+                    return False
+                if self.overflow == "coalesce":
+                    # Only the newest state of this gesture is kept waiting
+                    self.dropped += len(lane.events)
+                    self._pending -= len(lane.events)
+                    lane.events.clear()
+                    while self._pending >= self.max_pending:
+                        # Other gestures fill the backlog: the oldest waiting
+                        # event gives way
+                        oldest = min(
+                            (other for other in self._lanes.values() if other.events),
+                            key=lambda other: other.events[0][2],
+                        )
+                        oldest.events.popleft()
+                        self.dropped += 1
+                        self._pending -= 1
+                    break
+                self._condition.wait()
+
+            lane.events.append((function, state, self._submitted))
+            self._submitted += 1
+            self._pending += 1
+            if not lane.running:
+                lane.running = True
+                self._executor.submit(self._run_next, lane)
+        return True
+
+    def _run_next(self, lane):
+        with self._condition:
+            if not lane.events:
+                # Coalesced away while this task was waiting
+                lane.running = False
+                self._condition.notify_all()
+                return
+            function, state, _ = lane.events.popleft()
+            self._pending -= 1
+            self._condition.notify_all()
+
+        try:
+            self._call(function, state)
+        except Exception:
+            logger.exception("Gesture handler %r failed", function)
+
+        with self._condition:
+            if lane.events and not self._closed:
+                # Requeue rather than loop, so busy gestures cannot starve others
+                self._executor.submit(self._run_next, lane)
+                return
+            if lane.events:
+                # Closed without waiting: discard what is left
+                self.dropped += len(lane.events)
+                self._pending -= len(lane.events)
+                lane.events.clear()
+            lane.running = False
+            self._condition.notify_all()
+
+    def _call(self, function, state):
+        result = function(state)
+        if inspect.isawaitable(result):
+            asyncio.run_coroutine_threadsafe(
+                self._ensure_awaitable(result), self._event_loop()
+            ).result()
+
+    @staticmethod
+    async def _ensure_awaitable(awaitable):
+        return await awaitable
+
+    def _event_loop(self):
+        with self._condition:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="gesture-dispatch-loop", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+
+    @property
+    def pending(self):
+        """Events queued and not yet started."""
+        return self._pending
+
+    def join(self, timeout=None):
+        """
+        Wait until every queued event has been handled.
+        :return: False if the timeout expired first
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not any(lane.running for lane in self._lanes.values()),
+                timeout,
+            )
+
+    def close(self, wait=True):
+        """
+        Stop accepting events.
+        :param wait: Handle the events already queued before returning
+        """
+        if wait:
+            self.join()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._executor.shutdown(wait=wait)
+        if self._loop_thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop_thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,164 @@
+import collections
+
+import numpy as np
+
+from .rules import DEFAULT_TABLE, FINGER_BITS, RIGHT_HAND
+
+# MediaPipe hand landmark indices (mirrors mp_hands.HandLandmark)
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+NUM_LANDMARKS = 21
+
+# Index, middle, ring and pinky tips (8, 12, 16, 20) and PIP joints (6, 10, 14, 18)
+# as strided slices, which numpy indexes much faster than index arrays
+FINGER_TIPS = slice(8, 21, 4)
+FINGER_PIPS = slice(6, 19, 4)
+# (state bit, tip, PIP joint) of the index, middle, ring and pinky fingers
+_FINGER_STATE_BITS = ((2, 8, 6), (4, 12, 10), (8, 16, 14), (16, 20, 18))
+
+# Same shape as the MediaPipe Hands results object, holding (21, 3) landmark
+# arrays instead of protobufs and "Left"/"Right" labels (or None) instead of
+# ClassificationLists, so code reading results accepts either
+HandResults = collections.namedtuple(
+    "HandResults", ["multi_hand_landmarks", "multi_handedness"]
+)
+
+# Result of recognizing one recorded or replayed frame.
+# index: frame number; timestamp_ms: frame time; gestures: set of gesture names;
+# events: list of (gesture, state) transitions; landmarks: (N, 21, 3) float32
+# array of the detected hands, or None
+FrameResult = collections.namedtuple(
+    "FrameResult", ["index", "timestamp_ms", "gestures", "events", "landmarks"]
+)
+
+# Byte layout of a serialized NormalizedLandmarkList whose landmarks carry
+# exactly x, y and z: per landmark a 2-byte submessage header, then three
+# (1-byte tag, 4-byte little-endian float32) fields
+_RECORD_SIZE = 17
+_RECORD_TAGS = ((0, b"\x0a"), (1, b"\x0f"), (2, b"\x0d"), (7, b"\x15"), (12, b"\x1d"))
+
+
+def landmarks_to_array(hand_landmarks):
+    """
+    Convert one hand's landmarks to a (21, 3) float32 array of x, y, z.
+    :param hand_landmarks: MediaPipe NormalizedLandmarkList, or an array that is
+        returned unchanged
+    :return: (21, 3) landmark array
+    """
+    if isinstance(hand_landmarks, np.ndarray):
+        return hand_landmarks
+
+    # Fast path: read the float32 fields straight out of the wire format
+    # instead of touching 63 protobuf attributes one by one
+    data = hand_landmarks.SerializeToString()
+    if len(data) == NUM_LANDMARKS * _RECORD_SIZE and all(
+        data[offset::_RECORD_SIZE] == tag * NUM_LANDMARKS
+        for offset, tag in _RECORD_TAGS
+    ):
+        return np.ndarray(
+            (NUM_LANDMARKS, 3),
+            dtype="<f4",
+            buffer=data,
+            offset=3,
+            strides=(_RECORD_SIZE, 5),
+        ).astype(np.float32)
+
+    # Landmarks with visibility/presence or missing fields
+    return np.array(
+        [(landmark.x, landmark.y, landmark.z) for landmark in hand_landmarks.landmark],
+        dtype=np.float32,
+    )
+
+
+def array_to_landmarks(hand):
+    """
+    Wrap a (21, 3) array in a MediaPipe NormalizedLandmarkList, e.g. for
+    mp_drawing.draw_landmarks.
+    """
+    from mediapipe.framework.formats import landmark_pb2
+
+    hand_landmarks = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in np.asarray(hand).tolist():
+        hand_landmarks.landmark.add(x=x, y=y, z=z)
+    return hand_landmarks
+
+
+def handedness_labels(results):
+    """
+    :param results: MediaPipe results or HandResults
+    :return: List with 'Left', 'Right' or None for every detected hand
+    """
+    hands = results.multi_hand_landmarks or []
+    handedness = results.multi_handedness
+    if not handedness:
+        return [None] * len(hands)
+    return [
+        label if label is None or isinstance(label, str) else label.classification[0].label
+        for label in handedness
+    ]
+
+
+def fingers_extended(hands, handedness=None):
+    """
+    Test which fingers are extended.
+    The thumb counts as extended when its tip is beyond its IP joint, away
+    from the palm: left of it for a left hand in the mirrored image, right of
+    it for a right hand; other fingers when the tip is above the PIP joint.
+    :param hands: Landmark array of shape (..., 21, 3)
+    :param handedness: 'Left', 'Right' or None (treated as left) for a single
+        hand; a sequence of those for a stack
+    :return: Boolean array of shape (..., 5) for thumb, index, middle, ring, pinky
+    """
+    hands = np.asarray(hands)
+    extended = np.empty(hands.shape[:-2] + (5,), dtype=bool)
+    np.less(hands[..., THUMB_TIP, 0], hands[..., THUMB_IP, 0], out=extended[..., 0])
+    if handedness is not None:
+        extended[..., 0] ^= np.equal(handedness, "Right")
+    np.less(hands[..., FINGER_TIPS, 1], hands[..., FINGER_PIPS, 1], out=extended[..., 1:])
+    return extended
+
+
+def finger_states(hands, handedness=None):
+    """
+    Index hands into a gesture table: one bit per extended finger (thumb 1
+    to pinky 16) plus 32 for a right hand.
+    :param hands: A single (21, 3) landmark array, or a stack of shape (N, 21, 3)
+    :param handedness: 'Left', 'Right' or None for a single hand; a sequence
+        of those for a stack
+    :return: int for a single hand; an intp array for a stack
+    """
+    hands = np.asarray(hands)
+    if hands.ndim == 2:
+        # Scalar path for the per-frame case: plain float comparisons are
+        # cheaper than numpy's on a handful of values
+        (ip_x, _, _), (tip_x, _, _) = hands[THUMB_IP : THUMB_TIP + 1].tolist()
+        y = hands[:, 1].tolist()
+        if handedness == "Right":
+            state = RIGHT_HAND | (tip_x > ip_x)
+        else:
+            state = int(tip_x < ip_x)
+        for bit, tip, pip in _FINGER_STATE_BITS:
+            if y[tip] < y[pip]:
+                state |= bit
+        return state
+
+    states = fingers_extended(hands, handedness) @ FINGER_BITS
+    if handedness is not None:
+        states |= np.where(np.equal(handedness, "Right"), RIGHT_HAND, 0)
+    return states
+
+
+def classify_landmarks(hands, handedness=None, table=DEFAULT_TABLE):
+    """
+    Classify gestures from which fingers are extended.
+    :param hands: A single (21, 3) landmark array, or a stack of shape (N, 21, 3)
+        covering several hands or frames
+    :param handedness: 'Left', 'Right' or None for a single hand; a sequence
+        of those for a stack
+    :param table: Compiled gesture table (GestureRules.table); the
+        finger-count gestures by default
+    :return: Gesture name or None for a single hand; an object array of names
+        for a stack
+    """
+    return table[finger_states(hands, handedness)]
@@ -1,109 +1,271 @@
+import threading
+import time
+
 import cv2
-import mediapipe as mp
 import numpy as np
 
-# Initialize MediaPipe Hands and Drawing utils
-mp_drawing = mp.solutions.drawing_utils
-mp_hands = mp.solutions.hands
+from .buffers import BufferPool
+from .landmarks import (
+    classify_landmarks,
+    handedness_labels,
+    landmarks_to_array,
+)
+from .mask import HandMaskRenderer
+from .profiling import StageProfiler
+from .roi import RegionOfInterest
+from .rules import DEFAULT_TABLE, GestureRules
+from .scheduler import InferenceScheduler
+from .swipe import SwipeTracker
 
 
 class GestureRecognizer:
-    def __init__(self):
+    def __init__(
+        self,
+        pipelined=False,
+        queue_size=1,
+        headless=False,
+        target_fps=None,
+        max_skip=8,
+        roi=False,
+        search_scale=0.5,
+        instrument=False,
+        overlay=False,
+        dispatcher=None,
+        debouncer=None,
+        smoother=None,
+        mask=False,
+        backend=None,
+        camera=0,
+        templates=None,
+        rules=None,
+        motion=None,
+        publisher=None,
+        processes=None,
+        tracker=None,
+    ):
+        """
+        :param pipelined: Run capture, inference and display on separate threads
+        :param queue_size: Frames buffered between pipeline stages (newest kept)
+        :param headless: Skip the hand mask and preview window; stop with stop()
+        :param target_fps: If set, only run MediaPipe as often as needed to hold
+            this frame rate and extrapolate hands on the frames in between
+        :param max_skip: Most frames between two MediaPipe runs when target_fps is set
+        :param roi: Run MediaPipe on a crop around the last known hands and search
+            for new hands on a downscaled frame; a preset backend is then built
+            in static image mode, as the crop moves between frames
+        :param search_scale: Resize factor of that downscaled search frame
+        :param instrument: Record per-stage durations, readable through stats()
+        :param overlay: Draw FPS and frame latency onto the preview (implies instrument)
+        :param dispatcher: GestureDispatcher that runs registered functions off the
+            frame loop; they are called synchronously if None
+        :param debouncer: GestureDebouncer that confirms and releases gestures
+            with hysteresis before they reach handle_gesture_states
+        :param smoother: LandmarkSmoother applied to every hand before classification
+        :param mask: Also build the binary hand mask in headless mode, for
+            consumers of hand_mask
+        :param backend: Hand landmark backend: a preset name ('low-latency',
+            'balanced', 'accurate') or a callable returning a HandBackend,
+            e.g. StubBackend; 'balanced' MediaPipe Hands if None
+        :param camera: What run() reads: a camera index, stream URL or video
+            path, or a callable returning a CameraSource, e.g.
+            functools.partial(CameraSource, 0, width=1280, fourcc='MJPG')
+        :param templates: GestureTemplates matched before the built-in
+            finger-count gestures; hands they reject fall back to those
+        :param rules: GestureRules mapping finger states and handedness to
+            gestures; the finger-count gestures if None
+        :param motion: MotionRecognizer matching hand trajectories against
+            motion templates (circles, pinch-and-drag, ...)
+        :param publisher: GesturePublisher streaming every frame's gesture
+            events (and hands, if it sends landmarks) to remote consumers
+        :param processes: Run MediaPipe in this many worker processes, fed
+            frames by a separate capture process (see ParallelPipeline);
+            camera and backend must then be picklable; not combinable with
+            pipelined, target_fps or roi, which the workers do not apply
+        :param tracker: HandTracker giving every hand a stable ID, which then
+            keys swipe, motion and smoothing state and gesture state per hand;
+            created by register_gesture(per_hand=True) if None
+        """
+        if pipelined and processes:
+            raise ValueError("pipelined and processes cannot be combined")
+        if processes and (target_fps or roi):
+            raise ValueError("processes cannot be combined with target_fps or roi")
+        self.pipelined = pipelined
+        self.queue_size = queue_size
+        self.headless = headless
+        self.scheduler = None
+        if target_fps:
+            self.scheduler = InferenceScheduler(target_fps, max_interval=max_skip)
+        self.roi = RegionOfInterest(search_scale) if roi else None
+        self.overlay = overlay
+        self.profiler = StageProfiler() if instrument or overlay else None
+        self.recorder = None
+        self.dispatcher = dispatcher
+        self.debouncer = debouncer
+        self.smoother = smoother
+        self.build_mask = mask
+        self.backend = backend
+        self.camera = camera
+        self.templates = templates
+        self.rules = rules
+        self.motion = motion
+        self.publisher = publisher
+        self.processes = processes
+        # FramePipeline or ParallelPipeline of the last run(), for its fps and
+        # dropped counters
+        self.pipeline = None
+        self.tracker = tracker
+        # One clone of the debouncer per tracked hand, made on first use
+        self._hand_debouncers = None
+        self.mask_renderer = HandMaskRenderer()
+        self._hand_mask = None
+        # Seconds the backend took on the last inferred frame, for the scheduler
+        self._backend_time = 0.0
+        # Hands graph built by warmup(), handed to the next run
+        self._hands = None
+        # Frame-sized arrays reused every frame; the pipeline keeps one set
+        # per frame in flight
+        self.buffers = BufferPool(queue_size + 2 if pipelined else 1)
+        self._stop_event = threading.Event()
         self.custom_functions = {}
+        self.hand_functions = {}
         self.previous_gestures = set()  # Track gestures from the previous frame
-        self.previous_positions = (
-            []
-        )  # Track hand positions across frames for swipe detection
+        # Per-hand, timestamped wrist history for swipe detection
+        self.swipe_tracker = SwipeTracker()
 
-    def register_gesture(self, gesture_name, function):
+    def register_gesture(self, gesture_name, function, per_hand=False):
         """
         Register a custom function for a specific gesture.
         :param gesture_name: Name of the gesture (e.g., 'fist', 'open_palm')
-        :param function: Function to execute when this gesture is detected
+        :param function: Function to execute when this gesture is detected; may
+            be a coroutine function when a dispatcher is used
+        :param per_hand: Call function(hand_id, state) whenever a tracked hand
+            starts or stops making the gesture, instead of function(state)
+            when the first hand starts or the last one stops
         """
-        self.custom_functions[gesture_name] = function
+        if not per_hand:
+            self.custom_functions[gesture_name] = function
+            return
+        if self.tracker is None:
+            from .tracking import HandTracker
 
-    def detect_gesture(self, hand_landmarks):
+            self.tracker = HandTracker()
+        self.hand_functions[gesture_name] = function
+
+    def register_rule(self, gesture_name, fingers, hand=None, function=None):
         """
-        Detect the current gesture based on hand landmarks.
-        :param hand_landmarks: Detected hand landmarks from MediaPipe
-        :return: Gesture name (e.g., 'fist', 'open_palm') or None
+        Define a custom gesture by which fingers are extended. Rules override
+        the finger-count gestures for the shapes they match.
+        :param gesture_name: Name of the new gesture
+        :param fingers: Pattern over thumb, index, middle, ring and pinky, with
+            '1' extended, '0' folded and '*' either (e.g. '10001'), or a
+            number of extended fingers
+        :param hand: 'Left' or 'Right' to only match that hand
+        :param function: Optional function to register for the gesture
         """
-        fingers_extended = []
-
-        # Thumb
-        thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-        thumb_ip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_IP]
-        fingers_extended.append(thumb_tip.x < thumb_ip.x)
-
-        # Other fingers
-        for finger_tip, finger_pip in [
-            (
-                mp_hands.HandLandmark.INDEX_FINGER_TIP,
-                mp_hands.HandLandmark.INDEX_FINGER_PIP,
-            ),
-            (
-                mp_hands.HandLandmark.MIDDLE_FINGER_TIP,
-                mp_hands.HandLandmark.MIDDLE_FINGER_PIP,
-            ),
-            (
-                mp_hands.HandLandmark.RING_FINGER_TIP,
-                mp_hands.HandLandmark.RING_FINGER_PIP,
-            ),
-            (mp_hands.HandLandmark.PINKY_TIP, mp_hands.HandLandmark.PINKY_PIP),
-        ]:
-            tip = hand_landmarks.landmark[finger_tip]
-            pip = hand_landmarks.landmark[finger_pip]
-            fingers_extended.append(tip.y < pip.y)
-
-        extended_count = sum(fingers_extended)
-
-        if extended_count == 0:
-            return "fist"
-        elif extended_count == 5:
-            return "open_palm"
-        elif extended_count == 4:
-            return "four_fingers"
-        elif extended_count == 3:
-            return "three_fingers"
-        elif extended_count == 2:
-            return "two_fingers"
-        return None
-
-    def detect_swipe(self, hand_landmarks):
-        """
-        Detect left or right swipes based on the motion of the hand landmarks.
-        :param hand_landmarks: Detected hand landmarks from MediaPipe
-        :return: 'left_swipe', 'right_swipe', or None
+        if self.rules is None:
+            self.rules = GestureRules()
+        self.rules.add(gesture_name, fingers, hand)
+        if function is not None:
+            self.register_gesture(gesture_name, function)
+
+    def register_template(self, gesture_name, examples, function=None):
+        """
+        Define a custom gesture by recorded examples of it.
+        :param gesture_name: Name of the new gesture
+        :param examples: (21, 3) landmark array, a stack of shape (N, 21, 3),
+            or a path to a recording written by LandmarkRecorder
+        :param function: Optional function to register for the gesture
+        """
+        if self.templates is None:
+            from .templates import GestureTemplates
+
+            self.templates = GestureTemplates()
+        self.templates.add(gesture_name, examples)
+        if function is not None:
+            self.register_gesture(gesture_name, function)
+
+    def register_motion(self, gesture_name, landmarks, timestamps=None, function=None):
+        """
+        Define a motion gesture by a recorded performance of it.
+        :param gesture_name: Name of the new gesture
+        :param landmarks: Landmark track of shape (T, 21, 3), or a path to a
+            recording written by LandmarkRecorder
+        :param timestamps: Capture times of the track in seconds
+        :param function: Optional function to register for the gesture
         """
-        # Use the wrist position for swipe detection
-        wrist = hand_landmarks.landmark[mp_hands.HandLandmark.WRIST]
-        current_position = (wrist.x, wrist.y)
+        if self.motion is None:
+            from .motion import MotionRecognizer
 
-        if self.previous_positions:
-            # Calculate motion direction
-            prev_position = self.previous_positions[-1]
-            dx = current_position[0] - prev_position[0]
+            self.motion = MotionRecognizer()
+        self.motion.add(gesture_name, landmarks, timestamps)
+        if function is not None:
+            self.register_gesture(gesture_name, function)
 
-            # Determine swipe direction
-            if dx > 0.1:  # Adjust threshold for sensitivity
-                return "right_swipe"
-            elif dx < -0.1:
-                return "left_swipe"
+    def detect_gesture(self, hand_landmarks, handedness=None):
+        """
+        Detect the current gesture based on hand landmarks.
+        :param hand_landmarks: Detected hand landmarks from MediaPipe, or a
+            (21, 3) array from landmarks_to_array
+        :param handedness: 'Left', 'Right' or None (treated as left)
+        :return: Gesture name (e.g., 'fist', 'open_palm') or None
+        """
+        hand = landmarks_to_array(hand_landmarks)
+        if self.templates is not None and len(self.templates):
+            gesture = self.templates.classify(hand)
+            if gesture is not None:
+                return gesture
+        return classify_landmarks(hand, handedness, self._gesture_table())
+
+    def detect_gestures(self, hands, handedness=None):
+        """
+        Classify a whole stack of hands or frames in one vectorized call.
+        :param hands: Landmark array of shape (N, 21, 3)
+        :param handedness: Sequence of N 'Left', 'Right' or None labels
+        :return: Object array of N gesture names (or None)
+        """
+        gestures = classify_landmarks(hands, handedness, self._gesture_table())
+        if self.templates is not None and len(self.templates):
+            matched = self.templates.classify(hands)
+            gestures = np.where(np.equal(matched, None), gestures, matched)
+        return gestures
 
-        # Store the current position for the next frame
-        self.previous_positions.append(current_position)
+    def _gesture_table(self):
+        return DEFAULT_TABLE if self.rules is None else self.rules.table
 
-        # Keep position history manageable
-        if len(self.previous_positions) > 5:  # Adjust buffer size if needed
-            self.previous_positions.pop(0)
+    def detect_swipe(self, hand_landmarks, hand_id=0, timestamp=None):
+        """
+        Detect left or right swipes from the wrist velocity over recent frames.
+        :param hand_landmarks: Detected hand landmarks from MediaPipe, or a
+            (21, 3) array from landmarks_to_array
+        :param hand_id: Key identifying the hand across frames, so several hands
+            keep separate motion histories
+        :param timestamp: Capture time in seconds (defaults to now)
+        :return: 'left_swipe', 'right_swipe', or None
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        return self.swipe_tracker.update(hand_landmarks, timestamp, hand_id)
 
-        return None
+    def detect_motion(self, hand_landmarks, hand_id=0, timestamp=None):
+        """
+        Match the hand's recent trajectory against the motion templates.
+        :param hand_landmarks: Detected hand landmarks from MediaPipe, or a
+            (21, 3) array from landmarks_to_array
+        :param hand_id: Key identifying the hand across frames
+        :param timestamp: Capture time in seconds (defaults to now)
+        :return: Name of the motion gesture completed in this frame, or None
+        """
+        if self.motion is None:
+            return None
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        return self.motion.update(hand_landmarks, timestamp, hand_id)
 
     def handle_gesture_states(self, current_gestures):
         """
         Handle gesture state changes (appear, persist, disappear).
         :param current_gestures: Set of gestures detected in the current frame
+        :return: List of (gesture, 'appear' | 'disappear') events, registered or not
         """
         # Detect newly appeared gestures
         new_gestures = current_gestures - self.previous_gestures
@@ -111,87 +273,502 @@ class GestureRecognizer:
         # Detect disappeared gestures
         disappeared_gestures = self.previous_gestures - current_gestures
 
+        events = []
+
         # Handle new gestures
         for gesture in new_gestures:
+            events.append((gesture, "appear"))
             if gesture in self.custom_functions:
-                self.custom_functions[gesture]("appear")
+                self._call_gesture(gesture, "appear")
 
         # Handle disappeared gestures
         for gesture in disappeared_gestures:
+            events.append((gesture, "disappear"))
             if gesture in self.custom_functions:
-                self.custom_functions[gesture]("disappear")
+                self._call_gesture(gesture, "disappear")
 
         # Update previous gestures
         self.previous_gestures = current_gestures
 
+        if self.tracker is not None:
+            for hand_id, gesture, state in self.tracker.transitions():
+                if gesture in self.hand_functions:
+                    self._call_hand_gesture(gesture, hand_id, state)
+        return events
+
+    def stop(self):
+        """
+        Ask a running run() loop to exit after the current frame.
+        Safe to call from gesture callbacks or any other thread.
+        """
+        self._stop_event.set()
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    @property
+    def hand_mask(self):
+        """
+        Binary hand mask of the last finished frame: a (height, width) uint8
+        array, 255 on the hand skeletons. Built whenever the preview is shown,
+        or in headless mode with mask=True; None before the first such frame.
+        The array is reused by later frames, so copy it to keep it.
+        """
+        return self._hand_mask
+
+    def stats(self):
+        """
+        Frame rate and per-stage latency percentiles recorded so far.
+        Stages are capture (waiting for a new frame), convert, inference,
+        classify, callbacks, render, display, plus frame for the whole loop
+        iteration and glass_to_inference, the age of each frame (from its
+        capture timestamp) when inference starts.
+        :return: Dict with 'fps', 'frames' and 'stages', or None if the
+            recognizer was created without instrument=True
+        """
+        if self.profiler is None:
+            return None
+        return self.profiler.stats()
+
+    def attach_profiler(self, stage, hook):
+        """
+        Run a reusable context manager (e.g. cProfile.Profile()) around every
+        run of one stage. Requires instrument=True.
+        :param stage: Stage name as reported by stats()
+        :param hook: Context manager, or None to detach
+        """
+        if self.profiler is None:
+            raise RuntimeError("Create the GestureRecognizer with instrument=True")
+        self.profiler.attach(stage, hook)
+
+    def start_recording(self, path, max_hands=2):
+        """
+        Save landmarks, handedness and timestamps of every processed frame.
+        :param path: Recording file to create, readable with LandmarkReplay
+        :param max_hands: Hands stored per frame
+        """
+        from .recording import LandmarkRecorder
+
+        self.stop_recording()
+        self.recorder = LandmarkRecorder(path, max_hands=max_hands)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def replay(self, path):
+        """
+        Feed a recording through detect_gesture/detect_swipe/handle_gesture_states
+        as fast as the CPU allows, without camera or MediaPipe.
+        :param path: Recording written by start_recording or LandmarkRecorder
+        :return: Generator of FrameResult, one per recorded frame
+        """
+        from .recording import replay
+
+        return replay(self, path)
+
+    def warmup(self, width=640, height=480):
+        """
+        Build the hand backend (the MediaPipe graph) and push a blank frame through
+        conversion, inference, classification and (unless headless) the mask,
+        so that model loading and first-run allocations happen before the
+        camera opens instead of on the first real frame. The graph is then
+        used by the next run() or process_video(). Gesture state, callbacks
+        and instrumentation are left untouched.
+        :param width: Width of the dummy frame; use the camera's resolution
+        :param height: Height of the dummy frame
+        :return: Seconds taken
+        """
+        start = time.perf_counter()
+        if self._hands is None:
+            self._hands = self._create_hands()
+
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        buffers = self.buffers.acquire(frame)
+        _, results = self._detect(self._hands, frame, buffers=buffers)
+        classify_landmarks(np.zeros((1, 21, 3), dtype=np.float32))
+        if not self.headless or self.build_mask:
+            self.mask_renderer.render(buffers.mask, [np.full((21, 3), 0.5)])
+            buffers.clear_mask()
+        if self.profiler is not None:
+            # Keep the warm-up out of the latency statistics
+            self.profiler.reset()
+        return time.perf_counter() - start
+
+    def _create_hands(self):
+        from .backends import create_backend
+
+        # MediaPipe's tracking would follow hands in the coordinates of the
+        # previous crop, which moves every frame; the crop does the tracking
+        return create_backend(self.backend, static_image_mode=self.roi is not None)
+
+    def _take_hands(self):
+        """
+        :return: The Hands graph built by warmup(), or a new one; either way
+            the caller owns it and closes it
+        """
+        hands, self._hands = self._hands, None
+        if hands is None:
+            hands = self._create_hands()
+        return hands
+
+    def _open_camera(self, hold=1):
+        """
+        :param hold: Frames read() must leave untouched, see CameraSource
+        :return: A started CameraSource for `camera`; the caller closes it
+        """
+        from .capture import CameraSource
+
+        if callable(self.camera):
+            return self.camera().start()
+        return CameraSource(self.camera, hold=hold).start()
+
+    def _read_frame(self, camera, timeout=None):
+        """
+        Take the newest frame from a CameraSource, timing the wait as the
+        capture stage and the frame's age as glass_to_inference.
+        :return: (frame, capture timestamp), or None if no frame came
+        """
+        item = self._stage("capture", camera.read, timeout)
+        if item is not None and self.profiler is not None:
+            # How old the frame is when inference picks it up
+            self.profiler.record(
+                "glass_to_inference", int((time.perf_counter() - item[1]) * 1e9)
+            )
+        return item
+
+    def _stage(self, stage, function, *args):
+        # Straight call when instrumentation is off
+        if self.profiler is None:
+            return function(*args)
+        return self.profiler.call(stage, function, *args)
+
+    def _call_gesture(self, gesture, state):
+        function = self.custom_functions[gesture]
+        if self.dispatcher is None:
+            function(state)
+        else:
+            self.dispatcher.submit(gesture, function, state)
+
+    def _call_hand_gesture(self, gesture, hand_id, state):
+        function = self.hand_functions[gesture]
+        if self.dispatcher is None:
+            function(hand_id, state)
+        else:
+            # Keyed per hand so each hand's events for a gesture stay ordered
+            self.dispatcher.submit(
+                (hand_id, gesture), lambda state: function(hand_id, state), state
+            )
+
+    def _detect(self, hands, frame, flip=True, buffers=None):
+        """
+        Convert a BGR frame to RGB (mirrored by default) and run MediaPipe Hands.
+        :param hands: An open HandBackend or mp_hands.Hands instance
+        :param frame: BGR frame as returned by cv2.VideoCapture.read
+        :param flip: Mirror the frame horizontally, as for a selfie camera
+        :param buffers: FrameBuffers to convert into; taken from the pool if None
+        :return: Tuple of (RGB image, MediaPipe results); the image is reused
+            by later frames
+        """
+        if buffers is None:
+            buffers = self.buffers.acquire(frame)
+        image = self._stage("convert", self._convert, frame, flip, buffers)
+        image.flags.writeable = False
+        results = self._stage("inference", self._process, hands, image)
+        image.flags.writeable = True
+        return image, results
+
+    def _convert(self, frame, flip, buffers):
+        # The mirrored BGR frame lands in the display buffer on the way
+        return buffers.convert(frame, flip, display=not self.headless)
+
+    def _process(self, hands, image):
+        if self.roi is None:
+            return self._run_backend(hands, image)
+        inference_image, region = self.roi.prepare(image)
+        return self.roi.map_results(
+            self._run_backend(hands, inference_image),
+            region,
+            (image.shape[1], image.shape[0]),
+        )
+
+    def _run_backend(self, hands, image):
+        if self.scheduler is None:
+            return hands.process(image)
+        # The scheduler budgets for the backend alone, not the conversion
+        # and cropping around it
+        start = time.perf_counter()
+        results = hands.process(image)
+        self._backend_time = time.perf_counter() - start
+        return results
+
+    def _infer(self, hands, frame, timestamp=None):
+        """
+        Mirror a BGR camera frame and run MediaPipe Hands on it.
+        :param hands: An open HandBackend or mp_hands.Hands instance
+        :param frame: BGR frame as returned by cv2.VideoCapture.read
+        :param timestamp: Capture time of the frame in seconds, on the
+            time.perf_counter() clock; now if None
+        :return: Tuple of (BGR display image, MediaPipe results); in headless
+            mode the image is the frame's empty mask buffer with mask=True,
+            otherwise None
+        """
+        buffers = self.buffers.acquire(frame)
+        scheduler = self.scheduler
+        if scheduler is not None:
+            if timestamp is None:
+                timestamp = time.perf_counter()
+            if not scheduler.should_infer(timestamp):
+                # Skipped frame: only mirror it for display, no colour round trip
+                results = scheduler.predict(timestamp)
+                if self.headless:
+                    return (buffers.mask if self.build_mask else None), results
+                return buffers.mirror(frame), results
+
+        _, results = self._detect(hands, frame, buffers=buffers)
+        if scheduler is not None:
+            scheduler.update(timestamp, results, self._backend_time)
+
+        if self.headless:
+            return (buffers.mask if self.build_mask else None), results
+
+        # The mirrored BGR frame was kept during conversion
+        return buffers.display, results
+
+    def _recognize(self, results, timestamp=None):
+        """
+        Run gesture and swipe detection on every detected hand.
+        :param results: MediaPipe Hands results for one frame
+        :param timestamp: Capture time of the frame in seconds (defaults to now)
+        :return: Set of gestures detected in the frame (confirmed ones only when
+            a debouncer is set)
+        """
+        current_gestures = set()  # Track gestures in the current frame
+        hand_gestures = {}  # tracked hand ID -> its gestures in this frame
+        if timestamp is None:
+            timestamp = time.perf_counter()
+
+        if results.multi_hand_landmarks:
+            # Convert once and share the arrays between detectors
+            hands = [landmarks_to_array(hand) for hand in results.multi_hand_landmarks]
+            labels = handedness_labels(results)
+            tracker = self.tracker
+            if tracker is not None:
+                # Untracked extra hands get negative keys of their own
+                hand_ids = [
+                    hand_id if hand_id >= 0 else -1 - index
+                    for index, hand_id in enumerate(tracker.update(hands, labels, timestamp))
+                ]
+            else:
+                # Key swipe histories by handedness, or by detection order when
+                # handedness is missing or ambiguous
+                hand_ids = labels
+                if None in labels or len(set(labels)) < len(labels):
+                    hand_ids = range(len(labels))
+
+            for hand, label, hand_id in zip(hands, labels, hand_ids):
+                if self.smoother is not None:
+                    hand = self.smoother.smooth(hand, timestamp, hand_id)
+
+                # Detect gesture
+                gesture = self.detect_gesture(hand, label)
+
+                if gesture:
+                    current_gestures.add(gesture)
+
+                # Detect swipes
+                swipe = self.detect_swipe(hand, hand_id, timestamp)
+                if swipe:
+                    current_gestures.add(swipe)
+
+                motion = None
+                if self.motion is not None:
+                    motion = self.motion.update(hand, timestamp, hand_id)
+                    if motion:
+                        current_gestures.add(motion)
+
+                if tracker is not None and hand_id >= 0:
+                    hand_gestures[hand_id] = {name for name in (gesture, swipe, motion) if name}
+
+        self.swipe_tracker.prune(timestamp)
+        if self.motion is not None:
+            self.motion.prune(timestamp)
+        if self.smoother is not None:
+            self.smoother.prune(timestamp)
+        if self.debouncer is not None:
+            current_gestures = self.debouncer.update(current_gestures, timestamp)
+        if self.tracker is not None:
+            self._mark_hands(hand_gestures, timestamp)
+        return current_gestures
+
+    def _mark_hands(self, hand_gestures, timestamp):
+        """
+        Record every tracked hand's gestures, each hand through its own copy
+        of the debouncer when one is set.
+        :param hand_gestures: Dict of hand ID -> set of gestures in this frame
+        """
+        tracker = self.tracker
+        if self.debouncer is None:
+            for hand_id, gestures in hand_gestures.items():
+                for gesture in gestures:
+                    tracker.mark(hand_id, gesture)
+            return
+        debouncers = self._hand_debouncers
+        if debouncers is None or len(debouncers) != tracker.max_hands:
+            debouncers = self._hand_debouncers = [
+                self.debouncer.clone() for _ in range(tracker.max_hands)
+            ]
+        # A slot taken by a new hand starts from scratch
+        for hand_id in tracker.claimed:
+            debouncers[hand_id].reset()
+        # Hands missing from this frame count down towards release too
+        for hand_id, debouncer in enumerate(debouncers):
+            for gesture in debouncer.update(hand_gestures.get(hand_id, set()), timestamp):
+                tracker.mark(hand_id, gesture)
+
+    def _render(self, image, results):
+        """
+        Build the side-by-side view of the frame and its binary hand mask.
+        :param image: BGR display image
+        :param results: MediaPipe Hands results for the same frame
+        :return: Combined BGR view, a buffer reused by later frames
+        """
+        # Images from _infer already sit in the left half of their canvas
+        buffers = self.buffers.owner(image)
+        if buffers is None:
+            buffers = self.buffers.acquire(image)
+
+        self._draw_mask(buffers.mask, results)
+
+        # Expand the mask into the right half of the canvas
+        return buffers.combine(image)
+
+    def _draw_mask(self, mask, results):
+        """
+        Rasterise every detected hand into a cleared single-channel mask.
+        :param mask: uint8 array of the frame's height and width
+        :param results: MediaPipe Hands results for the same frame
+        :return: The mask, which also becomes hand_mask
+        """
+        mask.fill(0)
+        self.mask_renderer.render(mask, results.multi_hand_landmarks)
+        self._hand_mask = mask
+        return mask
+
+    def _draw_overlay(self, view):
+        stats = self.profiler.stats()
+        frame = stats["stages"].get("frame", {})
+        inference = stats["stages"].get("inference", {})
+        age = stats["stages"].get("glass_to_inference", {})
+        text = (
+            "FPS %.1f  frame p50 %.1f ms  p95 %.1f ms  inference p50 %.1f ms  "
+            "glass-to-inference p50 %.1f ms"
+            % (
+                stats["fps"],
+                frame.get("p50_ms", 0.0),
+                frame.get("p95_ms", 0.0),
+                inference.get("p50_ms", 0.0),
+                age.get("p50_ms", 0.0),
+            )
+        )
+        cv2.putText(
+            view,
+            text,
+            (10, 25),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.6,
+            (0, 255, 0),
+            2,
+            cv2.LINE_AA,
+        )
+
+    def _show(self, view, wait_ms):
+        cv2.imshow("Hand Gesture Recognition and Mask", view)
+
+        # Exit on pressing 'ESC'
+        return cv2.waitKey(wait_ms) & 0xFF != 27
+
+    def _finish_frame(self, image, results, timestamp, wait_ms=5):
+        """
+        Classify, dispatch and (unless headless) display one inferred frame.
+        :param timestamp: Capture time of the frame in seconds
+        :return: False if the user pressed ESC
+        """
+        if self.recorder is not None:
+            self.recorder.write(timestamp, results)
+
+        current_gestures = self._stage("classify", self._recognize, results, timestamp)
+
+        # Handle gesture states
+        events = self._stage("callbacks", self.handle_gesture_states, current_gestures)
+        if self.publisher is not None:
+            # Only queues the frame; encoding and sending run on its thread
+            self.publisher.publish(timestamp, events, current_gestures, results)
+
+        keep_running = True
+        if self.headless:
+            if image is not None:
+                # The frame's mask buffer, requested with mask=True
+                self._stage("render", self._draw_mask, image, results)
+        else:
+            combined_view = self._stage("render", self._render, image, results)
+            if self.overlay:
+                self._draw_overlay(combined_view)
+            keep_running = self._stage("display", self._show, combined_view, wait_ms)
+
+        if self.profiler is not None:
+            self.profiler.frame_done()
+        return keep_running
+
+    def process_video(self, path, hands=None, flip=True, include_landmarks=True):
+        """
+        Run recognition over a recorded video file instead of the camera.
+        Registered gesture functions are called as in run().
+        :param path: Path of any video cv2.VideoCapture can open
+        :param hands: Open HandBackend or mp_hands.Hands to reuse; if None the
+            backend built by warmup() or a new one is used
+        :param flip: Mirror frames like the live camera view
+        :param include_landmarks: Attach the (N, 21, 3) landmark array to results
+        :return: Generator of FrameResult, one per decoded frame
+        """
+        from .video import process_video
+
+        return process_video(
+            self, path, hands=hands, flip=flip, include_landmarks=include_landmarks
+        )
+
     def run(self):
-        cap = cv2.VideoCapture(0)
-        with mp_hands.Hands(
-            min_detection_confidence=0.5, min_tracking_confidence=0.5
-        ) as hands:
-            while cap.isOpened():
-                success, image = cap.read()
-                if not success:
-                    print("Ignoring empty camera frame.")
-                    continue
-
-                # Flip and process the image
-                image = cv2.cvtColor(cv2.flip(image, 1), cv2.COLOR_BGR2RGB)
-                image.flags.writeable = False
-                results = hands.process(image)
-
-                # Convert back to BGR for display
-                image.flags.writeable = True
-                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-                # Initialize the hand mask
-                hand_mask = np.zeros_like(image)
-                current_gestures = set()  # Track gestures in the current frame
-
-                if results.multi_hand_landmarks:
-                    for hand_landmarks in results.multi_hand_landmarks:
-                        # Detect gesture
-                        gesture = self.detect_gesture(hand_landmarks)
-
-                        if gesture:
-                            current_gestures.add(gesture)
-
-                        # Detect swipes
-                        swipe = self.detect_swipe(hand_landmarks)
-                        if swipe:
-                            current_gestures.add(swipe)
-
-                        # Draw landmarks on the mask
-                        mp_drawing.draw_landmarks(
-                            hand_mask,
-                            hand_landmarks,
-                            mp_hands.HAND_CONNECTIONS,
-                            mp_drawing.DrawingSpec(
-                                color=(255, 255, 255), thickness=2, circle_radius=2
-                            ),
-                            mp_drawing.DrawingSpec(
-                                color=(255, 255, 255), thickness=2, circle_radius=2
-                            ),
-                        )
-
-                # Handle gesture states
-                self.handle_gesture_states(current_gestures)
-
-                # Convert hand mask to grayscale
-                gray_hand_mask = cv2.cvtColor(hand_mask, cv2.COLOR_BGR2GRAY)
-                _, binary_hand_mask = cv2.threshold(
-                    gray_hand_mask, 10, 255, cv2.THRESH_BINARY
-                )
-
-                # Combine the original image and the mask for display
-                combined_view = np.hstack(
-                    (image, cv2.cvtColor(binary_hand_mask, cv2.COLOR_GRAY2BGR))
-                )
-                cv2.imshow("Hand Gesture Recognition and Mask", combined_view)
-
-                # Exit on pressing 'ESC'
-                if cv2.waitKey(5) & 0xFF == 27:
-                    break
-
-        cap.release()
-        cv2.destroyAllWindows()
+        self._stop_event.clear()
+        if self.pipelined:
+            from .pipeline import FramePipeline
+
+            self.pipeline = FramePipeline(self, queue_size=self.queue_size)
+            self.pipeline.run()
+            return
+        if self.processes:
+            from .parallel import ParallelPipeline
+
+            self.pipeline = ParallelPipeline(self, workers=self.processes)
+            self.pipeline.run()
+            return
+
+        camera = self._open_camera()
+        try:
+            with self._take_hands() as hands:
+                while not self._stop_event.is_set():
+                    item = self._read_frame(camera, timeout=0.1)
+                    if item is None:
+                        if camera.finished:
+                            break
+                        continue
+                    frame, timestamp = item
+
+                    image, results = self._infer(hands, frame, timestamp)
+                    if not self._finish_frame(image, results, timestamp):
+                        break
+        finally:
+            camera.close()
+        if not self.headless:
+            cv2.destroyAllWindows()
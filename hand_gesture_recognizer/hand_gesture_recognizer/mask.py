@@ -0,0 +1,104 @@
+import cv2
+import numpy as np
+
+from .landmarks import landmarks_to_array
+
+# mp.solutions.hands.HAND_CONNECTIONS as (start, end) landmark indices
+HAND_CONNECTIONS = np.array(
+    [
+        (0, 1), (1, 2), (2, 3), (3, 4),
+        (0, 5), (5, 6), (6, 7), (7, 8),
+        (5, 9), (9, 10), (10, 11), (11, 12),
+        (9, 13), (13, 14), (14, 15), (15, 16),
+        (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+    ],
+    dtype=np.intp,
+)
+
+
+def landmarks_to_pixels(hands, width, height):
+    """
+    Map normalized landmarks to pixel coordinates the way mp_drawing does.
+    :param hands: Landmark array of shape (N, 21, 3)
+    :return: Tuple of (N, 21, 2) int32 pixel coordinates and an (N, 21)
+        boolean array, False for landmarks outside the image
+    """
+    points = np.asarray(hands)[..., :2].astype(np.float64)
+    inside = ((points >= 0.0) & (points <= 1.0)).all(axis=-1)
+    pixels = np.floor(points * (width, height)).astype(np.int32)
+    np.minimum(pixels, (width - 1, height - 1), out=pixels)
+    return pixels, inside
+
+
+class HandMaskRenderer:
+    """
+    Rasterises hand skeletons straight into a single-channel uint8 mask.
+    All bones of all hands are drawn in one cv2.polylines call, and the
+    landmark circles are stamped from a precomputed footprint with one
+    vectorized assignment. The result matches what mp_drawing.draw_landmarks
+    with white DrawingSpecs followed by a grey conversion and threshold gives,
+    without the 3-channel image and the extra full-frame passes.
+    """
+
+    def __init__(self, thickness=2, circle_radius=2):
+        """
+        :param thickness: Width of the bones and the landmark circle outlines
+        :param circle_radius: Landmark circle radius; like mp_drawing, a
+            slightly larger border circle is drawn around it
+        """
+        self.thickness = thickness
+        self.circle_radius = circle_radius
+
+        # Pixels covered by both of mp_drawing's circles around one landmark
+        border_radius = max(circle_radius + 1, int(circle_radius * 1.2))
+        reach = border_radius + thickness
+        stamp = np.zeros((2 * reach + 1, 2 * reach + 1), dtype=np.uint8)
+        cv2.circle(stamp, (reach, reach), border_radius, 255, thickness)
+        cv2.circle(stamp, (reach, reach), circle_radius, 255, thickness)
+        self._border_radius = border_radius
+        self._reach = reach
+        dy, dx = np.nonzero(stamp)
+        self._stamp_dx = (dx - reach).astype(np.int32)
+        self._stamp_dy = (dy - reach).astype(np.int32)
+
+    def render(self, mask, hands):
+        """
+        Draw hands into a mask; the mask is not cleared first.
+        :param mask: uint8 array of shape (height, width), drawn in place
+        :param hands: (N, 21, 3) landmark array, or a list of MediaPipe
+            landmark lists or (21, 3) arrays
+        :return: The mask
+        """
+        if hands is None or not len(hands):
+            return mask
+        if not isinstance(hands, np.ndarray):
+            hands = np.stack([landmarks_to_array(hand) for hand in hands])
+        height, width = mask.shape[:2]
+        pixels, inside = landmarks_to_pixels(hands.reshape(-1, 21, 3), width, height)
+
+        # Bones whose two ends are both inside the image
+        start, end = HAND_CONNECTIONS[:, 0], HAND_CONNECTIONS[:, 1]
+        drawn = inside[:, start] & inside[:, end]
+        segments = np.stack((pixels[:, start], pixels[:, end]), axis=2)[drawn]
+        if len(segments):
+            cv2.polylines(mask, list(segments), False, 255, self.thickness)
+
+        # Landmark circles: stamped where the footprint fits, drawn by OpenCV
+        # near the border, where its clipping changes the circle's shape
+        points = pixels[inside]
+        reach = self._reach
+        interior = (
+            (points[:, 0] >= reach)
+            & (points[:, 0] < width - reach)
+            & (points[:, 1] >= reach)
+            & (points[:, 1] < height - reach)
+        )
+        stamped = points[interior]
+        mask[
+            (stamped[:, 1, None] + self._stamp_dy).ravel(),
+            (stamped[:, 0, None] + self._stamp_dx).ravel(),
+        ] = 255
+        for x, y in points[~interior].tolist():
+            cv2.circle(mask, (x, y), self._border_radius, 255, self.thickness)
+            cv2.circle(mask, (x, y), self.circle_radius, 255, self.thickness)
+        return mask
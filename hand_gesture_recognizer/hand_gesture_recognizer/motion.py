@@ -0,0 +1,319 @@
+import math
+
+import numpy as np
+
+from .landmarks import THUMB_TIP, WRIST, landmarks_to_array
+
+INDEX_TIP = 8
+MIDDLE_MCP = 9
+# Wrist and finger MCP joints, whose mean is a palm centre that does not move
+# with the fingers
+PALM = [WRIST, 5, MIDDLE_MCP, 13, 17]
+
+# Palm velocity is measured in palm lengths per second, which makes it
+# independent of the distance to the camera; this brings a brisk swipe
+# (about 4 palm lengths per second) to the range of the pinch aperture
+VELOCITY_SCALE = 0.25
+FEATURES = 3
+
+
+def hand_geometry(hands):
+    """
+    :param hands: Landmark array of shape (..., 21, 3)
+    :return: (palm centre (..., 2), palm length (...), pinch aperture (...)), the
+        aperture being the thumb to index fingertip distance in palm lengths
+    """
+    hands = np.asarray(hands, dtype=np.float64)
+    if hands.ndim == 2:
+        # Scalar path for the per-frame case
+        points = hands[:, :2].tolist()
+        centre = np.array(
+            [sum(points[index][axis] for index in PALM) / len(PALM) for axis in (0, 1)]
+        )
+        size = max(math.dist(points[MIDDLE_MCP], points[WRIST]), 1e-6)
+        return centre, size, math.dist(points[THUMB_TIP], points[INDEX_TIP]) / size
+    centre = hands[..., PALM, :2].mean(axis=-2)
+    size = np.linalg.norm(hands[..., MIDDLE_MCP, :2] - hands[..., WRIST, :2], axis=-1)
+    size = np.maximum(size, 1e-6)
+    aperture = np.linalg.norm(hands[..., THUMB_TIP, :2] - hands[..., INDEX_TIP, :2], axis=-1)
+    return centre, size, aperture / size
+
+
+def motion_features(landmarks, timestamps, rate=30.0):
+    """
+    Resample a hand's landmark track to `rate` samples per second and turn it
+    into motion features: palm velocity (x, y) and pinch aperture.
+    :param landmarks: Landmark array of shape (T, 21, 3)
+    :param timestamps: Capture times in seconds, shape (T,)
+    :param rate: Sample rate the features are taken at
+    :return: float32 array of shape (N, 3)
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    centre, size, aperture = hand_geometry(landmarks)
+    times = np.arange(timestamps[0], timestamps[-1] + 0.5 / rate, 1.0 / rate)
+    if len(times) < 2:
+        raise ValueError("A motion needs at least two samples at %g Hz" % rate)
+    centre = np.stack([np.interp(times, timestamps, centre[:, axis]) for axis in (0, 1)], 1)
+    size = np.interp(times, timestamps, size)
+    aperture = np.interp(times, timestamps, aperture)
+
+    features = np.empty((len(times) - 1, FEATURES), dtype=np.float32)
+    velocity = np.diff(centre, axis=0) * (rate * VELOCITY_SCALE) / size[1:, None]
+    features[:, :2] = _compress(velocity)
+    features[:, 2] = aperture[1:]
+    return features
+
+
+def _compress(velocity):
+    # Square root of the speed, direction kept: the same motion performed
+    # somewhat faster or slower stays close to its template
+    speed = np.sqrt(np.linalg.norm(velocity, axis=-1, keepdims=True))
+    return velocity / np.maximum(speed, 1e-9)
+
+
+class _MotionState:
+    """Warping costs of one hand against every template."""
+
+    __slots__ = ("costs", "floor", "time", "centre", "aperture", "holdoff")
+
+    def __init__(self, shape):
+        # costs[k, i]: cheapest warping path ending at sample i of template k
+        self.costs = np.full(shape, np.inf)
+        # Cost of every template's cheapest live path, inf if it has none
+        self.floor = np.full(shape[0], np.inf)
+        self.time = None  # time, palm centre and aperture of the last sample
+        self.centre = None
+        self.aperture = None
+        self.holdoff = 0  # samples left before new paths may start
+
+    def reset(self):
+        self.costs.fill(np.inf)
+        self.floor.fill(np.inf)
+        self.time = None
+        self.holdoff = 0
+
+
+class MotionRecognizer:
+    """
+    Streaming recognition of motion gestures such as circles, vertical swipes
+    or pinch-and-drag, against templates recorded as landmark tracks.
+    Every hand's palm velocity and pinch aperture are sampled at a fixed rate
+    and matched with subsequence dynamic time warping, updated incrementally:
+    each sample extends the warping paths of all templates at once, in
+    O(templates x template length), with no history kept. Paths may advance
+    0, 1 or 2 template samples per input sample, so a motion is recognised
+    from twice as fast as recorded to slower than recorded. Paths whose cost
+    exceeds a template's budget are abandoned, and templates are skipped
+    entirely while the current sample lies too far from all of their samples
+    for any path to survive.
+    """
+
+    def __init__(self, threshold=0.3, rate=30.0, stale_after=0.5):
+        """
+        :param threshold: Largest mean feature distance per template sample
+            for a match; a template of n samples may accumulate n * threshold
+        :param rate: Samples per second; frames closer together than 3/4 of a
+            sample interval are skipped and frames further apart are split
+            into several samples, so templates match at any frame rate
+        :param stale_after: Seconds without updates after which a hand's
+            paths are discarded
+        """
+        self.threshold = threshold
+        self.rate = rate
+        self.stale_after = stale_after
+        self.names = []  # gesture name of every template
+        self._sequences = []
+        self._states = {}
+        self.evaluated = 0  # template updates computed
+        self.pruned = 0  # template updates skipped by the lower bound
+        self._rebuild()
+
+    def __len__(self):
+        return len(self._sequences)
+
+    def add(self, name, landmarks, timestamps=None):
+        """
+        Add a template of a motion gesture.
+        :param name: Gesture name passed to registered functions; several
+            templates may share one
+        :param landmarks: Landmark track of shape (T, 21, 3), or a path to a
+            recording written by LandmarkRecorder whose first hand is used
+        :param timestamps: Capture times of the track in seconds; taken from
+            the recording when a path is given
+        """
+        if isinstance(landmarks, str):
+            from .recording import LandmarkReplay
+
+            records = LandmarkReplay(landmarks).records
+            present = records["count"] > 0
+            landmarks = records["landmarks"][present, 0]
+            timestamps = records["timestamp"][present]
+        self.add_features(name, motion_features(landmarks, timestamps, self.rate))
+
+    def add_features(self, name, features):
+        """
+        Add a template given directly as motion features, e.g. one generated
+        from a drawn path.
+        :param features: Array of shape (N, 3) as returned by motion_features
+        """
+        features = np.asarray(features, dtype=np.float64)
+        if features.ndim != 2 or features.shape[1] != FEATURES or not len(features):
+            raise ValueError("Motion features must have shape (N, %d)" % FEATURES)
+        self.names.append(name)
+        self._sequences.append(features)
+        self._rebuild()
+
+    def remove(self, name):
+        """Drop every template of a gesture."""
+        keep = [index for index, template in enumerate(self.names) if template != name]
+        self.names = [self.names[index] for index in keep]
+        self._sequences = [self._sequences[index] for index in keep]
+        self._rebuild()
+
+    def _rebuild(self):
+        # Templates are padded to a common length so every update is a
+        # handful of operations on (templates, length) arrays
+        count = len(self._sequences)
+        length = max([len(sequence) for sequence in self._sequences] or [1])
+        self._templates = np.zeros((count, length, FEATURES))
+        self._padding = np.zeros((count, length))
+        self._lengths = np.array([len(sequence) for sequence in self._sequences], dtype=np.intp)
+        for index, sequence in enumerate(self._sequences):
+            self._templates[index, : len(sequence)] = sequence
+            self._padding[index, len(sequence) :] = np.inf
+        self._squared_norms = np.einsum("kif,kif->ki", self._templates, self._templates)
+        self._starts = self._templates[:, 0].copy()
+        self._ends = (np.arange(count), self._lengths - 1)
+        self._budgets = self.threshold * self._lengths
+        # Bounding box of every template's samples, for the lower bound
+        self._low = np.array([sequence.min(axis=0) for sequence in self._sequences])
+        self._high = np.array([sequence.max(axis=0) for sequence in self._sequences])
+        self._low = self._low.reshape(count, FEATURES)
+        self._high = self._high.reshape(count, FEATURES)
+        # Existing paths refer to the old templates
+        self._states = {}
+
+    def _step(self, state, sample):
+        """
+        Extend every template's warping paths by one input sample.
+        :return: Name of the best template completed by this sample, or None
+        """
+        if state.holdoff:
+            state.holdoff -= 1
+            return None
+        costs = state.costs
+        # Every cell costs at least the distance from the sample to the
+        # template's bounding box. A template is skipped when that added to
+        # its cheapest live path exceeds the budget and no new path can start
+        gap = np.clip(sample, self._low, self._high)
+        gap -= sample
+        lower = np.sqrt(np.einsum("kf,kf->k", gap, gap))
+        offset = self._starts - sample
+        start = np.sqrt(np.einsum("kf,kf->k", offset, offset))
+        budgets = self._budgets
+        active = (state.floor + lower <= budgets) | (start <= budgets)
+        skipped = len(active) - np.count_nonzero(active)
+        self.evaluated += len(active) - skipped
+        self.pruned += skipped
+        if skipped:
+            if skipped == len(active):
+                costs.fill(np.inf)
+                state.floor.fill(np.inf)
+                return None
+            costs[~active] = np.inf
+            state.floor[~active] = np.inf
+            # Only the remaining templates are updated
+            rows = np.flatnonzero(active)
+            budgets = budgets[rows]
+        else:
+            rows = slice(None)
+
+        # |t - s|^2 = |t|^2 - 2 t.s + |s|^2 for every template sample at once
+        distances = self._templates[rows] @ (-2.0 * sample)
+        distances += self._squared_norms[rows]
+        distances += sample @ sample
+        np.maximum(distances, 0.0, out=distances)
+        np.sqrt(distances, out=distances)
+        distances += self._padding[rows]
+        previous = costs[rows]
+        # Stay on the template sample, advance one, or skip one; a skip pays
+        # for the skipped sample too, so every template sample is counted
+        best = previous.copy()
+        np.minimum(best[:, 1:], previous[:, :-1], out=best[:, 1:])
+        np.minimum(best[:, 2:], previous[:, :-2] + distances[:, 1:-1], out=best[:, 2:])
+        best[:, 0] = 0.0  # a match may start at any sample
+        updated = distances
+        updated += best
+        # Early abandoning: costs only grow along a path, so one over budget
+        # can never match
+        updated[updated > budgets[:, None]] = np.inf
+        costs[rows] = updated
+        state.floor[rows] = updated.min(axis=1)
+
+        ends = costs[self._ends]
+        complete = np.isfinite(ends)
+        if not complete.any():
+            return None
+        scores = np.where(complete, ends / self._lengths, np.inf)
+        match = np.argmin(scores)
+        # Start over, so one performance is reported once. Paths advance at
+        # most two template samples per sample, so a new performance cannot
+        # complete within half the template's length; its rest is skipped
+        costs.fill(np.inf)
+        state.floor.fill(np.inf)
+        state.holdoff = self._lengths[match] // 2
+        return self.names[match]
+
+    def update(self, hand_landmarks, timestamp, hand_id=0):
+        """
+        Add the hand's position and check for completed motions.
+        :param hand_landmarks: MediaPipe landmarks or a (21, 3) array
+        :param timestamp: Capture time in seconds
+        :param hand_id: Key that stays the same for a hand across frames
+        :return: Name of the motion gesture completed by this frame, or None
+        """
+        if not self._sequences:
+            return None
+        state = self._states.get(hand_id)
+        if state is None:
+            state = self._states[hand_id] = _MotionState(self._padding.shape)
+        elif state.time is not None and timestamp - state.time > self.stale_after:
+            # The hand was gone long enough that its paths no longer continue
+            state.reset()
+
+        centre, size, aperture = hand_geometry(landmarks_to_array(hand_landmarks))
+        if state.time is None:
+            state.time, state.centre, state.aperture = timestamp, centre, aperture
+            return None
+        elapsed = timestamp - state.time
+        if elapsed < 0.75 / self.rate:
+            return None
+
+        sample = np.empty(FEATURES)
+        sample[:2] = _compress((centre - state.centre) * (VELOCITY_SCALE / (elapsed * size)))
+        start_aperture = state.aperture
+        state.time, state.centre, state.aperture = timestamp, centre, aperture
+        # Slow frame rates give several samples per frame (at most 4), so a
+        # motion takes as many samples as when it was recorded
+        steps = min(max(int(round(elapsed * self.rate)), 1), 4)
+        motion = None
+        for step in range(1, steps + 1):
+            sample[2] = start_aperture + (aperture - start_aperture) * step / steps
+            motion = self._step(state, sample) or motion
+        return motion
+
+    def reset(self, hand_id=None):
+        """Discard the paths of one hand, or of all hands."""
+        if hand_id is None:
+            self._states = {}
+        else:
+            self._states.pop(hand_id, None)
+
+    def prune(self, timestamp):
+        """Forget hands that have not been updated for `stale_after` seconds."""
+        for hand_id in [
+            hand_id
+            for hand_id, state in self._states.items()
+            if state.time is None or timestamp - state.time > self.stale_after
+        ]:
+            del self._states[hand_id]
@@ -0,0 +1,244 @@
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .landmarks import HandResults, handedness_labels, landmarks_to_array
+from .recording import HANDEDNESS_CODES, HANDEDNESS_LABELS, record_dtype
+
+
+def slot_dtype(max_hands):
+    """
+    A landmark record (see recording.record_dtype) behind a sequence counter.
+    The writer makes the counter odd while it updates the slot and even when
+    done, so readers can detect and retry torn reads without any lock.
+    """
+    return np.dtype([("sequence", "<u8")] + record_dtype(max_hands).descr)
+
+
+def write_slot(slot, timestamp, frame, results, max_hands):
+    """Publish one frame's landmarks into a shared slot."""
+    hands = (results.multi_hand_landmarks or [])[:max_hands]
+    labels = handedness_labels(results)
+    slot["sequence"] += 1
+    slot["timestamp"] = timestamp
+    slot["frame"] = frame
+    slot["count"] = len(hands)
+    slot["handedness"] = -1
+    for index, hand in enumerate(hands):
+        slot["landmarks"][index] = hand
+        slot["handedness"][index] = HANDEDNESS_CODES.get(labels[index], -1)
+    slot["sequence"] += 1
+
+
+def read_slot(slot):
+    """
+    Take a consistent copy of a shared slot.
+    :return: (timestamp, frame, HandResults)
+    """
+    while True:
+        before = int(slot["sequence"])
+        if before % 2:
+            time.sleep(0)
+            continue
+        record = slot.copy()
+        if int(slot["sequence"]) == before:
+            break
+    count = int(record["count"])
+    if not count:
+        return float(record["timestamp"]), int(record["frame"]), HandResults(None, None)
+    hands = list(record["landmarks"][:count])
+    labels = [HANDEDNESS_LABELS.get(int(code)) for code in record["handedness"][:count]]
+    return float(record["timestamp"]), int(record["frame"]), HandResults(hands, labels)
+
+
+def _headless_recognizer():
+    from .main import GestureRecognizer
+
+    return GestureRecognizer(headless=True)
+
+
+def _camera_worker(
+    index, source, shm_name, max_hands, events, stop_event, recognizer_factory, flip
+):
+    """Capture, infer and classify one source; runs in its own process."""
+    from .capture import CameraSource
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slot = None
+    try:
+        dtype = slot_dtype(max_hands)
+        slot = np.ndarray((1,), dtype=dtype, buffer=shm.buf, offset=index * dtype.itemsize)[0]
+        recognizer = recognizer_factory()
+        camera = CameraSource(source).start()
+        frame_number = 0
+        try:
+            with recognizer._take_hands() as hands:
+                while not stop_event.is_set():
+                    item = recognizer._read_frame(camera, timeout=0.1)
+                    if item is None:
+                        if camera.finished:
+                            break
+                        continue
+                    frame, timestamp = item
+
+                    _, results = recognizer._detect(hands, frame, flip=flip)
+                    results = HandResults(
+                        [landmarks_to_array(hand) for hand in results.multi_hand_landmarks]
+                        if results.multi_hand_landmarks
+                        else None,
+                        results.multi_handedness,
+                    )
+                    write_slot(slot, timestamp, frame_number, results, max_hands)
+
+                    gestures = recognizer._recognize(results, timestamp)
+                    for gesture, state in recognizer.handle_gesture_states(gestures):
+                        events.put((index, frame_number, timestamp, gesture, state))
+                    frame_number += 1
+        finally:
+            camera.close()
+    finally:
+        # Release the view before closing, or the mapping cannot be closed
+        slot = None
+        shm.close()
+        # Tell the dispatcher this source has finished
+        events.put((index, None, None, None, None))
+
+
+class MultiCameraRecognizer:
+    """
+    Recognizes gestures from several cameras (or video files) at once.
+    Each source is read through a CameraSource, run through the backend of a
+    recognizer from `recognizer_factory` and classified in its own process,
+    so throughput scales with cores. Landmarks are published into a
+    shared-memory slot per source instead of being pickled; only the small
+    (source, gesture, state) events travel through a queue to the central
+    dispatcher in this process, which calls the registered functions.
+    """
+
+    def __init__(
+        self,
+        sources,
+        recognizer_factory=None,
+        max_hands=2,
+        flip=True,
+        dispatcher=None,
+    ):
+        """
+        :param sources: Camera indices or video paths, one process each
+        :param recognizer_factory: Picklable callable returning the
+            GestureRecognizer used inside each process (headless by default)
+        :param max_hands: Hands published per source; how many are tracked
+            is up to the backend of the recognizers, e.g. a preset's
+            max_num_hands
+        :param flip: Mirror frames like the live camera view
+        :param dispatcher: Optional GestureDispatcher for the callbacks
+        """
+        self.sources = list(sources)
+        self.recognizer_factory = recognizer_factory or _headless_recognizer
+        self.max_hands = max_hands
+        self.flip = flip
+        self.dispatcher = dispatcher
+        self.custom_functions = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._shm = None
+        self._slots = None
+
+    def register_gesture(self, gesture_name, function):
+        """
+        Register a function for a gesture on any source.
+        :param gesture_name: Name of the gesture (e.g., 'fist', 'open_palm')
+        :param function: Called as function(source, state), where source is
+            the entry of `sources` that produced the event
+        """
+        self.custom_functions[gesture_name] = function
+
+    def landmarks(self, source_index):
+        """
+        Latest landmarks published by one source, read from shared memory.
+        :return: (timestamp, frame number, HandResults)
+        """
+        if self._slots is None:
+            raise RuntimeError("MultiCameraRecognizer is not running")
+        return read_slot(self._slots[source_index])
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _dispatch(self, index, gesture, state):
+        function = self.custom_functions.get(gesture)
+        if function is None:
+            return
+        source = self.sources[index]
+        if self.dispatcher is None:
+            function(source, state)
+        else:
+            # Keyed per source so each camera's events for a gesture stay ordered
+            self.dispatcher.submit(
+                (index, gesture), lambda state: function(source, state), state
+            )
+
+    def run(self):
+        """Start one process per source and dispatch events until all finish or stop()."""
+        dtype = slot_dtype(self.max_hands)
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=dtype.itemsize * len(self.sources)
+        )
+        self._slots = np.ndarray((len(self.sources),), dtype=dtype, buffer=self._shm.buf)
+        self._slots[:] = np.zeros(1, dtype=dtype)
+        self._stop_event.clear()
+
+        events = self._context.Queue()
+        processes = [
+            self._context.Process(
+                target=_camera_worker,
+                args=(
+                    index,
+                    source,
+                    self._shm.name,
+                    self.max_hands,
+                    events,
+                    self._stop_event,
+                    self.recognizer_factory,
+                    self.flip,
+                ),
+                daemon=True,
+            )
+            for index, source in enumerate(self.sources)
+        ]
+        for process in processes:
+            process.start()
+
+        running = len(processes)
+        try:
+            while running:
+                try:
+                    index, frame, timestamp, gesture, state = events.get(timeout=0.1)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        break
+                    continue
+                if frame is None:
+                    running -= 1
+                    continue
+                self._dispatch(index, gesture, state)
+        finally:
+            self.stop()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            self._slots = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def start(self):
+        """Run in a background thread; returns the thread."""
+        thread = threading.Thread(target=self.run, daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,376 @@
+import logging
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .multicam import read_slot, slot_dtype, write_slot
+
+logger = logging.getLogger(__name__)
+
+READY = -1  # sent by a worker once its Hands instance is built
+
+
+def _capture_process(camera, connection, tasks, free_slots, workers, stop_event, dropped):
+    """
+    Copy camera frames into free ring slots and queue them for the workers;
+    runs in its own process.
+    """
+    import cv2
+
+    from .capture import CameraSource
+
+    source = camera() if callable(camera) else CameraSource(camera)
+    shm = None
+    ring = None
+    try:
+        try:
+            source.start()
+        except IOError as error:
+            connection.send(("error", str(error)))
+            return
+        # The ring is sized by the first frame
+        item = None
+        while item is None and not stop_event.is_set() and not source.finished:
+            item = source.read(timeout=0.1)
+        if item is None:
+            connection.send(("finished", None))
+            return
+        height, width = item[0].shape[:2]
+        connection.send(("shape", (height, width)))
+        name, slots = connection.recv()
+        shm = shared_memory.SharedMemory(name=name)
+        ring = np.ndarray((slots, height, width, 3), dtype=np.uint8, buffer=shm.buf)
+
+        frame_number = 0
+        while not stop_event.is_set():
+            if item is None:
+                item = source.read(timeout=0.1)
+                if item is None:
+                    if source.finished:
+                        break
+                    continue
+            frame, timestamp = item
+            try:
+                # CameraSource hands over every frame of a file, and files
+                # wait here for a slot too; live sources drop the frame when
+                # every slot is still being inferred or displayed
+                slot = free_slots.get(timeout=0 if source.live else 0.1)
+            except queue.Empty:
+                if source.live:
+                    item = None
+                    dropped.value += 1
+                # A file retries the same frame, checking for stop() meanwhile
+                continue
+            item = None
+            if frame.shape[:2] == (height, width):
+                np.copyto(ring[slot], frame)
+            else:
+                cv2.resize(frame, (width, height), dst=ring[slot])
+            tasks[frame_number % len(tasks)].put((frame_number, timestamp, slot))
+            frame_number += 1
+    finally:
+        source.close()
+        for index in range(workers):
+            tasks[index % len(tasks)].put(None)
+        # Release the view before closing, or the mapping cannot be closed
+        ring = None
+        if shm is not None:
+            shm.close()
+
+
+def _inference_worker(setup, tasks, done, backend, static_image_mode, flip, max_hands):
+    """
+    Run a Hands instance over frames from the ring; runs in its own process.
+    `setup` names the shared-memory blocks and the frame shape once capture
+    has started; it is per worker, as `tasks` may be shared.
+    """
+    from .backends import create_backend
+    from .buffers import FrameBuffers
+
+    hands = create_backend(backend, static_image_mode=static_image_mode)
+    done.put(READY)
+    frames_shm = results_shm = ring = records = None
+    try:
+        with hands:
+            task = setup.get()
+            if task is None:
+                return
+            frames_name, results_name, shape, slots = task
+            frames_shm = shared_memory.SharedMemory(name=frames_name)
+            results_shm = shared_memory.SharedMemory(name=results_name)
+            ring = np.ndarray((slots,) + shape + (3,), dtype=np.uint8, buffer=frames_shm.buf)
+            records = np.ndarray((slots,), dtype=slot_dtype(max_hands), buffer=results_shm.buf)
+            buffers = FrameBuffers(*shape)
+            while True:
+                task = tasks.get()
+                if task is None:
+                    break
+                frame_number, timestamp, slot = task
+                image = buffers.convert(ring[slot], flip, display=False)
+                image.flags.writeable = False
+                results = hands.process(image)
+                image.flags.writeable = True
+                write_slot(records[slot], timestamp, frame_number, results, max_hands)
+                done.put(slot)
+    finally:
+        done.put(None)
+        ring = records = None
+        for shm in (frames_shm, results_shm):
+            if shm is not None:
+                shm.close()
+
+
+class ParallelPipeline:
+    """
+    Runs MediaPipe for one camera in several processes at once.
+    A capture process copies every frame into a free slot of a shared-memory
+    ring and queues its number for the workers, each running its own Hands
+    instance. Workers write landmarks into a shared result record per slot
+    (as MultiCameraRecognizer does) and report the slot; this process puts
+    the results back in frame order and classifies, dispatches and displays
+    them as run() would. A slot is only refilled once this process is done
+    with it; when every slot is busy, the capture process drops the frame.
+
+    With `tracking`, frames are dealt to the workers in turn, so each Hands
+    instance tracks hands across every N-th frame; otherwise every worker
+    runs palm detection on every frame it gets (static image mode) and takes
+    whichever frame is next.
+    """
+
+    def __init__(
+        self,
+        recognizer,
+        workers=2,
+        slots=None,
+        tracking=True,
+        flip=True,
+        max_hands=2,
+        reorder_timeout=1.0,
+    ):
+        """
+        :param recognizer: GestureRecognizer classifying, dispatching and
+            displaying the results; its camera and backend settings are used
+            by the capture and worker processes, so they must be picklable
+        :param workers: Inference processes
+        :param slots: Frames in the ring; two per worker plus two if None
+        :param tracking: Deal frames to workers in turn and track hands in each
+            worker, rather than running palm detection on every frame
+        :param flip: Mirror frames like the live camera view
+        :param max_hands: Hands stored per frame
+        :param reorder_timeout: Seconds to wait for a missing frame, e.g.
+            from a crashed worker, before skipping it; a skipped frame that
+            still arrives later is dropped
+        """
+        self.recognizer = recognizer
+        self.workers = workers
+        self.slots = slots or 2 * workers + 2
+        self.tracking = tracking
+        self.flip = flip
+        self.max_hands = max_hands
+        self.reorder_timeout = reorder_timeout
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        self.elapsed = 0.0
+        self._context = multiprocessing.get_context("spawn")
+        self._dropped = self._context.Value("q", 0, lock=False)
+        self._stop_event = self._context.Event()
+
+    @property
+    def dropped(self):
+        """Frames the capture process dropped because every slot was busy."""
+        return self._dropped.value
+
+    @property
+    def fps(self):
+        """Frames fully processed per second over the last run."""
+        if not self.elapsed:
+            return 0.0
+        return self.frames_processed / self.elapsed
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _wait_ready(self, done, workers):
+        """:return: False if stopped before every worker had built its Hands instance"""
+        ready = 0
+        while ready < len(workers):
+            if self.recognizer.stopped or self._stop_event.is_set():
+                return False
+            try:
+                message = done.get(timeout=0.1)
+            except queue.Empty:
+                if not all(process.is_alive() for process in workers):
+                    raise RuntimeError("An inference worker failed to start")
+                continue
+            ready += message == READY
+        return True
+
+    def _handshake(self, connection, capture):
+        """:return: The capture process' first message, waiting while it lives"""
+        while not connection.poll(0.1):
+            if not capture.is_alive():
+                raise RuntimeError("Capture process exited before sending a frame")
+            if self.recognizer.stopped:
+                self.stop()
+        return connection.recv()
+
+    def run(self):
+        self._stop_event.clear()
+        self._dropped.value = 0
+        recognizer = self.recognizer
+        tasks = [self._context.Queue() for _ in range(self.workers if self.tracking else 1)]
+        setups = [self._context.Queue() for _ in range(self.workers)]
+        free_slots = self._context.Queue()
+        done = self._context.Queue()
+        workers = [
+            self._context.Process(
+                target=_inference_worker,
+                args=(
+                    setups[index],
+                    tasks[index % len(tasks)],
+                    done,
+                    recognizer.backend,
+                    not self.tracking,
+                    self.flip,
+                    self.max_hands,
+                ),
+                daemon=True,
+            )
+            for index in range(self.workers)
+        ]
+        for process in workers:
+            process.start()
+        processes = list(workers)
+        frames_shm = results_shm = None
+        try:
+            # Loading MediaPipe takes a while; the camera is only opened once
+            # every worker is ready, so no frames are lost in the meantime
+            if not self._wait_ready(done, workers):
+                return
+            connection, capture_connection = self._context.Pipe()
+            capture = self._context.Process(
+                target=_capture_process,
+                args=(
+                    recognizer.camera,
+                    capture_connection,
+                    tasks,
+                    free_slots,
+                    self.workers,
+                    self._stop_event,
+                    self._dropped,
+                ),
+                daemon=True,
+            )
+            capture.start()
+            processes.append(capture)
+            kind, value = self._handshake(connection, capture)
+            if kind == "error":
+                raise IOError(value)
+            if kind == "finished":
+                return
+
+            shape = value
+            dtype = slot_dtype(self.max_hands)
+            frames_shm = shared_memory.SharedMemory(
+                create=True, size=self.slots * shape[0] * shape[1] * 3
+            )
+            results_shm = shared_memory.SharedMemory(create=True, size=self.slots * dtype.itemsize)
+            frames = np.ndarray((self.slots,) + shape + (3,), dtype=np.uint8, buffer=frames_shm.buf)
+            records = np.ndarray((self.slots,), dtype=dtype, buffer=results_shm.buf)
+            records[:] = np.zeros(1, dtype=dtype)
+            for setup in setups:
+                setup.put((frames_shm.name, results_shm.name, shape, self.slots))
+            for slot in range(self.slots):
+                free_slots.put(slot)
+            connection.send((frames_shm.name, self.slots))
+            self._reorder(frames, records, done, free_slots, workers)
+        finally:
+            self.stop()
+            # Wake workers still waiting for the ring or a task
+            for setup in setups:
+                setup.put(None)
+            for index in range(self.workers):
+                tasks[index % len(tasks)].put(None)
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+            frames = records = None
+            for shm in (frames_shm, results_shm):
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+            if not recognizer.headless:
+                import cv2
+
+                cv2.destroyAllWindows()
+
+    def _reorder(self, frames, records, done, free_slots, workers):
+        """Collect results as workers finish and hand them on in frame order."""
+        pending = {}  # frame number -> (slot, timestamp, results, arrival time)
+        next_frame = 0
+        running = self.workers
+        start = None  # first result, so worker start-up is not counted
+        self.frames_processed = 0
+        self.frames_skipped = 0
+        try:
+            while running and not self._stop_event.is_set():
+                if self.recognizer.stopped:
+                    break
+                try:
+                    slot = done.get(timeout=0.1)
+                except queue.Empty:
+                    slot = None
+                    if not any(process.is_alive() for process in workers):
+                        break
+                else:
+                    if slot is None:
+                        running -= 1
+                    else:
+                        timestamp, frame_number, results = read_slot(records[slot])
+                        if frame_number < next_frame:
+                            # Its frame was skipped already; only the slot is of use
+                            free_slots.put(slot)
+                        else:
+                            pending[frame_number] = (
+                                slot, timestamp, results, time.perf_counter()
+                            )
+
+                if pending and next_frame not in pending:
+                    oldest = min(pending)
+                    if time.perf_counter() - pending[oldest][3] > self.reorder_timeout:
+                        # A frame that never came back; carry on without it
+                        self.frames_skipped += oldest - next_frame
+                        next_frame = oldest
+
+                while next_frame in pending:
+                    slot, timestamp, results, _ = pending.pop(next_frame)
+                    if start is None:
+                        start = time.perf_counter()
+                    keep_running = self._finish(frames[slot], results, timestamp)
+                    free_slots.put(slot)
+                    next_frame += 1
+                    self.frames_processed += 1
+                    if not keep_running:
+                        return
+        finally:
+            if start is not None:
+                self.elapsed = time.perf_counter() - start
+
+    def _finish(self, frame, results, timestamp):
+        """Classify, dispatch and (unless headless) display one frame from the ring."""
+        recognizer = self.recognizer
+        image = None
+        if not recognizer.headless:
+            buffers = recognizer.buffers.acquire(frame)
+            if self.flip:
+                image = buffers.mirror(frame)
+            else:
+                np.copyto(buffers.display, frame)
+                image = buffers.display
+        elif recognizer.build_mask:
+            image = recognizer.buffers.acquire(frame).mask
+        return recognizer._finish_frame(image, results, timestamp, wait_ms=1)
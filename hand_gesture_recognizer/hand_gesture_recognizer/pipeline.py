@@ -0,0 +1,146 @@
+import collections
+import threading
+import time
+
+import cv2
+
+
+class LatestQueue:
+    """
+    Bounded single-producer/single-consumer queue that keeps only the newest items.
+    When the queue is full, putting a new item drops the oldest one instead of
+    blocking the producer, so a slow stage always picks up the freshest frame.
+    """
+
+    def __init__(self, maxsize=1):
+        self._items = collections.deque(maxlen=maxsize)
+        self._condition = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._condition:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._condition.notify()
+
+    def get(self, timeout=None):
+        """
+        Wait for the next item.
+        :param timeout: Seconds to wait, or None to wait until an item arrives
+        :return: The oldest queued item, or None if the queue was closed or timed out
+        """
+        with self._condition:
+            if not self._items and not self._closed:
+                self._condition.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    @property
+    def closed(self):
+        """True once the producer has closed the queue and it has been drained."""
+        with self._condition:
+            return self._closed and not self._items
+
+
+class FramePipeline:
+    """
+    Runs GestureRecognizer as three threaded stages: capture -> MediaPipe
+    inference -> classification, dispatch and display. Capture is the
+    CameraSource's grabber thread, which always offers the newest frame; the
+    inference stage hands its results on through a LatestQueue. Every frame
+    carries a sequence number and each stage only ever moves forward, so
+    frames can be dropped under load but never reordered.
+    """
+
+    def __init__(self, recognizer, queue_size=1, camera=None):
+        """
+        :param recognizer: GestureRecognizer doing the work of each stage
+        :param queue_size: Inferred frames buffered for display (newest kept)
+        :param camera: Started CameraSource to read; opened from the
+            recognizer's camera setting if None
+        """
+        self.recognizer = recognizer
+        self.camera = camera
+        self.inferred = LatestQueue(queue_size)
+        self.frames_processed = 0
+        self.elapsed = 0.0
+        # Shared with the recognizer so GestureRecognizer.stop() ends the pipeline
+        self._stop_event = recognizer._stop_event
+
+    def _inference_stage(self, camera):
+        sequence = 0
+        with self.recognizer._take_hands() as hands:
+            while not self._stop_event.is_set():
+                item = self.recognizer._read_frame(camera, timeout=0.1)
+                if item is None:
+                    if camera.finished:
+                        break
+                    continue
+                frame, timestamp = item
+                image, results = self.recognizer._infer(hands, frame, timestamp)
+                self.inferred.put((sequence, timestamp, image, results))
+                sequence += 1
+        self.inferred.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+    @property
+    def dropped(self):
+        """Number of frames discarded because a downstream stage was busy."""
+        camera_dropped = self.camera.dropped if self.camera is not None else 0
+        return camera_dropped + self.inferred.dropped
+
+    def run(self):
+        owns_camera = self.camera is None
+        if owns_camera:
+            self.camera = self.recognizer._open_camera()
+        inference = threading.Thread(
+            target=self._inference_stage, args=(self.camera,), daemon=True
+        )
+        inference.start()
+
+        # Display has to stay on the main thread for most OpenCV GUI backends
+        last_sequence = -1
+        start = time.perf_counter()
+        while not self._stop_event.is_set():
+            item = self.inferred.get(timeout=0.1)
+            if item is None:
+                if self.inferred.closed:
+                    break
+                continue
+            sequence, timestamp, image, results = item
+            if sequence <= last_sequence:
+                continue
+            last_sequence = sequence
+
+            # The display wait no longer blocks capture or inference
+            keep_running = self.recognizer._finish_frame(
+                image, results, timestamp, wait_ms=1
+            )
+            self.frames_processed += 1
+            if not keep_running:
+                break
+
+        self.stop()
+        inference.join()
+        self.elapsed = time.perf_counter() - start
+        if owns_camera:
+            self.camera.close()
+        if not self.recognizer.headless:
+            cv2.destroyAllWindows()
+
+    @property
+    def fps(self):
+        """Frames fully processed per second over the last run."""
+        if not self.elapsed:
+            return 0.0
+        return self.frames_processed / self.elapsed
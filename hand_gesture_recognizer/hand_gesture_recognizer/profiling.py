@@ -0,0 +1,143 @@
+import math
+import time
+
+import numpy as np
+
+# Quarter-octave buckets: bucket b holds durations in [2**(b/4), 2**((b+1)/4)) ns,
+# which covers 1 ns to over 100 s in 160 counters with at most ~19% bucket width
+BUCKETS_PER_OCTAVE = 4
+NUM_BUCKETS = 160
+
+
+class LatencyHistogram:
+    """
+    Fixed-size log-scale histogram of durations.
+    Recording is one logarithm and one counter increment, memory never grows,
+    and percentiles are read back to within one bucket.
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(NUM_BUCKETS, dtype=np.int64)
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, duration_ns):
+        bucket = 0
+        if duration_ns > 1:
+            bucket = min(
+                int(math.log2(duration_ns) * BUCKETS_PER_OCTAVE), NUM_BUCKETS - 1
+            )
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        if self.min_ns is None or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def percentile(self, q):
+        """
+        :param q: Percentile between 0 and 100
+        :return: Duration in nanoseconds (geometric centre of the bucket), or None
+        """
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+        bucket = int(np.searchsorted(np.cumsum(self.counts), rank))
+        estimate = 2.0 ** ((bucket + 0.5) / BUCKETS_PER_OCTAVE)
+        return min(max(estimate, self.min_ns), self.max_ns)
+
+    def summary(self):
+        """Count, mean and p50/p95/p99 in milliseconds."""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ns / self.count / 1e6,
+            "p50_ms": self.percentile(50) / 1e6,
+            "p95_ms": self.percentile(95) / 1e6,
+            "p99_ms": self.percentile(99) / 1e6,
+            "max_ms": self.max_ns / 1e6,
+        }
+
+
+class StageProfiler:
+    """
+    Per-stage timing for the recognizer loop.
+    Stages are named by the recognizer (capture, convert, inference, classify,
+    callbacks, render, display). A hook is any reusable context manager, such
+    as a cProfile.Profile, entered around every run of its stage.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.hooks = {}
+        self.frames = 0
+        self._start = None
+        self._frame_start = None
+
+    def attach(self, stage, hook):
+        """
+        Run a context manager around every run of a stage.
+        :param stage: Stage name, e.g. 'inference'
+        :param hook: Reusable context manager, or None to detach
+        """
+        if hook is None:
+            self.hooks.pop(stage, None)
+        else:
+            self.hooks[stage] = hook
+
+    def call(self, stage, function, *args):
+        """Call function(*args), timing it as one run of the stage."""
+        hook = self.hooks.get(stage)
+        start = time.perf_counter_ns()
+        if hook is None:
+            result = function(*args)
+        else:
+            with hook:
+                result = function(*args)
+        self.record(stage, time.perf_counter_ns() - start)
+        return result
+
+    def record(self, stage, duration_ns):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages.setdefault(stage, LatencyHistogram())
+        histogram.record(duration_ns)
+
+    def frame_done(self):
+        """Mark the end of a frame; records the whole-frame duration."""
+        now = time.perf_counter_ns()
+        if self._start is None:
+            self._start = now
+        elif self._frame_start is not None:
+            self.record("frame", now - self._frame_start)
+        self._frame_start = now
+        self.frames += 1
+
+    @property
+    def fps(self):
+        """Average frame rate since the first frame."""
+        if self._start is None or self.frames < 2:
+            return 0.0
+        return (self.frames - 1) / ((self._frame_start - self._start) / 1e9)
+
+    def stats(self):
+        """
+        :return: Dict with 'fps', 'frames' and per-stage latency summaries
+        """
+        return {
+            "fps": self.fps,
+            "frames": self.frames,
+            "stages": {
+                stage: histogram.summary() for stage, histogram in self.stages.items()
+            },
+        }
+
+    def reset(self):
+        self.stages = {}
+        self.frames = 0
+        self._start = None
+        self._frame_start = None
@@ -0,0 +1,176 @@
+import os
+import struct
+
+import numpy as np
+
+from .landmarks import (
+    NUM_LANDMARKS,
+    FrameResult,
+    HandResults,
+    handedness_labels,
+    landmarks_to_array,
+)
+
+# File layout: a 16-byte header followed by fixed-size little-endian records,
+# so a file can be memory-mapped and indexed without parsing, and a recording
+# cut short by a crash is still readable up to its last complete record.
+MAGIC = b"HGRL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")  # magic, version, max_hands, record size, reserved
+
+HANDEDNESS_CODES = {None: -1, "Left": 0, "Right": 1}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+
+
+def record_dtype(max_hands):
+    """
+    Structured dtype of one frame record.
+    :param max_hands: Number of hand slots per record
+    """
+    return np.dtype(
+        [
+            ("timestamp", "<f8"),  # seconds
+            ("frame", "<u4"),
+            ("count", "u1"),  # hands present in this frame
+            ("handedness", "i1", (max_hands,)),  # -1 unknown, 0 left, 1 right
+            ("landmarks", "<f4", (max_hands, NUM_LANDMARKS, 3)),
+        ]
+    )
+
+
+class LandmarkRecorder:
+    """
+    Appends per-frame landmarks, handedness and timestamps to a recording file.
+    Records are collected in a preallocated block and written in one call per
+    block, so recording costs a few array assignments per frame.
+    """
+
+    def __init__(self, path, max_hands=2, block_size=256):
+        """
+        :param path: File to create (overwritten if it exists)
+        :param max_hands: Hands stored per frame; extra hands are dropped
+        :param block_size: Records buffered in memory between writes
+        """
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self._block = np.zeros(block_size, dtype=self.dtype)
+        self._pending = 0
+        self.frames = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, max_hands, self.dtype.itemsize, 0))
+
+    def write(self, timestamp, results):
+        """
+        Append one frame.
+        :param timestamp: Capture time in seconds
+        :param results: MediaPipe results or HandResults for the frame
+        """
+        record = self._block[self._pending]
+        hands = (results.multi_hand_landmarks or [])[: self.max_hands]
+        labels = handedness_labels(results)[: self.max_hands]
+
+        record["timestamp"] = timestamp
+        record["frame"] = self.frames
+        record["count"] = len(hands)
+        record["handedness"] = -1
+        record["landmarks"] = 0.0
+        for slot, (hand, label) in enumerate(zip(hands, labels)):
+            record["landmarks"][slot] = landmarks_to_array(hand)
+            record["handedness"][slot] = HANDEDNESS_CODES.get(label, -1)
+
+        self.frames += 1
+        self._pending += 1
+        if self._pending == len(self._block):
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._block[: self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LandmarkReplay:
+    """
+    Memory-mapped view of a recording.
+    Indexing and iteration yield (timestamp, HandResults) pairs that can be fed
+    straight to the classifiers; `records` exposes the raw structured array,
+    e.g. records["landmarks"] for batched processing.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as recording:
+            header = recording.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError("%s is not a landmark recording" % path)
+        magic, version, max_hands, record_size, _ = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError("%s is not a landmark recording" % path)
+        if version != VERSION:
+            raise ValueError("Unsupported landmark recording version %d" % version)
+
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        if self.dtype.itemsize != record_size:
+            raise ValueError("Corrupt landmark recording header in %s" % path)
+
+        # Ignore a trailing partial record left by an interrupted recording
+        file_size = os.path.getsize(path)
+        count = (file_size - HEADER.size) // record_size
+        if count:
+            self.records = np.memmap(
+                path, dtype=self.dtype, mode="r", offset=HEADER.size, shape=(count,)
+            )
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        record = self.records[index]
+        count = int(record["count"])
+        if not count:
+            return float(record["timestamp"]), HandResults(None, None)
+        hands = list(record["landmarks"][:count])
+        labels = [HANDEDNESS_LABELS.get(int(code)) for code in record["handedness"][:count]]
+        return float(record["timestamp"]), HandResults(hands, labels)
+
+    def __iter__(self):
+        for index in range(len(self.records)):
+            yield self[index]
+
+
+def replay(recognizer, path):
+    """
+    Run a recording through a recognizer's classifiers as fast as possible.
+    No camera or MediaPipe is involved; registered gesture functions are called.
+    :param recognizer: GestureRecognizer holding gesture state and callbacks
+    :param path: Recording written by LandmarkRecorder
+    :return: Generator of FrameResult, one per recorded frame
+    """
+    recording = LandmarkReplay(path)
+    records = recording.records
+    for index in range(len(recording)):
+        timestamp, results = recording[index]
+        gestures = recognizer._recognize(results, timestamp)
+        events = recognizer.handle_gesture_states(gestures)
+        landmarks = None
+        if results.multi_hand_landmarks:
+            landmarks = records["landmarks"][index, : len(results.multi_hand_landmarks)]
+        yield FrameResult(
+            int(records["frame"][index]), timestamp * 1000.0, gestures, events, landmarks
+        )
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+
+from .landmarks import HandResults, landmarks_to_array
+
+
+class RegionOfInterest:
+    """
+    Chooses the image MediaPipe sees for each frame.
+    While no hand is known the whole frame is searched at reduced resolution.
+    Once hands are found, inference runs on a padded square crop around the
+    bounding box of their landmarks, at full resolution. Landmarks from either
+    input are mapped back to normalised full-frame coordinates, so the
+    classifiers work unchanged. Losing every hand, or every `search_interval`
+    frames (to pick up newly entering hands), falls back to a full-frame search.
+
+    The input's origin and scale change from frame to frame, so MediaPipe must
+    run in static image mode: its own tracking would carry hand regions over
+    in the previous input's coordinates. The crop takes over that tracking.
+    """
+
+    def __init__(self, search_scale=0.5, padding=0.3, min_size=96, search_interval=30):
+        """
+        :param search_scale: Resize factor of the full-frame search image
+        :param padding: Margin added around the hand box, as a fraction of its size
+        :param min_size: Smallest crop side in pixels
+        :param search_interval: Frames between forced full-frame searches
+            (0 disables them)
+        """
+        self.search_scale = search_scale
+        self.padding = padding
+        self.min_size = min_size
+        self.search_interval = search_interval
+        self.box = None  # (x0, y0, x1, y1) in pixels of the last frame
+        self._frames_since_search = 0
+
+    def prepare(self, image):
+        """
+        Build the inference input for a frame.
+        :param image: Full-resolution RGB frame
+        :return: Tuple of (inference image, region) where region is the
+            (x0, y0, width, height) of the input in normalised frame coordinates
+        """
+        self._frames_since_search += 1
+        searching = self.box is None or (
+            self.search_interval and self._frames_since_search >= self.search_interval
+        )
+        if searching:
+            self._frames_since_search = 0
+            if self.search_scale == 1.0:
+                return image, (0.0, 0.0, 1.0, 1.0)
+            small = cv2.resize(
+                image,
+                None,
+                fx=self.search_scale,
+                fy=self.search_scale,
+                interpolation=cv2.INTER_AREA,
+            )
+            return small, (0.0, 0.0, 1.0, 1.0)
+
+        height, width = image.shape[:2]
+        x0, y0, x1, y1 = self.box
+        return (
+            np.ascontiguousarray(image[y0:y1, x0:x1]),
+            (x0 / width, y0 / height, (x1 - x0) / width, (y1 - y0) / height),
+        )
+
+    def map_results(self, results, region, frame_size):
+        """
+        Map MediaPipe results on the inference image back to the full frame
+        and update the crop for the next frame.
+        :param results: MediaPipe results for the image returned by prepare
+        :param region: The region returned alongside that image
+        :param frame_size: (width, height) of the full frame in pixels
+        :return: HandResults with full-frame (21, 3) landmark arrays
+        """
+        if not results.multi_hand_landmarks:
+            self.box = None
+            return HandResults(None, None)
+
+        x0, y0, region_width, region_height = region
+        scale = np.array([region_width, region_height, region_width], dtype=np.float32)
+        offset = np.array([x0, y0, 0.0], dtype=np.float32)
+        hands = [
+            landmarks_to_array(hand) * scale + offset
+            for hand in results.multi_hand_landmarks
+        ]
+        self.box = self._bounding_box(hands, frame_size)
+        return HandResults(hands, results.multi_handedness)
+
+    def _bounding_box(self, hands, frame_size):
+        width, height = frame_size
+        points = np.concatenate(hands)[:, :2] * (width, height)
+        low = points.min(axis=0)
+        high = points.max(axis=0)
+        center = (low + high) / 2.0
+        side = max((high - low).max() * (1.0 + 2.0 * self.padding), self.min_size)
+        side = min(side, width, height)
+
+        # Square crop, shifted inside the frame instead of clipped
+        x0 = int(np.clip(center[0] - side / 2.0, 0, width - side))
+        y0 = int(np.clip(center[1] - side / 2.0, 0, height - side))
+        return x0, y0, x0 + int(side), y0 + int(side)
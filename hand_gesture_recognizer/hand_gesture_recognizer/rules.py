@@ -0,0 +1,112 @@
+import collections
+
+import numpy as np
+
+# Bits of the finger-state index: one per extended finger, plus one for a
+# right hand. Hands without a handedness label use the left-hand half.
+THUMB = 1
+INDEX = 2
+MIDDLE = 4
+RING = 8
+PINKY = 16
+RIGHT_HAND = 32
+TABLE_SIZE = 64
+
+FINGER_BITS = np.array([THUMB, INDEX, MIDDLE, RING, PINKY], dtype=np.intp)
+
+# A gesture defined by finger states.
+# name: gesture name; fingers: either a 5-character pattern over thumb,
+# index, middle, ring and pinky with '1' extended, '0' folded and '*' either
+# (e.g. '10001' for thumb and pinky), or a number of extended fingers;
+# hand: 'Left' or 'Right' to restrict the rule to one hand, or None
+GestureRule = collections.namedtuple("GestureRule", ["name", "fingers", "hand"])
+GestureRule.__new__.__defaults__ = (None,)
+
+# The original gestures: the number of extended fingers, whichever they are
+DEFAULT_RULES = (
+    GestureRule("fist", 0),
+    GestureRule("two_fingers", 2),
+    GestureRule("three_fingers", 3),
+    GestureRule("four_fingers", 4),
+    GestureRule("open_palm", 5),
+)
+
+
+def rule_masks(rule):
+    """
+    :return: The finger-state indices (0-63) a rule matches
+    """
+    masks = np.arange(TABLE_SIZE)
+    fingers = masks & (TABLE_SIZE - 1 - RIGHT_HAND)
+    if isinstance(rule.fingers, str):
+        pattern = rule.fingers
+        if len(pattern) != 5 or set(pattern) - set("01*"):
+            raise ValueError("Invalid finger pattern %r for gesture %r" % (pattern, rule.name))
+        required = sum(int(bit) for bit, state in zip(FINGER_BITS, pattern) if state != "*")
+        expected = sum(int(bit) for bit, state in zip(FINGER_BITS, pattern) if state == "1")
+        matches = fingers & required == expected
+    else:
+        counts = np.array([bin(mask).count("1") for mask in fingers])
+        matches = counts == rule.fingers
+
+    if rule.hand == "Right":
+        matches &= (masks & RIGHT_HAND) != 0
+    elif rule.hand == "Left":
+        matches &= (masks & RIGHT_HAND) == 0
+    elif rule.hand is not None:
+        raise ValueError("Invalid hand %r for gesture %r" % (rule.hand, rule.name))
+    return np.flatnonzero(matches)
+
+
+def compile_rules(rules):
+    """
+    Compile rules into a lookup table from finger-state index to gesture.
+    Later rules override earlier ones where they overlap, so specific shapes
+    can be layered over the finger-count defaults.
+    :param rules: Iterable of GestureRule (or (name, fingers[, hand]) tuples)
+    :return: Object array of 64 gesture names or None
+    """
+    table = np.full(TABLE_SIZE, None, dtype=object)
+    for rule in rules:
+        rule = GestureRule(*rule)
+        table[rule_masks(rule)] = rule.name
+    return table
+
+
+DEFAULT_TABLE = compile_rules(DEFAULT_RULES)
+
+
+class GestureRules:
+    """
+    Rule-based gestures over the extended fingers and handedness.
+    Rules are compiled into a 64-entry table, so classifying a hand is one
+    array index however many rules there are.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES):
+        """
+        :param rules: Initial rules, the finger-count gestures by default
+        """
+        self.rules = [GestureRule(*rule) for rule in rules]
+        self.table = compile_rules(self.rules)
+
+    def add(self, name, fingers, hand=None):
+        """
+        Add a rule on top of the existing ones.
+        :param name: Gesture name passed to registered functions
+        :param fingers: Finger pattern such as '01000', or a finger count
+        :param hand: 'Left', 'Right' or None for either hand
+        """
+        rule = GestureRule(name, fingers, hand)
+        rule_masks(rule)  # Validate before changing anything
+        self.rules.append(rule)
+        self.table = compile_rules(self.rules)
+
+    def remove(self, name):
+        """Drop every rule of a gesture."""
+        self.rules = [rule for rule in self.rules if rule.name != name]
+        self.table = compile_rules(self.rules)
+
+    def gestures(self):
+        """:return: Names of all gestures the table can produce"""
+        return sorted({name for name in self.table if name is not None})
@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+
+from .landmarks import HandResults, landmarks_to_array
+
+
+class InferenceScheduler:
+    """
+    Decides on which frames to run MediaPipe and fills the frames in between.
+    Full inference runs every `interval` frames, where the interval is the
+    measured inference time divided by the per-frame budget (the target frame
+    period, or the actual camera frame period if frames arrive more slowly).
+    Skipped frames get the last detected hands moved along their recent motion.
+    Each hand is translated rigidly, so finger shapes, and with them the
+    detected gestures, stay as MediaPipe last reported them.
+    """
+
+    def __init__(self, target_fps=30.0, max_interval=8, max_horizon=0.25, smoothing=0.2):
+        """
+        :param target_fps: Frame rate the loop should sustain
+        :param max_interval: Upper bound on frames between two inferences
+        :param max_horizon: Seconds after the last inference beyond which hands
+            are held in place instead of extrapolated further
+        :param smoothing: Weight of the newest sample in the timing averages
+        """
+        self.frame_budget = 1.0 / target_fps
+        self.max_interval = max_interval
+        self.max_horizon = max_horizon
+        self.smoothing = smoothing
+        self.interval = 1
+        self.inference_time = None
+        self.frame_period = None
+        self._frames_since_inference = 0
+        self._last_frame_time = None
+        self._hands = None
+        self._handedness = None
+        self._velocity = None
+        self._inference_timestamp = None
+
+    def _average(self, current, sample):
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    def should_infer(self, timestamp):
+        """
+        Call once per frame, before inference.
+        :param timestamp: Capture time of the frame in seconds (e.g. the
+            time.perf_counter() stamp of CameraSource.read)
+        :return: True if MediaPipe should run on this frame
+        """
+        if self._last_frame_time is not None:
+            self.frame_period = self._average(
+                self.frame_period, timestamp - self._last_frame_time
+            )
+        self._last_frame_time = timestamp
+        self._frames_since_inference += 1
+        return (
+            self._inference_timestamp is None
+            or self._frames_since_inference >= self.interval
+        )
+
+    def update(self, timestamp, results, duration):
+        """
+        Record a full inference and recompute the interval.
+        :param timestamp: Frame time the inference ran on
+        :param results: MediaPipe results for the frame
+        :param duration: Seconds the backend's process call took, without
+            colour conversion
+        """
+        self.inference_time = self._average(self.inference_time, duration)
+        budget = max(self.frame_budget, self.frame_period or 0.0)
+        self.interval = min(
+            self.max_interval, max(1, int(math.ceil(self.inference_time / budget)))
+        )
+
+        hands = None
+        if results.multi_hand_landmarks:
+            hands = np.stack(
+                [landmarks_to_array(hand) for hand in results.multi_hand_landmarks]
+            )
+
+        # Per-hand velocity of the landmark centroid, matched by detection order
+        self._velocity = None
+        if (
+            hands is not None
+            and self._hands is not None
+            and hands.shape == self._hands.shape
+            and timestamp > self._inference_timestamp
+        ):
+            displacement = hands.mean(axis=1) - self._hands.mean(axis=1)
+            self._velocity = displacement / (timestamp - self._inference_timestamp)
+
+        self._hands = hands
+        self._handedness = results.multi_handedness
+        self._inference_timestamp = timestamp
+        self._frames_since_inference = 0
+
+    def predict(self, timestamp):
+        """
+        Estimate the hands on a skipped frame.
+        :param timestamp: Frame time in seconds
+        :return: HandResults with one (21, 3) array per hand
+        """
+        if self._hands is None:
+            return HandResults(None, None)
+
+        hands = self._hands
+        if self._velocity is not None:
+            elapsed = min(timestamp - self._inference_timestamp, self.max_horizon)
+            hands = hands + (self._velocity * elapsed)[:, np.newaxis, :].astype(
+                np.float32
+            )
+        return HandResults(list(hands), self._handedness)
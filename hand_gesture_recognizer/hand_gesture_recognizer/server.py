@@ -0,0 +1,534 @@
+import collections
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .uplink import UplinkEvent, UplinkHand, decode_packet, encode_packet
+
+logger = logging.getLogger(__name__)
+
+# Wire protocol, little-endian over TCP. After connecting, a client gets one
+# reply (ACCEPTED with its client id as the frame id, or REJECTED before the
+# server closes the connection). It then sends frames, each a FRAME header
+# followed by the JPEG bytes or the raw BGR pixels, and gets one reply per
+# frame: a REPLY header followed by an uplink packet (see uplink.py) with the
+# frame's events, active gestures and, if asked for, its hands. A frame
+# replaced by a newer one before a worker got to it is answered with
+# DROPPED straight away, so replies can overtake each other; match them by
+# frame id.
+FRAME = struct.Struct("<BBHHIdI")  # encoding, flags, width, height, frame id, timestamp, size
+REPLY = struct.Struct("<BIfI")  # status, frame id, seconds spent in the server, size
+JPEG = 0
+RAW = 1
+WANT_LANDMARKS = 1
+FLIP = 2
+ACCEPTED = 0
+OK = 1
+DROPPED = 2
+REJECTED = 3
+FAILED = 4
+MAX_FRAME_BYTES = 64 << 20
+# Client ids go into the uint16 source field of uplink packets
+MAX_CLIENT_ID = 0xFFFF
+
+
+def _headless_recognizer():
+    from .main import GestureRecognizer
+
+    return GestureRecognizer(headless=True)
+
+
+class _Client:
+    """Per-connection state: its recognizer, Hands graph and frame mailbox."""
+
+    def __init__(self, client_id, connection, recognizer, hands):
+        self.id = client_id
+        self.connection = connection
+        self.recognizer = recognizer
+        self.hands = hands
+        self.frame = None  # newest frame no worker has taken yet
+        self.running = False  # a worker is processing one of its frames
+        self.closed = False
+        self.recycled = False  # its graph went back to the pool
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self._send_lock = threading.Lock()
+
+    def reply(self, status, frame_id, seconds=0.0, payload=b""):
+        """:return: False if the reply could not be sent"""
+        with self._send_lock:
+            try:
+                self.connection.sendall(REPLY.pack(status, frame_id, seconds, len(payload)) + payload)
+            except OSError:
+                return False
+        return True
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.gesture_server._serve_client(self.request, self.rfile)
+
+
+class _TcpServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class GestureServer:
+    """
+    Runs gesture recognition for many clients that only capture frames.
+    Clients stream JPEG or raw BGR frames over TCP (see GestureClient) and
+    get gestures, and optionally landmarks, back. Every client has its own
+    GestureRecognizer and Hands graph, so tracking, swipe and gesture state
+    never mix between clients; graphs of clients that left are reset and
+    reused. A fixed pool of worker threads runs inference, taking clients
+    round-robin.
+
+    Each client has room for one waiting frame: a newer frame replaces it and
+    the old one is answered as dropped, so an overloaded server serves every
+    client its newest frames at a lower rate instead of building up delay.
+    New clients are turned away beyond `max_clients`, or while the workers
+    have been busier than `max_utilization` recently.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=5006,
+        workers=None,
+        max_clients=8,
+        max_utilization=0.95,
+        recognizer_factory=None,
+    ):
+        """
+        :param host: Interface to listen on; '0.0.0.0' for other machines
+        :param port: TCP port; a free one if 0, see address
+        :param workers: Inference threads; one per CPU if None. MediaPipe
+            releases the GIL while it runs, so threads run in parallel
+        :param max_clients: Clients served at once, each holding a Hands graph
+        :param max_utilization: Share of worker time in use above which new
+            clients are rejected
+        :param recognizer_factory: Callable returning the GestureRecognizer
+            of a new client, e.g. with rules, templates or a backend preset;
+            a headless default one if None
+        """
+        if not 1 <= max_clients <= MAX_CLIENT_ID:
+            raise ValueError("max_clients must be between 1 and %d" % MAX_CLIENT_ID)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_clients = max_clients
+        self.max_utilization = max_utilization
+        self.recognizer_factory = recognizer_factory or _headless_recognizer
+        self.clients = {}
+        self.rejected = 0
+        self.processed = 0
+        self.dropped = 0
+        self.utilization = 0.0
+        self._next_id = 1
+        self._idle_hands = []
+        self._ready = collections.deque()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._busy = 0.0  # seconds workers spent processing
+        self._load_sample = (time.perf_counter(), 0.0)
+        self._server = _TcpServer((host, port), _Handler)
+        self._server.gesture_server = self
+        self._threads = []
+
+    @property
+    def address(self):
+        return self._server.server_address
+
+    def start(self):
+        """Start the workers and accept clients in the background; returns self."""
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name="gesture-server-%d" % index, daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.1}, daemon=True
+        )
+        thread.start()
+        self._threads.append(thread)
+        return self
+
+    def run(self):
+        """Serve until stop() or Ctrl+C."""
+        self.start()
+        try:
+            while not self._closed:
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _measure_load(self):
+        """Refresh `utilization` from the busy time since the last sample."""
+        now = time.perf_counter()
+        sampled_at, busy = self._load_sample
+        if now - sampled_at >= 0.25:
+            self.utilization = (self._busy - busy) / ((now - sampled_at) * self.workers)
+            self._load_sample = (now, self._busy)
+        return self.utilization
+
+    def _admit(self, connection):
+        """:return: A new _Client, or None if the server is full"""
+        with self._condition:
+            if (
+                self._closed
+                or len(self.clients) >= self.max_clients
+                or self._measure_load() > self.max_utilization
+            ):
+                self.rejected += 1
+                return None
+            # Ids wrap around, skipping those of clients still connected
+            client_id = self._next_id
+            while client_id in self.clients:
+                client_id = client_id % MAX_CLIENT_ID + 1
+            self._next_id = client_id % MAX_CLIENT_ID + 1
+            hands = self._idle_hands.pop() if self._idle_hands else None
+            # Reserve the slot before building anything slow outside the lock
+            self.clients[client_id] = None
+
+        try:
+            recognizer = self.recognizer_factory()
+            if hands is None:
+                hands = recognizer._take_hands()
+            else:
+                hands.reset()
+        except Exception:
+            with self._condition:
+                del self.clients[client_id]
+            if hands is not None:
+                hands.close()
+            raise
+        client = _Client(client_id, connection, recognizer, hands)
+        with self._condition:
+            self.clients[client_id] = client
+        return client
+
+    def _release(self, client):
+        with self._condition:
+            client.closed = True
+            if client.frame is not None:
+                client.frame = None
+                try:
+                    self._ready.remove(client)
+                except ValueError:
+                    pass
+            del self.clients[client.id]
+            self._recycle(client)
+
+    def _close_client(self, client):
+        """Stop serving a client whose connection failed. Call with the lock held."""
+        client.closed = True
+        client.frame = None
+        try:
+            self._ready.remove(client)
+        except ValueError:
+            pass
+        try:
+            # Wakes the connection's reader, which then releases the client
+            client.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._recycle(client)
+
+    def _recycle(self, client):
+        """
+        Keep a closed client's graph for the next client, once no worker uses
+        it; the only place graphs return to the pool. Call with the lock held.
+        """
+        if not client.closed or client.running or client.recycled:
+            return
+        client.recycled = True
+        if self._closed or len(self._idle_hands) >= self.max_clients:
+            client.hands.close()
+        else:
+            self._idle_hands.append(client.hands)
+
+    def _serve_client(self, connection, stream):
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        client = self._admit(connection)
+        if client is None:
+            connection.sendall(REPLY.pack(REJECTED, 0, 0.0, 0))
+            return
+        client.reply(ACCEPTED, client.id)
+        try:
+            while not client.closed:
+                header = stream.read(FRAME.size)
+                if len(header) < FRAME.size:
+                    break
+                encoding, flags, width, height, frame_id, timestamp, size = FRAME.unpack(header)
+                if size > MAX_FRAME_BYTES:
+                    logger.warning("Client %d sent a %d byte frame; disconnecting", client.id, size)
+                    break
+                data = stream.read(size)
+                if len(data) < size:
+                    break
+                arrived = time.perf_counter()
+                if not timestamp:
+                    timestamp = arrived
+                self._submit(
+                    client, (encoding, flags, width, height, frame_id, timestamp, data, arrived)
+                )
+        except OSError:
+            pass
+        finally:
+            self._release(client)
+
+    def _submit(self, client, frame):
+        with self._condition:
+            if client.closed:
+                return
+            replaced = client.frame
+            client.frame = frame
+            client.received += 1
+            if replaced is None and not client.running:
+                self._ready.append(client)
+                self._condition.notify()
+            elif replaced is not None:
+                client.dropped += 1
+                self.dropped += 1
+        if replaced is not None:
+            if not client.reply(DROPPED, replaced[4], time.perf_counter() - replaced[7]):
+                with self._condition:
+                    self._close_client(client)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while not self._ready and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                client = self._ready.popleft()
+                frame, client.frame = client.frame, None
+                client.running = True
+
+            start = time.perf_counter()
+            try:
+                status, payload = OK, self._process(client, frame)
+            except Exception:
+                logger.exception("Failed to process a frame of client %d", client.id)
+                status, payload = FAILED, b""
+            finished = time.perf_counter()
+            sent = client.reply(status, frame[4], finished - frame[7], payload)
+
+            with self._condition:
+                self._busy += finished - start
+                client.running = False
+                client.processed += 1
+                self.processed += 1
+                if not sent and not client.closed:
+                    self._close_client(client)
+                elif client.closed:
+                    self._recycle(client)
+                elif client.frame is not None:
+                    # Back of the line, so every client gets its turn
+                    self._ready.append(client)
+                    self._condition.notify()
+
+    def _process(self, client, frame):
+        import cv2
+
+        encoding, flags, width, height, frame_id, timestamp, data, _ = frame
+        if encoding == JPEG:
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                raise ValueError("Undecodable JPEG frame")
+        elif encoding == RAW:
+            image = np.frombuffer(data, dtype=np.uint8).reshape(height, width, 3)
+        else:
+            raise ValueError("Unknown frame encoding %d" % encoding)
+
+        recognizer = client.recognizer
+        _, results = recognizer._detect(client.hands, image, flip=bool(flags & FLIP))
+        gestures = recognizer._recognize(results, timestamp)
+        events = recognizer.handle_gesture_states(gestures)
+
+        records = [UplinkEvent(timestamp, gesture, state) for gesture, state in events]
+        if flags & WANT_LANDMARKS and results.multi_hand_landmarks:
+            from .landmarks import handedness_labels, landmarks_to_array
+
+            labels = handedness_labels(results)
+            for slot, (hand, label) in enumerate(zip(results.multi_hand_landmarks, labels)):
+                records.append(UplinkHand(timestamp, slot, label, landmarks_to_array(hand)))
+        return encode_packet(client.id, frame_id, records, gestures, delta=False)
+
+    def stats(self):
+        """:return: Dict of server-wide and per-client frame counters"""
+        with self._condition:
+            clients = {
+                client_id: {
+                    "received": client.received,
+                    "processed": client.processed,
+                    "dropped": client.dropped,
+                }
+                for client_id, client in self.clients.items()
+                if client is not None
+            }
+            return {
+                "clients": clients,
+                "processed": self.processed,
+                "dropped": self.dropped,
+                "rejected": self.rejected,
+                "utilization": self._measure_load(),
+            }
+
+    def stop(self):
+        """Stop accepting clients, disconnect the current ones and close the graphs."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+            connections = [client.connection for client in self.clients.values() if client]
+        if self._threads:
+            self._server.shutdown()
+        self._server.server_close()
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join(timeout=5)
+        with self._condition:
+            for hands in self._idle_hands:
+                hands.close()
+            self._idle_hands = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class GestureClient:
+    """
+    Streams frames to a GestureServer and reads back its results.
+    Frames can be sent without waiting for their replies (send/receive), or
+    one at a time (process).
+    """
+
+    def __init__(
+        self, host="127.0.0.1", port=5006, jpeg_quality=80, landmarks=False, flip=True, timeout=10.0
+    ):
+        """
+        :param jpeg_quality: JPEG quality of sent frames, or None to send raw
+            BGR pixels (no encoding cost, but about 10x the bytes)
+        :param landmarks: Ask for the hands' landmarks with every result
+        :param flip: Have the server mirror frames like the live camera view
+        :param timeout: Socket timeout in seconds
+        :raise ConnectionRefusedError: If the server is full
+        """
+        self.jpeg_quality = jpeg_quality
+        self.flags = (WANT_LANDMARKS if landmarks else 0) | (FLIP if flip else 0)
+        self._socket = socket.create_connection((host, port), timeout=timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._stream = self._socket.makefile("rb")
+        self._next_frame = 0
+        status, self.client_id, _, _ = self.receive()
+        if status != ACCEPTED:
+            self.close()
+            raise ConnectionRefusedError("Gesture server %s:%d is full" % (host, port))
+
+    def send(self, frame, timestamp=None):
+        """
+        Send one BGR frame without waiting for its result.
+        :param timestamp: Capture time in seconds on the client's clock, used
+            for swipe and motion detection; the arrival time if None
+        :return: The frame id its reply will carry
+        """
+        import cv2
+
+        frame_id = self._next_frame
+        self._next_frame = (self._next_frame + 1) & 0xFFFFFFFF
+        height, width = frame.shape[:2]
+        if self.jpeg_quality is None:
+            encoding, data = RAW, np.ascontiguousarray(frame, dtype=np.uint8).data
+        else:
+            success, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            if not success:
+                raise ValueError("Could not JPEG-encode the frame")
+            encoding, data = JPEG, data.data
+        header = FRAME.pack(
+            encoding, self.flags, width, height, frame_id, timestamp or 0.0, data.nbytes
+        )
+        self._socket.sendall(header)
+        self._socket.sendall(data)
+        return frame_id
+
+    def receive(self):
+        """
+        Wait for the next reply.
+        :return: (status, frame id, seconds spent in the server, UplinkPacket
+            or None); status is OK, DROPPED, FAILED, ACCEPTED or REJECTED
+        """
+        header = self._stream.read(REPLY.size)
+        if len(header) < REPLY.size:
+            raise ConnectionError("Gesture server closed the connection")
+        status, frame_id, seconds, size = REPLY.unpack(header)
+        packet = decode_packet(self._stream.read(size)) if size else None
+        return status, frame_id, seconds, packet
+
+    def process(self, frame, timestamp=None):
+        """
+        Send one frame and wait for its result.
+        :return: UplinkPacket with the frame's events, active gestures and
+            hands, or None if the server dropped the frame
+        """
+        frame_id = self.send(frame, timestamp)
+        while True:
+            status, reply_id, _, packet = self.receive()
+            if reply_id == frame_id:
+                if status == FAILED:
+                    raise RuntimeError("Gesture server failed to process the frame")
+                return packet
+
+    def close(self):
+        self._stream.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve gesture recognition to frame-streaming clients.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5006)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-clients", type=int, default=8)
+    parser.add_argument("--backend", default="balanced", help="Backend preset of every client")
+    args = parser.parse_args()
+
+    def factory():
+        from .main import GestureRecognizer
+
+        return GestureRecognizer(headless=True, backend=args.backend)
+
+    logging.basicConfig(level=logging.INFO)
+    server = GestureServer(args.host, args.port, args.workers, args.max_clients, recognizer_factory=factory)
+    logger.info("Serving gestures on %s:%d", *server.address)
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import math
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, WRIST
+
+# The palm axis, wrist to middle finger MCP joint, barely changes with the
+# finger pose, so it serves as the reference for rotation and scale
+MIDDLE_MCP = 9
+
+# Feature vector: x, y, z of every landmark but the wrist, which is always
+# the origin after normalisation
+FEATURES = (NUM_LANDMARKS - 1) * 3
+
+
+def normalize_landmarks(hands, aspect_ratio=1.0):
+    """
+    Remove translation, scale and in-plane rotation from hand landmarks.
+    The wrist is moved to the origin, the hand is rotated so the palm axis
+    points up (towards -y) and scaled so the palm axis has unit length.
+    :param hands: Landmark array of shape (..., 21, 3)
+    :param aspect_ratio: Width / height of the frame the landmarks were
+        normalised against, so x and y are scaled alike before rotating
+    :return: float32 array of the same shape
+    """
+    hands = np.asarray(hands, dtype=np.float32)
+    centred = hands - hands[..., WRIST : WRIST + 1, :]
+    # MediaPipe scales z like x
+    axis = centred[..., MIDDLE_MCP, :] * np.array(
+        (aspect_ratio, 1.0, aspect_ratio), dtype=np.float32
+    )
+
+    # Aspect correction, rotation of the palm axis onto (0, -1) and scaling
+    # to unit palm length as one 3x3 matrix applied to row vectors
+    if centred.ndim == 2:
+        # Scalar path for the per-frame case
+        x, y, z = axis.tolist()
+        planar = math.hypot(x, y)
+        # A degenerate hand (all landmarks on the wrist) is left unrotated
+        sin, cos = (x / planar, y / planar) if planar > 1e-9 else (0.0, -1.0)
+        scale = 1.0 / (math.sqrt(planar * planar + z * z) or 1.0)
+        transform = np.array(
+            [
+                [-cos * aspect_ratio * scale, -sin * aspect_ratio * scale, 0.0],
+                [sin * scale, -cos * scale, 0.0],
+                [0.0, 0.0, aspect_ratio * scale],
+            ],
+            dtype=np.float32,
+        )
+        return centred @ transform
+
+    planar = np.hypot(axis[..., 0], axis[..., 1])
+    degenerate = planar <= 1e-9
+    planar[degenerate] = 1.0
+    sin = axis[..., 0] / planar
+    cos = axis[..., 1] / planar
+    sin[degenerate] = 0.0
+    cos[degenerate] = -1.0
+    length = np.linalg.norm(axis, axis=-1)
+    scale = 1.0 / np.where(length > 1e-9, length, 1.0)
+    transform = np.zeros(axis.shape[:-1] + (3, 3), dtype=np.float32)
+    transform[..., 0, 0] = -cos * aspect_ratio * scale
+    transform[..., 0, 1] = -sin * aspect_ratio * scale
+    transform[..., 1, 0] = sin * scale
+    transform[..., 1, 1] = -cos * scale
+    transform[..., 2, 2] = aspect_ratio * scale
+    return centred @ transform
+
+
+class GestureTemplates:
+    """
+    Custom gestures defined by recorded landmark examples.
+    Every example is normalised for translation, scale and rotation and stored
+    as a row of one feature matrix, so a hand is classified against all
+    templates with a single matrix product: the nearest template's gesture
+    wins if it is close enough. Distances are root mean square landmark
+    offsets in palm lengths.
+    """
+
+    def __init__(self, max_distance=0.15, mirror=True, aspect_ratio=1.0):
+        """
+        :param max_distance: Hands farther than this from every template are
+            rejected (classified as None)
+        :param mirror: Also match the mirror image of every example, so
+            examples of one hand recognise the other hand too
+        :param aspect_ratio: Width / height of the frames landmarks come from
+        """
+        self.max_distance = max_distance
+        self.mirror = mirror
+        self.aspect_ratio = aspect_ratio
+        self.names = []  # gesture names, indexed by label
+        self._examples = {}  # name -> (N, FEATURES) features as added
+        self._features = np.empty((0, FEATURES), dtype=np.float32)
+        self._squared_norms = np.empty(0, dtype=np.float32)
+        self._group_starts = np.empty(0, dtype=np.intp)
+
+    def __len__(self):
+        return len(self._features)
+
+    def features(self, hands):
+        """
+        :param hands: Landmark array of shape (..., 21, 3)
+        :return: Normalised feature vectors of shape (..., 60)
+        """
+        normalized = normalize_landmarks(hands, self.aspect_ratio)
+        return normalized[..., 1:, :].reshape(normalized.shape[:-2] + (FEATURES,))
+
+    def add(self, name, examples):
+        """
+        Add examples of a gesture, creating the gesture if it is new.
+        :param name: Gesture name passed to registered functions
+        :param examples: (21, 3) landmark array, a stack of shape (N, 21, 3),
+            or a path to a recording written by LandmarkRecorder, whose
+            detected hands are all used
+        """
+        if isinstance(examples, str):
+            from .recording import LandmarkReplay
+
+            records = LandmarkReplay(examples).records
+            slots = np.arange(records["landmarks"].shape[1])
+            examples = records["landmarks"][slots < records["count"][:, None]]
+        examples = np.asarray(examples, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+        if not len(examples):
+            raise ValueError("No examples given for gesture %r" % name)
+
+        features = self.features(examples)
+        if name in self._examples:
+            features = np.concatenate([self._examples[name], features])
+        self._examples[name] = features
+        self._rebuild()
+
+    def remove(self, name):
+        """Forget a gesture and its examples."""
+        del self._examples[name]
+        self._rebuild()
+
+    def _rebuild(self):
+        # Rows are grouped by gesture so the per-gesture minimum is one
+        # reduceat over the distance matrix
+        self.names = list(self._examples)
+        blocks = []
+        for features in self._examples.values():
+            if self.mirror:
+                mirrored = features.reshape(-1, NUM_LANDMARKS - 1, 3).copy()
+                mirrored[..., 0] *= -1.0
+                features = np.concatenate([features, mirrored.reshape(-1, FEATURES)])
+            blocks.append(features)
+        sizes = [len(block) for block in blocks]
+        if blocks:
+            self._features = np.ascontiguousarray(np.concatenate(blocks))
+        else:
+            self._features = np.empty((0, FEATURES), dtype=np.float32)
+        self._squared_norms = np.einsum("ij,ij->i", self._features, self._features)
+        self._group_starts = np.cumsum([0] + sizes[:-1]).astype(np.intp)
+
+    def match(self, hands):
+        """
+        Find the nearest gesture of every hand.
+        :param hands: Landmark array of shape (N, 21, 3)
+        :return: (labels, distances, confidences) arrays of length N. Labels
+            index `names` and are -1 for rejected hands. Confidence is 1 for an
+            exact match and falls to 0 as the distance approaches
+            max_distance or the distance to the nearest other gesture.
+        """
+        hands = np.asarray(hands).reshape(-1, NUM_LANDMARKS, 3)
+        count = len(hands)
+        if not len(self._features):
+            return (
+                np.full(count, -1, dtype=np.intp),
+                np.full(count, np.inf, dtype=np.float32),
+                np.zeros(count, dtype=np.float32),
+            )
+
+        queries = self.features(hands)
+        # |q - t|^2 = |q|^2 - 2 q.t + |t|^2 over all templates at once
+        squared = queries @ self._features.T
+        squared *= -2.0
+        squared += self._squared_norms
+        squared += np.einsum("ij,ij->i", queries, queries)[:, None]
+        # Nearest example of every gesture
+        nearest = np.minimum.reduceat(squared, self._group_starts, axis=1)
+        np.maximum(nearest, 0.0, out=nearest)
+        distances = np.sqrt(nearest / (NUM_LANDMARKS - 1))
+
+        rows = np.arange(count)
+        labels = np.argmin(distances, axis=1)
+        best = distances[rows, labels]
+        reference = np.full(count, self.max_distance, dtype=np.float32)
+        if len(self.names) > 1:
+            distances[rows, labels] = np.inf
+            np.minimum(reference, distances.min(axis=1), out=reference)
+        confidences = np.clip(1.0 - best / np.maximum(reference, 1e-9), 0.0, 1.0)
+        labels[best > self.max_distance] = -1
+        return labels, best.astype(np.float32), confidences.astype(np.float32)
+
+    def match_one(self, hand):
+        """
+        Find the nearest gesture of a single hand, with scalar bookkeeping
+        instead of the array operations match() needs for a stack.
+        :param hand: (21, 3) landmark array
+        :return: (gesture name or None, distance, confidence) as in match()
+        """
+        if not len(self._features):
+            return None, math.inf, 0.0
+        query = self.features(hand)
+        squared = self._features @ query
+        squared *= -2.0
+        squared += self._squared_norms
+        offset = float(query @ query)
+        distances = [
+            math.sqrt(max(nearest + offset, 0.0) / (NUM_LANDMARKS - 1))
+            for nearest in np.minimum.reduceat(squared, self._group_starts).tolist()
+        ]
+        label = min(range(len(distances)), key=distances.__getitem__)
+        best = distances[label]
+        reference = min([self.max_distance] + distances[:label] + distances[label + 1 :])
+        confidence = min(max(1.0 - best / max(reference, 1e-9), 0.0), 1.0)
+        if best > self.max_distance:
+            return None, best, confidence
+        return self.names[label], best, confidence
+
+    def classify(self, hands, min_confidence=0.0):
+        """
+        Classify hands against the templates.
+        :param hands: A single (21, 3) landmark array or a stack of shape (N, 21, 3)
+        :param min_confidence: Matches below this confidence are rejected too
+        :return: Gesture name or None for a single hand; an object array of
+            names for a stack
+        """
+        hands = np.asarray(hands)
+        if hands.ndim == 2:
+            gesture, _, confidence = self.match_one(hands)
+            return gesture if confidence >= min_confidence else None
+        labels, _, confidences = self.match(hands)
+        names = np.array(self.names + [None], dtype=object)
+        labels[confidences < min_confidence] = -1
+        return names[labels]
+
+    def save(self, path):
+        """Store the examples of every gesture in an .npz file."""
+        np.savez(path, *self._examples.values(), names=np.array(self.names))
+
+    def load(self, path):
+        """Add the gestures stored by save()."""
+        with np.load(path) as stored:
+            for index, name in enumerate(stored["names"].tolist()):
+                features = stored["arr_%d" % index]
+                if name in self._examples:
+                    features = np.concatenate([self._examples[name], features])
+                self._examples[name] = features
+        self._rebuild()
+        return self
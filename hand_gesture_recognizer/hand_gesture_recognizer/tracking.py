@@ -0,0 +1,188 @@
+import numpy as np
+
+# Handedness codes stored per hand; -1 is unknown
+LABEL_CODES = {"Left": 0, "Right": 1}
+
+
+class HandTracker:
+    """
+    Stable IDs for the hands in view, and gesture state per hand.
+    Every tracked hand owns one of `max_hands` slots, and its ID is that slot,
+    so all per-hand state lives in fixed-size arrays indexed by hand ID and
+    the cost of a frame does not depend on how many hands come and go.
+    Detections are matched to the hands of earlier frames by the distance
+    between their landmark centroids and where those hands were heading,
+    with a penalty for differing handedness; a hand unseen for
+    `stale_after` seconds frees its slot. New hands only take free slots, so
+    a hand missed for a few frames keeps its ID and gesture state.
+
+    Gesture state is a boolean (hand, gesture) matrix: mark() sets the
+    gestures of the current frame and transitions() compares them with the
+    previous frame's, so two hands making the same gesture appear and
+    disappear independently. When a slot passes to a new hand, the old
+    hand's gestures disappear and the new hand's appear, even shared ones.
+    """
+
+    def __init__(self, max_hands=2, max_distance=0.25, handedness_cost=0.1, stale_after=0.5):
+        """
+        :param max_hands: Hands tracked at once; match the backend's
+            max_num_hands. Further detections get no ID.
+        :param max_distance: Farthest a centroid may move between frames, in
+            normalised image units, and still be the same hand
+        :param handedness_cost: Distance added to a match whose handedness
+            differs, so crossing hands keep their IDs
+        :param stale_after: Seconds a hand may go undetected and keep its ID
+        """
+        if max_hands < 1:
+            raise ValueError("max_hands must be at least 1")
+        self.max_hands = max_hands
+        self.max_distance = max_distance
+        self.handedness_cost = handedness_cost
+        self.stale_after = stale_after
+        self.centroids = np.zeros((max_hands, 2), dtype=np.float64)
+        self.velocities = np.zeros((max_hands, 2), dtype=np.float64)
+        self.labels = np.full(max_hands, -1, dtype=np.int8)
+        self.last_seen = np.full(max_hands, -np.inf, dtype=np.float64)
+        # Gesture names by column of the state matrices
+        self.gestures = []
+        self._columns = {}
+        self.active = np.zeros((max_hands, 8), dtype=bool)
+        self._current = np.zeros_like(self.active)
+        self._cost = np.empty((max_hands, max_hands), dtype=np.float64)
+        # Slots handed to new hands by the last update(), e.g. for per-hand
+        # state kept elsewhere
+        self.claimed = []
+        self._reassigned = np.zeros(max_hands, dtype=bool)
+
+    def update(self, hands, labels, timestamp):
+        """
+        Match this frame's hands to the tracked ones.
+        :param hands: Sequence of N (21, 3) landmark arrays
+        :param labels: N 'Left', 'Right' or None labels
+        :param timestamp: Capture time of the frame in seconds
+        :return: List of N hand IDs, -1 for hands beyond max_hands or while
+            every slot holds a hand seen within stale_after
+        """
+        self.claimed = []
+        count = len(hands)
+        if not count:
+            return []
+        centroids = np.asarray(hands)[:, :, :2].sum(axis=1)
+        centroids *= 1.0 / 21
+        codes = [LABEL_CODES.get(label, -1) for label in labels]
+
+        # Where each hand should be now if it kept moving as it did
+        elapsed = np.minimum(timestamp - self.last_seen, self.stale_after)
+        predicted = self.velocities * elapsed[:, None]
+        predicted += self.centroids
+
+        # Only the first max_hands detections are matched; any others may
+        # still take a slot left over
+        detections = min(count, self.max_hands)
+        cost = self._cost[:detections]
+        difference = centroids[:detections, None, :] - predicted
+        np.sqrt(np.einsum("ijk,ijk->ij", difference, difference), out=cost)
+        # Codes are -1, 0 or 1, so they sum to 1 only for a Left/Right pair
+        mismatch = np.array(codes[:detections], dtype=np.int8)[:, None] + self.labels == 1
+        np.add(cost, self.handedness_cost, out=cost, where=mismatch)
+        np.copyto(cost, np.inf, where=(cost > self.max_distance) | (elapsed >= self.stale_after))
+
+        # Cheapest pairs first; as good as an optimal assignment for a few hands
+        ids = [-1] * count
+        for _ in range(detections):
+            row, column = divmod(int(cost.argmin()), self.max_hands)
+            if cost[row, column] == np.inf:
+                break
+            ids[row] = column
+            cost[row] = np.inf
+            cost[:, column] = np.inf
+
+        if -1 in ids:
+            # New hands take free slots, those seen least recently first; a
+            # hand missed for a frame or two still owns its slot
+            age = self.last_seen.copy()
+            age[timestamp - age < self.stale_after] = np.inf
+            age[[slot for slot in ids if slot >= 0]] = np.inf
+            for row, slot in enumerate(ids):
+                if slot >= 0:
+                    continue
+                slot = int(age.argmin())
+                if age[slot] == np.inf:
+                    # Every slot holds a hand seen recently
+                    break
+                age[slot] = np.inf
+                ids[row] = slot
+                self.claimed.append(slot)
+                self._reassigned[slot] = True
+                self.last_seen[slot] = timestamp
+                self.velocities[slot] = 0.0
+                self.centroids[slot] = centroids[row]
+
+        # At most max_hands rows; plain row writes beat fancy indexing here
+        for row, slot in enumerate(ids):
+            if slot < 0:
+                continue
+            elapsed = timestamp - self.last_seen[slot]
+            if elapsed > 0:
+                self.velocities[slot] = centroids[row] - self.centroids[slot]
+                self.velocities[slot] /= elapsed
+            self.centroids[slot] = centroids[row]
+            # Keep a known handedness through frames that lack one
+            if codes[row] >= 0:
+                self.labels[slot] = codes[row]
+            self.last_seen[slot] = timestamp
+        return ids
+
+    def mark(self, hand_id, gesture):
+        """Record that the hand makes `gesture` in the current frame."""
+        column = self._columns.get(gesture)
+        if column is None:
+            column = self._add_gesture(gesture)
+        self._current[hand_id, column] = True
+
+    def _add_gesture(self, gesture):
+        column = len(self.gestures)
+        if column == self.active.shape[1]:
+            # Grow by doubling, so registering gestures stays amortised O(1)
+            for name in ("active", "_current"):
+                grown = np.zeros((self.max_hands, 2 * column), dtype=bool)
+                grown[:, :column] = getattr(self, name)
+                setattr(self, name, grown)
+        self.gestures.append(gesture)
+        self._columns[gesture] = column
+        return column
+
+    def transitions(self):
+        """
+        End the current frame.
+        :return: List of (hand ID, gesture, 'appear' | 'disappear') events
+            since the previous frame
+        """
+        events = []
+        changed = self._current != self.active
+        reassigned = self._reassigned
+        if reassigned.any():
+            # A slot taken by a new hand ends every gesture of the old one
+            changed[reassigned] = self._current[reassigned] | self.active[reassigned]
+            reassigned.fill(False)
+        if changed.any():
+            # Disappearances first, so a reassigned slot ends before it starts
+            for state, matrix in (("disappear", self.active), ("appear", self._current)):
+                for hand_id, column in zip(*np.nonzero(changed & matrix)):
+                    events.append((int(hand_id), self.gestures[column], state))
+        self.active, self._current = self._current, self.active
+        self._current.fill(False)
+        return events
+
+    def hand_gestures(self, hand_id):
+        """:return: Set of gestures the hand made in the last finished frame"""
+        return {self.gestures[column] for column in np.flatnonzero(self.active[hand_id])}
+
+    def reset(self):
+        self.velocities.fill(0.0)
+        self.labels.fill(-1)
+        self.last_seen.fill(-np.inf)
+        self.active.fill(False)
+        self._current.fill(False)
+        self._reassigned.fill(False)
+        self.claimed = []
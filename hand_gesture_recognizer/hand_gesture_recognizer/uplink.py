@@ -0,0 +1,675 @@
+import collections
+import logging
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .landmarks import NUM_LANDMARKS, handedness_labels, landmarks_to_array
+from .recording import HANDEDNESS_CODES, HANDEDNESS_LABELS
+
+logger = logging.getLogger(__name__)
+
+# Packet layout, little-endian: a header, a table of the gesture names used
+# in the packet (one length byte, whose high bit marks gestures active when
+# the packet was sent, then UTF-8), then records until the end of the packet.
+# Every packet decodes on its own, so a lost UDP datagram loses only its own
+# records, and the active flags let a consumer resynchronise after a loss.
+MAGIC = b"HG"
+VERSION = 1
+HEADER = struct.Struct("<2sBBHId")  # magic, version, names, source, sequence, base time
+# Record: kind, time since the base time in TIME_UNITs; events follow with a
+# name index, hands with (slot << 2 | handedness code + 1) and their landmarks
+RECORD = struct.Struct("<BH")
+APPEAR = 0
+DISAPPEAR = 1
+HAND = 2  # 63 int16: landmarks in 1/QUANT_SCALE of the frame
+HAND_DELTA = 3  # 63 int8: change since the slot's previous hand in the packet
+TIME_UNIT = 1e-4  # seconds; a packet spans at most 6.5 s
+MAX_OFFSET = 0xFFFF
+MAX_SPAN = (MAX_OFFSET - 1) * TIME_UNIT
+QUANT_SCALE = 16384.0  # 0.04 px on a 640 px frame, +-2 frames of range
+ACTIVE_FLAG = 0x80
+MAX_NAME_BYTES = 0x7F
+
+EVENT_SIZE = RECORD.size + 1
+HAND_SIZE = RECORD.size + 1 + NUM_LANDMARKS * 3 * 2
+STATES = ("appear", "disappear")
+LANDMARK_MODES = ("int16", "delta")
+
+# A gesture event or a quantised hand, as decoded from a packet.
+# timestamp: seconds; slot: the hand's index in its frame; handedness: 'Left',
+# 'Right' or None; landmarks: (21, 3) float32 array
+UplinkEvent = collections.namedtuple("UplinkEvent", ["timestamp", "gesture", "state"])
+UplinkHand = collections.namedtuple(
+    "UplinkHand", ["timestamp", "slot", "handedness", "landmarks"]
+)
+# source: publisher id; sequence: packet counter, for loss detection;
+# active: gestures active when the packet was sent
+UplinkPacket = collections.namedtuple(
+    "UplinkPacket", ["source", "sequence", "active", "events", "hands"]
+)
+
+
+def encode_packet(source, sequence, records, active=(), delta=True):
+    """
+    Encode gesture events and hands into one packet.
+    :param source: Publisher id, 0-65535
+    :param sequence: Packet counter, wrapped to 32 bits
+    :param records: UplinkEvent and UplinkHand records in time order
+    :param active: Gestures active at the end of the packet
+    :param delta: Send a hand as int8 changes from the previous hand in the
+        same slot where they fit, rather than always as int16
+    :return: bytes
+    """
+    names = {}
+
+    def name_index(name):
+        index = names.get(name)
+        if index is None:
+            if len(names) == 0xFF:
+                raise ValueError("More than 255 gesture names in one packet")
+            index = names[name] = len(names)
+        return index
+
+    base = records[0].timestamp if records else 0.0
+    body = []
+    previous = {}  # slot -> quantised landmarks of its last hand
+    for record in records:
+        offset = int(round((record.timestamp - base) / TIME_UNIT))
+        if not 0 <= offset <= MAX_OFFSET:
+            raise ValueError("Records span more than %.1f s" % (MAX_OFFSET * TIME_UNIT))
+        if isinstance(record, UplinkEvent):
+            kind = APPEAR if record.state == "appear" else DISAPPEAR
+            body.append(RECORD.pack(kind, offset) + bytes((name_index(record.gesture),)))
+            continue
+
+        quantised = np.clip(
+            np.rint(np.asarray(record.landmarks, dtype=np.float32) * QUANT_SCALE),
+            -0x8000,
+            0x7FFF,
+        ).astype(np.int32)
+        hand = record.slot << 2 | HANDEDNESS_CODES.get(record.handedness, -1) + 1
+        last = previous.get(record.slot)
+        previous[record.slot] = quantised
+        if delta and last is not None:
+            change = quantised - last
+            if np.abs(change).max() <= 0x7F:
+                body.append(RECORD.pack(HAND_DELTA, offset) + bytes((hand,)))
+                body.append(change.astype(np.int8).tobytes())
+                continue
+        body.append(RECORD.pack(HAND, offset) + bytes((hand,)))
+        body.append(quantised.astype("<i2").tobytes())
+
+    for name in active:
+        name_index(name)
+    table = []
+    for name in names:
+        encoded = name.encode("utf-8")
+        if len(encoded) > MAX_NAME_BYTES:
+            raise ValueError("Gesture name %r is longer than %d bytes" % (name, MAX_NAME_BYTES))
+        table.append(bytes((len(encoded) | (ACTIVE_FLAG if name in active else 0),)) + encoded)
+
+    header = HEADER.pack(MAGIC, VERSION, len(names), source, sequence & 0xFFFFFFFF, base)
+    return b"".join([header] + table + body)
+
+
+def decode_packet(data):
+    """
+    Decode a packet written by encode_packet.
+    :param data: bytes of one packet
+    :return: UplinkPacket
+    """
+    data = memoryview(data)
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated packet")
+    magic, version, count, source, sequence, base = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a version %d gesture uplink packet" % VERSION)
+
+    position = HEADER.size
+    names = []
+    active = set()
+    try:
+        for _ in range(count):
+            length = data[position] & MAX_NAME_BYTES
+            name = bytes(data[position + 1 : position + 1 + length]).decode("utf-8")
+            if data[position] & ACTIVE_FLAG:
+                active.add(name)
+            names.append(name)
+            position += 1 + length
+
+        events = []
+        hands = []
+        previous = {}
+        while position < len(data):
+            kind, offset = RECORD.unpack_from(data, position)
+            timestamp = base + offset * TIME_UNIT
+            position += RECORD.size
+            if kind in (APPEAR, DISAPPEAR):
+                events.append(UplinkEvent(timestamp, names[data[position]], STATES[kind]))
+                position += 1
+                continue
+            if kind not in (HAND, HAND_DELTA):
+                raise ValueError("Unknown record kind %d" % kind)
+
+            slot, code = data[position] >> 2, (data[position] & 3) - 1
+            position += 1
+            if kind == HAND:
+                size = NUM_LANDMARKS * 3 * 2
+                quantised = np.frombuffer(data[position : position + size], dtype="<i2")
+                quantised = quantised.astype(np.int32)
+            else:
+                size = NUM_LANDMARKS * 3
+                change = np.frombuffer(data[position : position + size], dtype=np.int8)
+                quantised = previous[slot] + change
+            position += size
+            previous[slot] = quantised
+            landmarks = (quantised.reshape(NUM_LANDMARKS, 3) / QUANT_SCALE).astype(np.float32)
+            hands.append(UplinkHand(timestamp, slot, HANDEDNESS_LABELS.get(code), landmarks))
+    except (IndexError, KeyError, struct.error):
+        raise ValueError("Truncated or corrupt packet")
+    return UplinkPacket(source, sequence, frozenset(active), events, hands)
+
+
+class UdpTransport:
+    """Sends each packet as one UDP datagram."""
+
+    def __init__(self, host, port):
+        self.address = (host, port)
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send(self, payload):
+        self._socket.sendto(payload, self.address)
+
+    def close(self):
+        self._socket.close()
+
+
+def _mqtt_length(length):
+    """MQTT variable-length integer."""
+    encoded = bytearray()
+    while True:
+        length, digit = divmod(length, 128)
+        encoded.append(digit | (0x80 if length else 0))
+        if not length:
+            return bytes(encoded)
+
+
+def _mqtt_string(text):
+    encoded = text.encode("utf-8")
+    return struct.pack(">H", len(encoded)) + encoded
+
+
+def _mqtt_packet(first_byte, body):
+    return bytes((first_byte,)) + _mqtt_length(len(body)) + body
+
+
+def _read_exactly(stream, size):
+    data = b""
+    while len(data) < size:
+        chunk = stream.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed")
+        data += chunk
+    return data
+
+
+def _read_mqtt_packet(stream):
+    """:return: (first byte, body) of the next MQTT packet"""
+    first_byte = _read_exactly(stream, 1)[0]
+    length = 0
+    for shift in range(0, 28, 7):
+        digit = _read_exactly(stream, 1)[0]
+        length |= (digit & 0x7F) << shift
+        if not digit & 0x80:
+            break
+    return first_byte, _read_exactly(stream, length)
+
+
+class MqttTransport:
+    """
+    Publishes each packet as one QoS 0 MQTT 3.1.1 message.
+    The client is built in, so no MQTT library is needed. It connects on the
+    first send and, after a failure, reconnects on a later send with
+    exponential backoff. Consumers in a browser can subscribe through the
+    broker's MQTT over WebSocket listener.
+    """
+
+    def __init__(
+        self, host, port=1883, topic="gestures", client_id=None, keepalive=60, timeout=5.0,
+        max_backoff=30.0,
+    ):
+        """
+        :param host: Broker address
+        :param topic: Topic the packets are published to
+        :param client_id: MQTT client id; a random one if None
+        :param keepalive: Seconds the broker waits between messages before it
+            drops the connection; the publisher's heartbeat keeps it alive
+        :param timeout: Socket timeout for connecting and sending
+        :param max_backoff: Longest wait in seconds between reconnect attempts
+        """
+        self.address = (host, port)
+        self.topic = topic
+        self.client_id = client_id or "hand-gestures-%08x" % (id(self) & 0xFFFFFFFF)
+        self.keepalive = keepalive
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self._socket = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._topic = _mqtt_string(topic)
+
+    def _connect(self):
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise ConnectionError("MQTT broker %s:%d is unreachable" % self.address)
+        try:
+            stream = socket.create_connection(self.address, timeout=self.timeout)
+            stream.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            body = (
+                _mqtt_string("MQTT")
+                + struct.pack(">BBH", 4, 0x02, self.keepalive)  # level 4, clean session
+                + _mqtt_string(self.client_id)
+            )
+            stream.sendall(_mqtt_packet(0x10, body))
+            kind, reply = _read_mqtt_packet(stream)
+            if kind >> 4 != 2 or len(reply) < 2 or reply[1] != 0:
+                stream.close()
+                raise ConnectionError("MQTT broker refused the connection")
+        except OSError:
+            self._backoff = min(max(self._backoff * 2.0, 0.5), self.max_backoff)
+            self._retry_at = now + self._backoff
+            raise
+        self._backoff = 0.0
+        self._socket = stream
+
+    def send(self, payload):
+        if self._socket is None:
+            self._connect()
+        try:
+            self._socket.sendall(_mqtt_packet(0x30, self._topic + payload))
+        except OSError:
+            self._socket.close()
+            self._socket = None
+            raise
+
+    def close(self):
+        if self._socket is not None:
+            try:
+                self._socket.sendall(_mqtt_packet(0xE0, b""))  # DISCONNECT
+            except OSError:
+                pass
+            self._socket.close()
+            self._socket = None
+
+
+class GesturePublisher:
+    """
+    Streams gesture events, and optionally quantised landmarks, to remote
+    consumers through a transport.
+    publish() only appends to a queue; a background thread batches what
+    was queued into packets of at most `max_bytes`, sends a packet as soon
+    as it is full or its oldest frame is `max_delay` old, and sends an
+    empty packet with the active gestures every `heartbeat` seconds when
+    nothing happens. When `max_pending` frames are waiting because the
+    transport is slow, the oldest are dropped; the newest frame's active
+    gestures still reach consumers.
+    """
+
+    def __init__(
+        self,
+        transport,
+        landmarks=None,
+        max_delay=0.0,
+        max_bytes=1200,
+        max_pending=256,
+        heartbeat=1.0,
+        source=0,
+        clock_offset=None,
+    ):
+        """
+        :param transport: Object with send(payload) and close(), e.g.
+            UdpTransport or MqttTransport
+        :param landmarks: Also send every hand: 'int16' as absolute int16
+            coordinates (130 bytes per hand), 'delta' as int8 changes where
+            they fit (67 bytes); events only if None
+        :param max_delay: Longest time in seconds a record waits for more to
+            batch with; by default frames are sent as soon as the send thread
+            is free, so only frames queued during a send share a packet.
+            Above the frame interval, packets carry several frames, and
+            'delta' landmarks get smaller
+        :param max_bytes: Packet size limit; keep it below the path MTU for UDP
+        :param max_pending: Frames queued for the send thread before the
+            oldest are dropped
+        :param heartbeat: Seconds between packets when nothing happens, or None
+        :param source: Id of this publisher in every packet, 0-65535
+        :param clock_offset: Added to frame timestamps before sending; by
+            default converts time.perf_counter() timestamps to Unix time
+        """
+        if landmarks is not None and landmarks not in LANDMARK_MODES:
+            raise ValueError(
+                "landmarks must be one of %s or None, not %r" % (", ".join(LANDMARK_MODES), landmarks)
+            )
+        if max_bytes < HEADER.size + 2 * (MAX_NAME_BYTES + 1) + HAND_SIZE:
+            raise ValueError("max_bytes is too small for a packet with one hand")
+        self.transport = transport
+        self.landmarks = landmarks
+        self.max_delay = max_delay
+        self.max_bytes = max_bytes
+        self.max_pending = max_pending
+        self.heartbeat = heartbeat
+        self.source = source
+        if clock_offset is None:
+            clock_offset = time.time() - time.perf_counter()
+        self.clock_offset = clock_offset
+        self.active = frozenset()
+        self.sequence = 0
+        self.dropped = 0  # frames dropped because the queue was full
+        self.failed = 0  # packets the transport failed to send
+        self._pending = collections.deque()
+        self._pending_bytes = 0
+        self._first = 0.0
+        self._last_sent = time.perf_counter()
+        self._closed = False
+        self._failing = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="gesture-uplink", daemon=True)
+        self._thread.start()
+
+    def publish(self, timestamp, events, gestures, results=None):
+        """
+        Queue one frame's events, and its hands if landmarks are sent.
+        :param timestamp: Capture time of the frame in seconds
+        :param events: (gesture, 'appear' | 'disappear') events of the frame
+        :param gestures: Set of gestures active after the frame
+        :param results: MediaPipe results or HandResults of the frame; they
+            must not be modified afterwards
+        """
+        if self.landmarks is None or results is None or not results.multi_hand_landmarks:
+            results = None
+            if not events:
+                return
+        size = EVENT_SIZE * len(events)
+        if results is not None:
+            size += HAND_SIZE * len(results.multi_hand_landmarks)
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("GesturePublisher is closed")
+            if len(self._pending) >= self.max_pending:
+                self._pending_bytes -= self._pending.popleft()[-1]
+                self.dropped += 1
+            # Wake the send thread when its deadline changes or a packet is full
+            wake = not self._pending
+            if wake:
+                self._first = time.perf_counter()
+            self._pending.append((timestamp, events, gestures, results, size))
+            self._pending_bytes += size
+            if wake or self._pending_bytes >= self.max_bytes:
+                self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed and self._pending_bytes < self.max_bytes:
+                    if self._pending:
+                        wait = self._first + self.max_delay - time.perf_counter()
+                    elif self.heartbeat is not None:
+                        wait = self._last_sent + self.heartbeat - time.perf_counter()
+                    else:
+                        wait = None
+                    if wait is not None and wait <= 0:
+                        break
+                    self._condition.wait(wait)
+                items = self._pending
+                self._pending = collections.deque()
+                self._pending_bytes = 0
+                closed = self._closed
+            try:
+                self._send(items)
+            except Exception:
+                logger.exception("Failed to encode gesture uplink packets")
+            if closed:
+                return
+
+    def _records(self, timestamp, events, results):
+        records = [UplinkEvent(timestamp, gesture, state) for gesture, state in events]
+        if results is not None:
+            labels = handedness_labels(results)
+            for slot, (hand, label) in enumerate(zip(results.multi_hand_landmarks, labels)):
+                records.append(UplinkHand(timestamp, slot, label, landmarks_to_array(hand)))
+        return records
+
+    def _send(self, items):
+        """Split queued frames into packets of at most max_bytes and send them."""
+        records = []
+        names = set()
+        size = HEADER.size
+        for timestamp, events, gestures, results, _ in items:
+            timestamp += self.clock_offset
+            for name in gestures:
+                if name not in names:
+                    names.add(name)
+                    size += len(name.encode("utf-8")) + 1
+            for record in self._records(timestamp, events, results):
+                if isinstance(record, UplinkEvent):
+                    record_size = EVENT_SIZE
+                    if record.gesture not in names:
+                        record_size += len(record.gesture.encode("utf-8")) + 1
+                else:
+                    record_size = HAND_SIZE
+                # Also start a new packet when the time offsets would not fit,
+                # after a long stall or when timestamps go backwards
+                if records and (
+                    size + record_size > self.max_bytes
+                    or not 0.0 <= timestamp - records[0].timestamp < MAX_SPAN
+                ):
+                    self._transmit(records)
+                    records = []
+                    names = set(self.active)
+                    size = HEADER.size + sum(len(name.encode("utf-8")) + 1 for name in names)
+                    if isinstance(record, UplinkEvent) and record.gesture not in names:
+                        record_size = EVENT_SIZE + len(record.gesture.encode("utf-8")) + 1
+                if isinstance(record, UplinkEvent):
+                    names.add(record.gesture)
+                records.append(record)
+                size += record_size
+            self.active = frozenset(gestures)
+
+        if records or (
+            self.heartbeat is not None
+            and time.perf_counter() - self._last_sent >= self.heartbeat
+        ):
+            self._transmit(records)
+
+    def _transmit(self, records):
+        payload = encode_packet(
+            self.source, self.sequence, records, self.active, self.landmarks == "delta"
+        )
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        self._last_sent = time.perf_counter()
+        try:
+            self.transport.send(payload)
+        except OSError as error:
+            self.failed += 1
+            # Log once per outage, not once per packet
+            if not self._failing:
+                logger.warning("Gesture uplink send failed: %s", error)
+            self._failing = True
+        else:
+            if self._failing:
+                logger.info("Gesture uplink recovered after %d failed packets", self.failed)
+            self._failing = False
+
+    def close(self, wait=True):
+        """
+        Stop accepting frames and close the transport.
+        :param wait: Send the frames already queued before returning
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            if not wait:
+                self._pending = collections.deque()
+                self._pending_bytes = 0
+            self._condition.notify()
+        self._thread.join()
+        self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def topic_matches(pattern, topic):
+    """
+    :param pattern: MQTT topic filter, possibly with '+' and '#' wildcards
+    :return: True if the topic matches the filter
+    """
+    levels = topic.split("/")
+    for index, level in enumerate(pattern.split("/")):
+        if level == "#":
+            return True
+        if index >= len(levels) or level not in ("+", levels[index]):
+            return False
+    return len(levels) == len(pattern.split("/"))
+
+
+class _MqttHandler(socketserver.BaseRequestHandler):
+    """One client connection of a LocalBroker."""
+
+    def setup(self):
+        self.filters = []
+        self.lock = threading.Lock()
+
+    def send(self, data):
+        with self.lock:
+            self.request.sendall(data)
+
+    def handle(self):
+        broker = self.server.broker
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            while True:
+                first_byte, body = _read_mqtt_packet(self.request)
+                kind = first_byte >> 4
+                if kind == 1:  # CONNECT
+                    self.send(_mqtt_packet(0x20, b"\x00\x00"))
+                    broker._clients.add(self)
+                elif kind == 3:  # PUBLISH
+                    length = struct.unpack_from(">H", body)[0]
+                    topic = bytes(body[2 : 2 + length]).decode("utf-8")
+                    position = 2 + length + (2 if first_byte & 0x06 else 0)
+                    broker._deliver(topic, bytes(body[position:]))
+                elif kind == 8:  # SUBSCRIBE
+                    packet_id = body[:2]
+                    position = 2
+                    granted = bytearray()
+                    while position < len(body):
+                        length = struct.unpack_from(">H", body, position)[0]
+                        self.filters.append(body[position + 2 : position + 2 + length].decode("utf-8"))
+                        position += 3 + length
+                        granted.append(0)
+                    self.send(_mqtt_packet(0x90, packet_id + bytes(granted)))
+                elif kind == 12:  # PINGREQ
+                    self.send(_mqtt_packet(0xD0, b""))
+                elif kind == 14:  # DISCONNECT
+                    return
+        except (OSError, ConnectionError, struct.error, UnicodeDecodeError):
+            pass
+        finally:
+            broker._clients.discard(self)
+
+
+class _UdpHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.server.broker.messages.put((None, self.request[0]))
+
+
+class _TcpServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class LocalBroker:
+    """
+    A small in-process MQTT broker and UDP sink, to try the uplink without
+    any infrastructure, e.g. in tests and benchmarks.
+    It speaks the part of MQTT 3.1.1 that QoS 0 publishers and subscribers
+    use and forwards publishes to matching subscribers. Every message it
+    receives is also put on `messages` as (topic, payload), with topic None
+    for UDP datagrams.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, udp_port=0):
+        """
+        :param port: MQTT port; a free one if 0, see mqtt_address
+        :param udp_port: UDP port; a free one if 0, see udp_address
+        """
+        self.messages = queue.Queue()
+        self._clients = set()
+        self._tcp = _TcpServer((host, port), _MqttHandler)
+        self._udp = socketserver.UDPServer((host, udp_port), _UdpHandler)
+        self._threads = []
+        for server in (self._tcp, self._udp):
+            server.broker = self
+            thread = threading.Thread(
+                target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def mqtt_address(self):
+        return self._tcp.server_address
+
+    @property
+    def udp_address(self):
+        return self._udp.server_address
+
+    def _deliver(self, topic, payload):
+        self.messages.put((topic, payload))
+        packet = None
+        for client in list(self._clients):
+            if any(topic_matches(pattern, topic) for pattern in client.filters):
+                if packet is None:
+                    packet = _mqtt_packet(0x30, _mqtt_string(topic) + payload)
+                try:
+                    client.send(packet)
+                except OSError:
+                    pass
+
+    def get(self, timeout=1.0):
+        """
+        :return: The next (topic, payload) received, or None after timeout
+        """
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        for server in (self._tcp, self._udp):
+            server.shutdown()
+            server.server_close()
+        for client in list(self._clients):
+            try:
+                client.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from .landmarks import FrameResult, landmarks_to_array
+
+# One hand backend per worker process, built by _init_worker
+_worker_hands = None
+
+
+def process_video(recognizer, path, hands=None, flip=True, include_landmarks=True):
+    """
+    Yield a FrameResult for every frame of a video file.
+    :param recognizer: GestureRecognizer holding gesture state and callbacks
+    :param path: Path of any video cv2.VideoCapture can open
+    :param hands: Open HandBackend or mp_hands.Hands to reuse; if None the
+        recognizer's warmed-up backend or a new one is used and closed at the end
+    :param flip: Mirror frames like the live camera view
+    :param include_landmarks: Attach the landmark array to each result
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError("Cannot open video file: %s" % path)
+
+    owns_hands = hands is None
+    if owns_hands:
+        hands = recognizer._take_hands()
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+
+    try:
+        index = 0
+        while True:
+            success, frame = cap.read()
+            if not success:
+                break
+            timestamp_ms = cap.get(cv2.CAP_PROP_POS_MSEC)
+            if not timestamp_ms and fps:
+                timestamp_ms = index * 1000.0 / fps
+
+            _, results = recognizer._detect(hands, frame, flip=flip)
+            gestures = recognizer._recognize(results, timestamp_ms / 1000.0)
+            events = recognizer.handle_gesture_states(gestures)
+
+            landmarks = None
+            if include_landmarks and results.multi_hand_landmarks:
+                landmarks = np.stack(
+                    [landmarks_to_array(hand) for hand in results.multi_hand_landmarks]
+                )
+
+            yield FrameResult(index, timestamp_ms, gestures, events, landmarks)
+            index += 1
+    finally:
+        cap.release()
+        if owns_hands:
+            hands.close()
+
+
+def _init_worker(recognizer_factory):
+    global _worker_hands
+    # Built from a recognizer so its backend setting applies
+    _worker_hands = recognizer_factory()._take_hands()
+
+
+def _process_file(path, recognizer_factory, flip, include_landmarks):
+    # Drop tracking state left over from the previous file
+    _worker_hands.reset()
+    recognizer = recognizer_factory()
+    return list(
+        recognizer.process_video(
+            path,
+            hands=_worker_hands,
+            flip=flip,
+            include_landmarks=include_landmarks,
+        )
+    )
+
+
+def _headless_recognizer():
+    from .main import GestureRecognizer
+
+    return GestureRecognizer(headless=True)
+
+
+def process_videos(
+    paths,
+    max_workers=None,
+    recognizer_factory=None,
+    flip=True,
+    include_landmarks=False,
+):
+    """
+    Recognize gestures in many video files in parallel, one file per task.
+    Each worker process builds a single hand backend and reuses it for
+    every file it is given.
+    :param paths: Iterable of video file paths
+    :param max_workers: Number of worker processes (defaults to the CPU count)
+    :param recognizer_factory: Picklable callable returning a fresh
+        GestureRecognizer per file, e.g. one with gestures registered
+    :param flip: Mirror frames like the live camera view
+    :param include_landmarks: Return landmark arrays too (more data to pickle)
+    :return: Generator of (path, list of FrameResult) in input order
+    """
+    paths = list(paths)
+    recognizer_factory = recognizer_factory or _headless_recognizer
+    max_workers = max_workers or os.cpu_count() or 1
+
+    # Spawn rather than fork: a forked child inherits MediaPipe's graph threads
+    # and crashes if the parent has already created a Hands instance
+    with ProcessPoolExecutor(
+        max_workers=min(max_workers, len(paths)) or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(recognizer_factory,),
+    ) as executor:
+        results = executor.map(
+            _process_file,
+            paths,
+            [recognizer_factory] * len(paths),
+            [flip] * len(paths),
+            [include_landmarks] * len(paths),
+        )
+        for path, frames in zip(paths, results):
+            yield path, frames
@@ -5,12 +5,12 @@ setup(
     version="0.1.0",
     description="A library for recognizing hand gestures using MediaPipe",
     author="Umesh Singh Verma",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*", "tests", "tests.*"]),
     install_requires=["opencv-python", "mediapipe", "numpy"],
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: MIT License",
         "Operating System :: OS Independent",
     ],
-    python_requires=">=3.6",
+    python_requires=">=3.8",
 )
@@ -0,0 +1,16 @@
+import cv2
+import numpy as np
+import pytest
+
+FRAMES = 60
+
+
+@pytest.fixture(scope="session")
+def clip(tmp_path_factory):
+    """Path of a small video file with FRAMES frames."""
+    path = str(tmp_path_factory.mktemp("video") / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (64, 48))
+    for index in range(FRAMES):
+        writer.write(np.full((48, 64, 3), index * 4, dtype=np.uint8))
+    writer.release()
+    return path
@@ -0,0 +1,46 @@
+import functools
+import time
+
+from hand_gesture_recognizer import CameraSource, GestureRecognizer
+from hand_gesture_recognizer.backends import StubBackend
+from hand_gesture_recognizer.parallel import ParallelPipeline
+
+from .conftest import FRAMES
+
+
+def test_file_delivers_every_frame_to_a_slow_reader(clip):
+    frames = 0
+    with CameraSource(clip) as source:
+        assert not source.live
+        while True:
+            item = source.read(timeout=1.0)
+            if item is None:
+                break
+            frames += 1
+            # Slower than decoding, which made the grabber skip frames
+            time.sleep(0.005)
+    assert frames == FRAMES
+    assert source.dropped == 0
+
+
+def stub_recognizer(clip):
+    return GestureRecognizer(
+        headless=True,
+        camera=clip,
+        instrument=True,
+        backend=functools.partial(StubBackend, latency=0.005),
+    )
+
+
+def test_run_infers_every_frame_of_a_file(clip):
+    recognizer = stub_recognizer(clip)
+    recognizer.run()
+    assert recognizer.stats()["frames"] == FRAMES
+
+
+def test_parallel_pipeline_processes_every_frame_of_a_file(clip):
+    pipeline = ParallelPipeline(stub_recognizer(clip), workers=2)
+    pipeline.run()
+    assert pipeline.frames_processed == FRAMES
+    assert pipeline.frames_skipped == 0
+    assert pipeline.dropped == 0
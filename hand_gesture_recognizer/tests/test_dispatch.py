@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from hand_gesture_recognizer.dispatch import GestureDispatcher
+
+
+def test_coalesce_keeps_the_backlog_within_max_pending():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def blocking(state):
+        started.set()
+        release.wait(5.0)
+        calls.append(("busy", state))
+
+    def record(gesture):
+        return lambda state: calls.append((gesture, state))
+
+    dispatcher = GestureDispatcher(max_workers=1, max_pending=3, overflow="coalesce")
+    try:
+        # The only worker is held up, so everything else waits
+        dispatcher.submit("busy", blocking, "appear")
+        assert started.wait(5.0)
+        for gesture in ("a", "b", "c"):
+            dispatcher.submit(gesture, record(gesture), "appear")
+        assert dispatcher.pending == 3
+
+        # A new gesture with a full backlog: the oldest waiting event gives way
+        assert dispatcher.submit("d", record("d"), "appear")
+        assert dispatcher.pending == 3
+        assert dispatcher.dropped == 1
+
+        # A gesture already waiting only replaces its own event
+        assert dispatcher.submit("c", record("c"), "disappear")
+        assert dispatcher.pending == 3
+        assert dispatcher.dropped == 2
+        for gesture in ("e", "f", "g", "h"):
+            dispatcher.submit(gesture, record(gesture), "appear")
+            assert dispatcher.pending <= 3
+    finally:
+        release.set()
+        dispatcher.close()
+
+    assert calls[0] == ("busy", "appear")
+    assert sorted(calls[1:]) == [("f", "appear"), ("g", "appear"), ("h", "appear")]
+    assert dispatcher.dropped == 6
+
+
+def test_max_pending_must_leave_room_for_an_event():
+    with pytest.raises(ValueError):
+        GestureDispatcher(max_pending=0)
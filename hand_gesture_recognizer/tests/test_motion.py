@@ -0,0 +1,60 @@
+import numpy as np
+
+from hand_gesture_recognizer.motion import MotionRecognizer
+
+from benchmarks.motion import circle, hand_at, line
+
+RATE = 30.0
+START = np.array([0.5, 0.4])
+
+
+def performance(path, seconds, size, rng, jitter=0.001):
+    """Hands following path(phase) from START, one per frame at RATE."""
+    phases = np.linspace(0.0, 1.0, int(seconds * RATE) + 1)
+    return [hand_at(START + size * path(phase), False, rng, jitter) for phase in phases]
+
+
+def idle(frames, rng):
+    """A hand drifting slowly around START."""
+    return [hand_at(START + rng.normal(0.0, 0.003, 2), False, rng, 0.002) for _ in range(frames)]
+
+
+def stream(recognizer, hands):
+    """:return: List of (frame index, motion) for every detected motion"""
+    matches = []
+    for index, hand in enumerate(hands):
+        motion = recognizer.update(hand, index / RATE)
+        if motion:
+            matches.append((index, motion))
+    return matches
+
+
+def make_recognizer(rng):
+    recognizer = MotionRecognizer(rate=RATE)
+    template = performance(circle(1.0), 1.0, 0.2, rng, jitter=0.0)
+    recognizer.add("circle", np.array(template), np.arange(len(template)) / RATE)
+    return recognizer
+
+
+def test_template_embedded_in_noise_matches_once_at_its_end():
+    rng = np.random.default_rng(0)
+    recognizer = make_recognizer(rng)
+    circle_hands = performance(circle(1.0), 1.0, 0.2, rng)
+    hands = idle(30, rng) + circle_hands + idle(30, rng)
+
+    matches = stream(recognizer, hands)
+    end = 30 + len(circle_hands) - 1
+    assert len(matches) == 1
+    index, motion = matches[0]
+    assert motion == "circle"
+    # Paths may skip template samples, so the match can complete a few
+    # frames before the performance does, but never before its last quarter
+    assert end - len(circle_hands) // 4 <= index <= end
+
+
+def test_unrelated_trajectory_does_not_match():
+    rng = np.random.default_rng(1)
+    recognizer = make_recognizer(rng)
+    hands = idle(30, rng) + performance(line(1.0, 0.0), 0.5, 0.3, rng) + idle(30, rng)
+    hands += performance(circle(-1.0), 1.0, 0.2, rng) + idle(30, rng)
+    assert stream(recognizer, hands) == []
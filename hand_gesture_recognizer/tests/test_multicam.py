@@ -0,0 +1,51 @@
+import functools
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from hand_gesture_recognizer.backends import StubBackend
+from hand_gesture_recognizer.main import GestureRecognizer
+from hand_gesture_recognizer.multicam import _camera_worker, read_slot, slot_dtype
+
+from benchmarks.synthetic import synthetic_hand
+
+from .conftest import FRAMES
+
+
+def test_camera_worker_uses_recognizer_backend(clip):
+    recognizers = []
+
+    def recognizer_factory():
+        recognizer = GestureRecognizer(
+            headless=True,
+            backend=functools.partial(StubBackend, synthetic_hand("fist"), ["Left"]),
+        )
+        recognizers.append(recognizer)
+        return recognizer
+
+    dtype = slot_dtype(2)
+    shm = shared_memory.SharedMemory(create=True, size=dtype.itemsize)
+    try:
+        slot = np.ndarray((1,), dtype=dtype, buffer=shm.buf)
+        slot[:] = np.zeros(1, dtype=dtype)
+        events = queue.Queue()
+        _camera_worker(0, clip, shm.name, 2, events, threading.Event(), recognizer_factory, True)
+
+        timestamp, frame, results = read_slot(slot[0])
+        slot = None
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # Every frame of the file went through the stub, stamped on perf_counter's clock
+    assert frame == FRAMES - 1
+    assert 0.0 < time.perf_counter() - timestamp < 60.0
+    assert len(results.multi_hand_landmarks) == 1
+    received = [events.get_nowait() for _ in range(events.qsize())]
+    assert [(index, gesture, state) for index, _, _, gesture, state in received] == [
+        (0, "fist", "appear"),
+        (0, None, None),
+    ]
@@ -0,0 +1,57 @@
+import functools
+import time
+
+import pytest
+
+from hand_gesture_recognizer import GestureRecognizer
+from hand_gesture_recognizer.backends import StubBackend
+from hand_gesture_recognizer.parallel import ParallelPipeline
+
+from .conftest import FRAMES
+
+# Frame 4 of the clip is a flat grey of 16, a little darker after MJPG
+DELAYED_FRAME_MEAN = (12.0, 17.0)
+
+
+class DelayedFrameBackend(StubBackend):
+    """Stalls on one frame of the clip, as a worker hung on a frame would."""
+
+    def detect(self, image):
+        low, high = DELAYED_FRAME_MEAN
+        if low < float(image.mean()) < high:
+            time.sleep(0.5)
+        return super().detect(image)
+
+
+class TimestampProbe:
+    def __init__(self):
+        self.timestamps = []
+
+    def publish(self, timestamp, events, gestures, results=None):
+        self.timestamps.append(timestamp)
+
+
+def test_result_arriving_after_reorder_timeout_is_dropped(clip):
+    probe = TimestampProbe()
+    recognizer = GestureRecognizer(
+        headless=True,
+        camera=clip,
+        # Slow enough that the other frames are still coming in when the
+        # stalled one returns
+        backend=functools.partial(DelayedFrameBackend, latency=0.03),
+        publisher=probe,
+    )
+    pipeline = ParallelPipeline(recognizer, workers=2, tracking=False, reorder_timeout=0.1)
+    pipeline.run()
+
+    # The late frame is skipped once and never handed on out of order
+    assert pipeline.frames_skipped >= 1
+    assert pipeline.frames_processed + pipeline.frames_skipped == FRAMES
+    assert probe.timestamps == sorted(probe.timestamps)
+    assert len(set(probe.timestamps)) == len(probe.timestamps)
+
+
+@pytest.mark.parametrize("option", [{"target_fps": 15}, {"roi": True}])
+def test_processes_reject_options_the_workers_ignore(option):
+    with pytest.raises(ValueError):
+        GestureRecognizer(processes=2, **option)
@@ -0,0 +1,24 @@
+import functools
+
+import pytest
+
+from hand_gesture_recognizer import GestureRecognizer
+from hand_gesture_recognizer.backends import StubBackend
+from hand_gesture_recognizer.pipeline import FramePipeline
+
+from .conftest import FRAMES
+
+
+def test_pipelined_run_keeps_its_pipeline(clip):
+    recognizer = GestureRecognizer(
+        headless=True, pipelined=True, camera=clip, backend=functools.partial(StubBackend)
+    )
+    recognizer.run()
+    assert isinstance(recognizer.pipeline, FramePipeline)
+    assert recognizer.pipeline.frames_processed + recognizer.pipeline.dropped == FRAMES
+    assert recognizer.pipeline.fps > 0
+
+
+def test_pipelined_and_processes_are_exclusive():
+    with pytest.raises(ValueError):
+        GestureRecognizer(pipelined=True, processes=2)
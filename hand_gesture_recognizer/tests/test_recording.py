@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from hand_gesture_recognizer import HandResults
+from hand_gesture_recognizer.recording import HEADER, LandmarkRecorder, LandmarkReplay
+
+from benchmarks.synthetic import synthetic_hand
+
+
+def frame_results(index):
+    """Frames cycle through no hand, a left hand and three hands (one too many)."""
+    if index % 3 == 0:
+        return HandResults(None, None)
+    if index % 3 == 1:
+        return HandResults([synthetic_hand("fist", offset=(0.001 * index, 0.0))], ["Left"])
+    hands = [synthetic_hand(gesture) for gesture in ("open_palm", "two_fingers", "fist")]
+    return HandResults(hands, ["Right", None, "Left"])
+
+
+def test_recording_round_trip(tmp_path):
+    path = str(tmp_path / "hands.hgr")
+    with LandmarkRecorder(path, max_hands=2, block_size=4) as recorder:
+        for index in range(10):
+            recorder.write(index / 30.0, frame_results(index))
+
+    replay = LandmarkReplay(path)
+    assert len(replay) == 10
+    assert isinstance(replay.records, np.memmap)
+    assert list(replay.records["frame"]) == list(range(10))
+    for index, (timestamp, results) in enumerate(replay):
+        assert timestamp == index / 30.0
+        expected = frame_results(index)
+        if expected.multi_hand_landmarks is None:
+            assert results.multi_hand_landmarks is None
+            continue
+        # Hands beyond max_hands are dropped
+        count = min(len(expected.multi_hand_landmarks), 2)
+        assert results.multi_handedness == expected.multi_handedness[:count]
+        np.testing.assert_array_equal(
+            np.stack(results.multi_hand_landmarks), np.stack(expected.multi_hand_landmarks[:count])
+        )
+
+
+def test_unfinished_and_truncated_recordings(tmp_path):
+    path = str(tmp_path / "hands.hgr")
+    recorder = LandmarkRecorder(path, max_hands=2, block_size=4)
+    for index in range(10):
+        recorder.write(index / 30.0, frame_results(index))
+    # Not closed, as after a crash: only the flushed blocks are there
+    assert len(LandmarkReplay(path)) == 8
+    recorder.close()
+
+    # A partial last record is ignored
+    record_size = LandmarkReplay(path).dtype.itemsize
+    with open(path, "r+b") as recording:
+        recording.truncate(HEADER.size + 9 * record_size + record_size // 2)
+    replay = LandmarkReplay(path)
+    assert len(replay) == 9
+    assert replay[8][0] == 8 / 30.0
+    del replay
+
+    # A header alone is an empty recording; less is not a recording
+    with open(path, "r+b") as recording:
+        recording.truncate(HEADER.size)
+    assert len(LandmarkReplay(path)) == 0
+    with open(path, "r+b") as recording:
+        recording.truncate(HEADER.size - 1)
+    with pytest.raises(ValueError):
+        LandmarkReplay(path)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = str(tmp_path / "other.bin")
+    with open(path, "wb") as other:
+        other.write(b"RIFF" + bytes(HEADER.size + 60))
+    with pytest.raises(ValueError):
+        LandmarkReplay(path)
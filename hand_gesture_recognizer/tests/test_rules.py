@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from hand_gesture_recognizer.landmarks import classify_landmarks, finger_states
+from hand_gesture_recognizer.rules import (
+    DEFAULT_TABLE,
+    RIGHT_HAND,
+    TABLE_SIZE,
+    GestureRule,
+    GestureRules,
+    compile_rules,
+    rule_masks,
+)
+
+from benchmarks.classifier import legacy_detect_gesture
+from benchmarks.synthetic import OPEN_PALM, to_landmark_list
+
+TIPS = (4, 8, 12, 16, 20)
+JOINTS = (3, 6, 10, 14, 18)
+
+
+def hand_for(index):
+    """
+    :return: (landmarks, handedness) of a hand whose finger-state index is
+        `index`; right hands are left hands mirrored horizontally
+    """
+    hand = OPEN_PALM.copy()
+    for finger, (tip, joint) in enumerate(zip(TIPS, JOINTS)):
+        if index & (1 << finger):
+            continue
+        if tip == 4:
+            hand[tip, 0] = hand[joint, 0] + 0.03
+        else:
+            hand[tip, 1] = hand[joint, 1] + 0.03
+    if index & RIGHT_HAND:
+        hand[:, 0] = 1.0 - hand[:, 0]
+        return hand, "Right"
+    return hand, "Left"
+
+
+def test_default_table_matches_original_detector_for_every_index():
+    import mediapipe as mp
+
+    hands, labels = zip(*[hand_for(index) for index in range(TABLE_SIZE)])
+    stack = np.stack(hands)
+    assert list(finger_states(stack, list(labels))) == list(range(TABLE_SIZE))
+    assert list(classify_landmarks(stack, list(labels))) == list(DEFAULT_TABLE)
+    for index in range(TABLE_SIZE):
+        assert finger_states(hands[index], labels[index]) == index
+        # The original detector only knew mirrored left hands
+        left, _ = hand_for(index & ~RIGHT_HAND)
+        expected = legacy_detect_gesture(to_landmark_list(left), mp.solutions.hands)
+        assert DEFAULT_TABLE[index] == expected
+        assert classify_landmarks(hands[index], labels[index]) == expected
+
+
+def test_later_rules_override_earlier_ones():
+    table = compile_rules(
+        [
+            GestureRule("count_one", 1),
+            GestureRule("pointing", "01000"),
+            GestureRule("pointing_again", "01000"),
+        ]
+    )
+    assert table[0b00010] == table[0b00010 | RIGHT_HAND] == "pointing_again"
+    assert table[0b00001] == "count_one"
+    assert table[0b00011] is None
+
+    rules = GestureRules()
+    rules.add("rock", "*1001")
+    assert rules.table[0b10010] == "rock"
+    assert rules.table[0b10011] == "rock"  # overrides three_fingers
+    assert rules.table[0b00110] == "two_fingers"
+    rules.remove("rock")
+    assert list(rules.table) == list(DEFAULT_TABLE)
+
+
+def test_hand_restricted_rules_use_the_right_hand_bit():
+    masks = rule_masks(GestureRule("thumbs_up", "10000", "Right"))
+    assert list(masks) == [0b00001 | RIGHT_HAND]
+    masks = rule_masks(GestureRule("thumbs_up", "10000", "Left"))
+    assert list(masks) == [0b00001]
+    assert len(rule_masks(GestureRule("fist", 0))) == 2
+
+    rules = GestureRules()
+    rules.add("right_fist", 0, hand="Right")
+    assert rules.table[0] == "fist"
+    assert rules.table[RIGHT_HAND] == "right_fist"
+    assert rules.gestures() == sorted(
+        ["fist", "right_fist", "two_fingers", "three_fingers", "four_fingers", "open_palm"]
+    )
+
+
+@pytest.mark.parametrize(
+    "rule", [("bad", "0100"), ("bad", "01x00"), ("bad", "01000", "Both")]
+)
+def test_invalid_rules_are_rejected(rule):
+    rules = GestureRules()
+    with pytest.raises(ValueError):
+        rules.add(*rule)
+    assert list(rules.table) == list(DEFAULT_TABLE)
@@ -0,0 +1,27 @@
+import functools
+
+import numpy as np
+import pytest
+
+from hand_gesture_recognizer import GestureRecognizer
+from hand_gesture_recognizer.backends import StubBackend
+
+from benchmarks.synthetic import synthetic_hand
+
+
+def test_scheduler_uses_capture_time_and_backend_time():
+    recognizer = GestureRecognizer(
+        headless=True,
+        target_fps=60,
+        backend=functools.partial(StubBackend, synthetic_hand(), ["Left"], latency=0.02),
+    )
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    with recognizer._take_hands() as hands:
+        # Frames captured 1/30 s apart, whenever they get inferred
+        for index in range(8):
+            recognizer._infer(hands, frame, index / 30.0)
+
+    scheduler = recognizer.scheduler
+    assert scheduler.frame_period == pytest.approx(1 / 30.0)
+    assert 0.02 <= scheduler.inference_time < 0.03
+    assert scheduler.interval == 1
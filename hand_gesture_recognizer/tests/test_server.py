@@ -0,0 +1,85 @@
+import functools
+import time
+
+import numpy as np
+
+from hand_gesture_recognizer import GestureClient, GestureRecognizer, GestureServer
+from hand_gesture_recognizer.backends import StubBackend
+
+
+class FailingConnection:
+    """Socket stand-in whose sends fail, as after the peer vanished."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def sendall(self, data):
+        raise BrokenPipeError("send failed")
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+
+def stub_recognizer():
+    return GestureRecognizer(headless=True, backend=StubBackend)
+
+
+def slow_recognizer():
+    return GestureRecognizer(headless=True, backend=functools.partial(StubBackend, latency=0.3))
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_failed_reply_recycles_graph_once():
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    with GestureServer(
+        port=0, workers=1, max_utilization=10.0, recognizer_factory=slow_recognizer
+    ) as server:
+        client = GestureClient(*server.address, jpeg_quality=None)
+        wait_for(lambda: server.clients.get(client.client_id) is not None)
+        state = server.clients[client.client_id]
+        state.connection = FailingConnection(state.connection)
+
+        # The reply to this frame fails while the worker still holds the graph
+        client.send(frame)
+        wait_for(lambda: state.processed == 1)
+        client.close()
+        wait_for(lambda: not server.clients)
+
+        assert len(server._idle_hands) == 1
+        assert state.recycled
+
+        # Two new clients must not share the recycled graph
+        first = GestureClient(*server.address, jpeg_quality=None)
+        second = GestureClient(*server.address, jpeg_quality=None)
+        wait_for(lambda: all(server.clients.get(c.client_id) for c in (first, second)))
+        graphs = [server.clients[c.client_id].hands for c in (first, second)]
+        assert graphs[0] is not graphs[1]
+        assert not server._idle_hands
+        first.close()
+        second.close()
+
+
+def test_client_ids_wrap_around_within_uint16():
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    with GestureServer(
+        port=0, workers=1, max_utilization=10.0, recognizer_factory=stub_recognizer
+    ) as server:
+        server._next_id = 0xFFFF
+        last = GestureClient(*server.address, jpeg_quality=None)
+        wrapped = GestureClient(*server.address, jpeg_quality=None)
+        assert (last.client_id, wrapped.client_id) == (0xFFFF, 1)
+        # The wrapped id fits the uplink header, so its frames are answered
+        assert wrapped.process(frame).source == 1
+
+        # Ids of connected clients are skipped
+        server._next_id = 0xFFFF
+        skipping = GestureClient(*server.address, jpeg_quality=None)
+        assert skipping.client_id == 2
+        for client in (last, wrapped, skipping):
+            client.close()
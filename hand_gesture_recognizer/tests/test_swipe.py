@@ -0,0 +1,52 @@
+import numpy as np
+
+from hand_gesture_recognizer.swipe import SwipeTracker
+
+from benchmarks.synthetic import synthetic_hand
+
+
+def sweep(tracker, speed, fps, seconds=0.4, hand_id=0, start=0.5):
+    """
+    Move a hand horizontally at `speed` frame widths per second.
+    :return: List of the swipes reported on every frame
+    """
+    swipes = []
+    for index in range(int(seconds * fps) + 1):
+        timestamp = index / fps
+        hand = synthetic_hand(offset=(start - 0.5 + speed * timestamp, 0.0))
+        swipes.append(tracker.update(hand, timestamp, hand_id))
+    return swipes
+
+
+def test_fast_motion_is_a_swipe_in_its_direction():
+    assert "right_swipe" in sweep(SwipeTracker(), 2.5, 30.0, start=0.2)
+    swipes = sweep(SwipeTracker(), -2.5, 30.0, start=0.8)
+    assert "left_swipe" in swipes
+    assert "right_swipe" not in swipes
+
+
+def test_swipes_do_not_depend_on_frame_rate():
+    for fps in (15.0, 30.0, 60.0):
+        tracker = SwipeTracker()
+        swipes = sweep(tracker, 2.5, fps, start=0.2)
+        assert "right_swipe" in swipes
+        velocity = tracker.velocity(0, 0.4)
+        assert np.isclose(velocity[0], 2.5)
+
+
+def test_slow_drift_does_not_fire():
+    tracker = SwipeTracker()
+    assert set(sweep(tracker, 0.3, 30.0, seconds=2.0, start=0.2)) == {None}
+    assert set(sweep(SwipeTracker(), -1.2, 60.0, start=0.8)) == {None}
+
+
+def test_hands_keep_separate_histories():
+    tracker = SwipeTracker()
+    swipes = []
+    for index in range(13):
+        timestamp = index / 30.0
+        # Two hands at rest far apart; keyed together they would look like
+        # jumps of half the frame on every frame
+        swipes.append(tracker.update(synthetic_hand(offset=(-0.25, 0.0)), timestamp, "Left"))
+        swipes.append(tracker.update(synthetic_hand(offset=(0.25, 0.0)), timestamp, "Right"))
+    assert set(swipes) == {None}
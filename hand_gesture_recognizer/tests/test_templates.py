@@ -0,0 +1,58 @@
+import numpy as np
+
+from hand_gesture_recognizer.templates import GestureTemplates
+
+from benchmarks.synthetic import synthetic_hand
+from benchmarks.templates import transformed
+
+
+def make_templates(rng):
+    templates = GestureTemplates(max_distance=0.15)
+    for gesture in ("fist", "open_palm", "two_fingers"):
+        templates.add(
+            gesture, np.stack([synthetic_hand(gesture, jitter=0.005, rng=rng) for _ in range(5)])
+        )
+    return templates
+
+
+def test_moved_scaled_and_rotated_hand_matches_its_gesture():
+    rng = np.random.default_rng(0)
+    templates = make_templates(rng)
+    hand = transformed(synthetic_hand("two_fingers", jitter=0.005, rng=rng), rng, 30.0)
+
+    gesture, distance, confidence = templates.match_one(hand)
+    assert gesture == "two_fingers"
+    assert distance < templates.max_distance
+    assert confidence > 0.5
+    assert templates.classify(hand) == "two_fingers"
+    # The batched path agrees with the single-hand one
+    labels, distances, _ = templates.match(hand[None])
+    assert templates.names[labels[0]] == "two_fingers"
+    assert abs(distances[0] - distance) < 1e-5
+
+
+def test_unknown_shapes_are_rejected():
+    rng = np.random.default_rng(1)
+    templates = make_templates(rng)
+    cloud = rng.uniform(0.2, 0.8, size=(21, 3)).astype(np.float32)
+    gesture, distance, _ = templates.match_one(cloud)
+    assert gesture is None
+    assert distance > templates.max_distance
+    assert list(templates.classify(np.stack([cloud, synthetic_hand("fist")]))) == [None, "fist"]
+
+    # So is a match whose confidence is too low
+    assert templates.classify(synthetic_hand("fist"), min_confidence=1.01) is None
+
+
+def test_save_and_load_round_trip(tmp_path):
+    rng = np.random.default_rng(2)
+    templates = make_templates(rng)
+    path = str(tmp_path / "templates.npz")
+    templates.save(path)
+
+    loaded = GestureTemplates(max_distance=0.15).load(path)
+    assert loaded.names == templates.names
+    assert len(loaded) == len(templates)
+    hands = np.stack([synthetic_hand(gesture) for gesture in templates.names])
+    assert list(loaded.classify(hands)) == list(templates.classify(hands))
+    np.testing.assert_allclose(loaded.match(hands)[1], templates.match(hands)[1], atol=1e-6)
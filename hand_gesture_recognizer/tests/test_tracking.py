@@ -0,0 +1,77 @@
+from hand_gesture_recognizer import GestureDebouncer, GestureRecognizer, HandResults, HandTracker
+
+from benchmarks.synthetic import synthetic_hand
+
+
+def test_per_hand_events_are_debounced():
+    recognizer = GestureRecognizer(
+        headless=True,
+        tracker=HandTracker(max_hands=2),
+        debouncer=GestureDebouncer(confirm_frames=2, release_frames=2),
+    )
+    events = []
+    for gesture in ("fist", "open_palm"):
+        recognizer.register_gesture(
+            gesture,
+            lambda hand_id, state, gesture=gesture: events.append((hand_id, gesture, state)),
+            per_hand=True,
+        )
+
+    # The left hand holds a fist that flickers to open_palm for one frame;
+    # the right hand holds a steady open palm
+    left = ["fist"] * 4 + ["open_palm"] + ["fist"] * 4
+    for index, gesture in enumerate(left):
+        hands = [
+            synthetic_hand(gesture, offset=(-0.25, 0.0)),
+            synthetic_hand("open_palm", offset=(0.25, 0.0)),
+        ]
+        results = HandResults(hands, ["Left", "Left"])
+        recognizer.handle_gesture_states(recognizer._recognize(results, index / 30.0))
+
+    # No appear/disappear for the one-frame open_palm, nor for the fist it interrupted
+    assert sorted(events) == [(0, "fist", "appear"), (1, "open_palm", "appear")]
+
+    # Both hands leave: released after release_frames
+    for index in range(len(left), len(left) + 2):
+        recognizer.handle_gesture_states(recognizer._recognize(HandResults([], None), index / 30.0))
+    assert sorted(events[2:]) == [(0, "fist", "disappear"), (1, "open_palm", "disappear")]
+
+
+def test_new_hand_does_not_take_a_briefly_missed_hands_slot():
+    tracker = HandTracker(max_hands=2)
+    left = synthetic_hand("fist", offset=(-0.25, 0.0))
+    right = synthetic_hand("open_palm", offset=(0.25, 0.0))
+    newcomer = synthetic_hand("open_palm", offset=(0.0, -0.3))
+    assert tracker.update([left, right], ["Left", "Right"], 0.0) == [0, 1]
+
+    # The left hand is missed for one frame as another hand comes into view
+    assert tracker.update([right, newcomer], ["Right", "Left"], 1 / 30.0) == [1, -1]
+    assert tracker.claimed == []
+    assert tracker.update([left, right], ["Left", "Right"], 2 / 30.0) == [0, 1]
+
+    # Once the left hand has been gone for stale_after, its slot is free
+    assert tracker.update([right], ["Right"], 0.3) == [1]
+    assert tracker.update([right, newcomer], ["Right", "Left"], 0.6) == [1, 0]
+    assert tracker.claimed == [0]
+
+
+def test_reassigned_slot_ends_the_old_hands_gestures():
+    recognizer = GestureRecognizer(
+        headless=True,
+        tracker=HandTracker(max_hands=1),
+        # Holds a gesture longer than the tracker keeps a missing hand
+        debouncer=GestureDebouncer(confirm_frames=1, release_frames=1, release_ms=1000.0),
+    )
+    events = []
+    recognizer.register_gesture(
+        "fist", lambda hand_id, state: events.append((hand_id, state)), per_hand=True
+    )
+
+    first = HandResults([synthetic_hand("fist", offset=(-0.25, 0.0))], ["Left"])
+    recognizer.handle_gesture_states(recognizer._recognize(first, 0.0))
+    # A different hand takes the expired slot while the debouncer still holds
+    # the first hand's fist
+    second = HandResults([synthetic_hand("fist", offset=(0.25, 0.0))], ["Left"])
+    recognizer.handle_gesture_states(recognizer._recognize(second, 0.6))
+
+    assert events == [(0, "appear"), (0, "disappear"), (0, "appear")]
@@ -0,0 +1,128 @@
+import socket
+import struct
+
+import numpy as np
+import pytest
+
+from hand_gesture_recognizer import HandResults
+from hand_gesture_recognizer.uplink import (
+    QUANT_SCALE,
+    GesturePublisher,
+    LocalBroker,
+    MqttTransport,
+    UdpTransport,
+    UplinkEvent,
+    UplinkHand,
+    _mqtt_packet,
+    _mqtt_string,
+    _read_mqtt_packet,
+    decode_packet,
+    encode_packet,
+)
+
+from benchmarks.synthetic import synthetic_hand
+
+
+def frame_records(delta_step=0.0):
+    first = synthetic_hand("fist")
+    second = first + np.float32(delta_step)
+    return [
+        UplinkEvent(100.0, "fist", "appear"),
+        UplinkHand(100.0, 0, "Left", first),
+        UplinkHand(100.0, 1, None, synthetic_hand("open_palm", offset=(0.3, 0.0))),
+        UplinkEvent(100.0333, "open_palm", "disappear"),
+        UplinkHand(100.0333, 0, "Left", second),
+    ]
+
+
+def assert_same_records(packet, records):
+    events = [record for record in records if isinstance(record, UplinkEvent)]
+    hands = [record for record in records if isinstance(record, UplinkHand)]
+    assert [(event.gesture, event.state) for event in packet.events] == [
+        (event.gesture, event.state) for event in events
+    ]
+    for decoded, event in zip(packet.events, events):
+        assert decoded.timestamp == pytest.approx(event.timestamp, abs=1e-4)
+    assert [(hand.slot, hand.handedness) for hand in packet.hands] == [
+        (hand.slot, hand.handedness) for hand in hands
+    ]
+    for decoded, hand in zip(packet.hands, hands):
+        assert decoded.timestamp == pytest.approx(hand.timestamp, abs=1e-4)
+        np.testing.assert_allclose(decoded.landmarks, hand.landmarks, atol=1.0 / QUANT_SCALE)
+
+
+def test_packet_round_trip():
+    records = frame_records()
+    packet = decode_packet(encode_packet(7, 0x1FFFFFFFF, records, active={"fist"}, delta=False))
+    assert (packet.source, packet.sequence, packet.active) == (7, 0xFFFFFFFF, {"fist"})
+    assert_same_records(packet, records)
+
+
+def test_delta_packet_round_trip():
+    records = frame_records(delta_step=0.001)
+    full = encode_packet(1, 1, records, delta=False)
+    delta = encode_packet(1, 1, records, delta=True)
+    # The slot's second hand goes as 63 int8 changes instead of 63 int16
+    assert len(full) - len(delta) == 63
+    assert_same_records(decode_packet(delta), records)
+
+    # Changes too large for int8 fall back to a full hand
+    records = frame_records(delta_step=0.1)
+    assert len(encode_packet(1, 1, records, delta=True)) == len(full)
+    assert_same_records(decode_packet(encode_packet(1, 1, records, delta=True)), records)
+
+
+def test_corrupt_packets_are_rejected():
+    data = encode_packet(1, 1, frame_records())
+    with pytest.raises(ValueError):
+        decode_packet(data[:10])
+    with pytest.raises(ValueError):
+        decode_packet(data[:-5])
+    with pytest.raises(ValueError):
+        decode_packet(b"XX" + data[2:])
+
+
+def subscribe(address, topic):
+    """:return: A socket subscribed to topic on an MQTT broker"""
+    stream = socket.create_connection(address, timeout=5.0)
+    connect = _mqtt_string("MQTT") + struct.pack(">BBH", 4, 0x02, 60) + _mqtt_string("test")
+    stream.sendall(_mqtt_packet(0x10, connect))
+    assert _read_mqtt_packet(stream)[0] >> 4 == 2  # CONNACK
+    stream.sendall(_mqtt_packet(0x82, b"\x00\x01" + _mqtt_string(topic) + b"\x00"))
+    assert _read_mqtt_packet(stream)[0] >> 4 == 9  # SUBACK
+    return stream
+
+
+def test_publish_and_subscribe_through_local_broker():
+    records = frame_records()
+    with LocalBroker() as broker:
+        subscriber = subscribe(broker.mqtt_address, "gestures/+")
+        transport = MqttTransport(*broker.mqtt_address, topic="gestures/hands")
+        try:
+            transport.send(encode_packet(3, 5, records))
+            first_byte, body = _read_mqtt_packet(subscriber)
+        finally:
+            transport.close()
+            subscriber.close()
+        assert first_byte >> 4 == 3  # PUBLISH
+        length = struct.unpack_from(">H", body)[0]
+        assert body[2 : 2 + length] == b"gestures/hands"
+        packet = decode_packet(body[2 + length :])
+        assert (packet.source, packet.sequence) == (3, 5)
+        assert_same_records(packet, records)
+
+
+def test_publisher_sends_frames_over_udp():
+    with LocalBroker() as broker:
+        publisher = GesturePublisher(
+            UdpTransport(*broker.udp_address), landmarks="int16", heartbeat=None, clock_offset=0.0
+        )
+        hands = HandResults([synthetic_hand("fist")], ["Right"])
+        publisher.publish(10.0, [("fist", "appear")], {"fist"}, hands)
+        publisher.close()
+        topic, payload = broker.get(timeout=5.0)
+    assert topic is None
+    packet = decode_packet(payload)
+    assert packet.active == {"fist"}
+    assert [(event.gesture, event.state) for event in packet.events] == [("fist", "appear")]
+    assert [(hand.slot, hand.handedness) for hand in packet.hands] == [(0, "Right")]
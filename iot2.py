@@ -1,5 +1,5 @@
 import keyboard
-from hand_gesture_recognizer import GestureRecognizer
+from hand_gesture_recognizer import GestureDispatcher, GestureRecognizer
 
 # Dictionary to map gestures to keyboard or mouse actions
 gesture_actions = {
@@ -54,8 +54,12 @@ def handle_right_swipe(state):
     handle_gesture_state("three_fingers", state)
 
 
-# Initialize the recognizer
-recognizer = GestureRecognizer()
+# Initialize the recognizer. Key presses run on a single dispatcher thread so
+# slow keyboard injection never stalls recognition, and active_gestures is
+# only ever touched from that one thread.
+recognizer = GestureRecognizer(
+    dispatcher=GestureDispatcher(max_workers=1, overflow="coalesce")
+)
 
 # Register gestures and their handlers
 recognizer.register_gesture("fist", handle_fist)